@@ -0,0 +1,243 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from collections import deque
+from typing import Generic, TypeVar, final
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 1024
+# How long a finished run's events stay available for clients to resume from
+DEFAULT_RETENTION_SECONDS = 60.0
+
+
+def _notify(event: asyncio.Event) -> asyncio.Event:
+    """Wake everyone waiting on `event` and return a fresh one for the next wait."""
+    event.set()
+    return asyncio.Event()
+
+
+class SubscriptionLagged(Exception):
+    """Raised to a subscriber that fell so far behind that its next events are gone."""
+
+
+@final
+class RunChannel(Generic[T]):
+    """
+    Fans out the events of a single agent run to any number of subscribers.
+
+    Events are appended to a ring buffer of the last `capacity` events and every
+    subscriber reads it at its own position, so publishing never polls and never
+    copies events per subscriber. Positions increase monotonically from 0 and serve as
+    event IDs: a subscriber can resume after the last event it has seen as long as
+    that event is still buffered.
+
+    `user_uuid` is the user who started the run, if any; only they may follow or
+    cancel it.
+
+    Publishing never waits for subscribers, so a client that stops reading cannot
+    stall the run: a subscriber that falls more than `capacity` events behind is
+    dropped (reading it raises `SubscriptionLagged`), and its client has to resume
+    from its last event ID, or reload the run from storage once those events are
+    gone.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        thread_id: str,
+        capacity: int = DEFAULT_CAPACITY,
+        user_uuid: str | None = None,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.run_id = run_id
+        self.thread_id = thread_id
+        self.user_uuid = user_uuid
+        self._capacity = capacity
+        self._events: deque[T] = deque()
+        # The position (sequence number) of `self._events[0]`
+        self._offset = 0
+        self._closed = False
+        self._published = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def end(self) -> int:
+        """The position the next published event will get."""
+        return self._offset + len(self._events)
+
+    async def publish(self, event: T) -> None:
+        if self._closed:
+            raise RuntimeError(f"Run {self.run_id} is already closed")
+        if len(self._events) >= self._capacity:
+            self._events.popleft()
+            self._offset += 1
+        self._events.append(event)
+        self._published = _notify(self._published)
+
+    def close(self) -> None:
+        """Mark the run as finished; subscribers stop after the last event."""
+        self._closed = True
+        self._published = _notify(self._published)
+
+    def subscribe(self, after: int | None = None) -> "Subscription[T]":
+        """
+        Subscribe to the events after the event with ID `after`, or to the events
+        published from now on. Pass `after=-1` to replay the run from the start.
+        Raises ValueError if the events after `after` are no longer buffered.
+        """
+        position = self.end if after is None else after + 1
+        if not self._offset <= position <= self.end:
+            raise ValueError(
+                f"Events after {after} of run {self.run_id} are not available"
+            )
+        return Subscription(self, position)
+
+    async def _read(self, subscription: "Subscription[T]") -> T:
+        while subscription.position >= self.end:
+            if self._closed or subscription.closed:
+                raise StopAsyncIteration
+            await self._published.wait()
+        if subscription.closed:
+            raise StopAsyncIteration
+        if subscription.position < self._offset:
+            logger.info(
+                "A subscriber of run %s fell more than %d events behind",
+                self.run_id,
+                self._capacity,
+            )
+            raise SubscriptionLagged(
+                f"Events after {subscription.last_event_id} of run {self.run_id} "
+                "are no longer available"
+            )
+        event = self._events[subscription.position - self._offset]
+        subscription.position += 1
+        return event
+
+    async def _wait(self, subscription: "Subscription[T]", timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while subscription.position >= self.end:
+            remaining = deadline - loop.time()
+            if self._closed or remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._published.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+
+@final
+class Subscription(Generic[T]):
+    """An async iterator over the events of a `RunChannel`."""
+
+    def __init__(self, channel: RunChannel[T], position: int):
+        self._channel = channel
+        self.position = position
+        self.closed = False
+
+    @property
+    def last_event_id(self) -> int:
+        """The ID of the event last returned (-1 before the first one of a run)."""
+        return self.position - 1
+
+    @property
+    def pending(self) -> int:
+        """The number of events that can be read without waiting."""
+        return self._channel.end - self.position
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait up to `timeout` seconds for an event to read. Returns False on timeout or
+        if the run finished without publishing one.
+        """
+        return await self._channel._wait(self, timeout)
+
+    def __aiter__(self) -> "Subscription[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        """
+        The next event. Raises `SubscriptionLagged` if this subscriber fell more than
+        the channel's capacity behind.
+        """
+        try:
+            return await self._channel._read(self)
+        except StopAsyncIteration:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self.closed = True
+
+
+@final
+class EventBroker(Generic[T]):
+    """
+    Registry of run channels, keyed by run ID. Channels of finished runs are kept for
+    `retention_seconds` so that clients can still resume them.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+    ):
+        self._capacity = capacity
+        self._retention_seconds = retention_seconds
+        self._channels: dict[str, RunChannel[T]] = {}
+
+    def open(
+        self, run_id: str, thread_id: str, user_uuid: str | None = None
+    ) -> RunChannel[T]:
+        existing = self._channels.get(run_id)
+        if existing and not existing.closed:
+            raise ValueError(f"Run {run_id} is already in progress")
+        channel: RunChannel[T] = RunChannel(
+            run_id, thread_id, self._capacity, user_uuid
+        )
+        self._channels[run_id] = channel
+        return channel
+
+    def get(self, run_id: str) -> RunChannel[T] | None:
+        return self._channels.get(run_id)
+
+    def close(self, run_id: str) -> None:
+        """Close the run's channel; it is forgotten once the retention period ends."""
+        channel = self._channels.get(run_id)
+        if not channel:
+            return
+        channel.close()
+        if self._retention_seconds <= 0:
+            self._forget(run_id, channel)
+        else:
+            asyncio.get_running_loop().call_later(
+                self._retention_seconds, self._forget, run_id, channel
+            )
+
+    def _forget(self, run_id: str, channel: RunChannel[T]) -> None:
+        # The run ID may have been reused by a newer run in the meantime.
+        if self._channels.get(run_id) is channel:
+            del self._channels[run_id]
+            logger.debug("Discarded the events of run %s", run_id)
@@ -0,0 +1,107 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import logging
+from dataclasses import dataclass
+from typing import final
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ClientLimits:
+    """Connection pool settings of the HTTP clients used to call agents."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    # The longest wait for the next chunk of a streamed run; the agent is assumed to be
+    # stalled after that
+    read_timeout: float = 600.0
+    # Opt-in, see `_http2_available`
+    http2: bool = False
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ClientLimits":
+        return cls(
+            max_connections=config.agent_max_connections,
+            max_keepalive_connections=config.agent_max_keepalive_connections,
+            keepalive_expiry=config.agent_keepalive_expiry_seconds,
+            read_timeout=config.agent_read_timeout_seconds,
+            http2=config.agent_http2,
+        )
+
+
+def _http2_available() -> bool:
+    # httpx only speaks HTTP/2 with the optional `h2` package (`httpx[http2]`).
+    return importlib.util.find_spec("h2") is not None
+
+
+@final
+class OpenAIClientPool:
+    """
+    Process-wide `AsyncOpenAI` clients, one per agent endpoint and API token.
+
+    Agents are created per request, so they borrow a client from here instead of
+    creating their own; the connections to the agent deployment are then kept alive
+    across chat turns rather than paying a new TCP and TLS handshake each time.
+    Request-specific headers must be sent per call (`extra_headers`), never set on the
+    shared client.
+    """
+
+    def __init__(self, limits: ClientLimits | None = None):
+        self._limits = limits or ClientLimits()
+        self._http2 = self._limits.http2 and _http2_available()
+        if self._limits.http2 and not self._http2:
+            logger.warning(
+                "HTTP/2 for agent connections needs the `h2` package "
+                "(httpx[http2]); falling back to HTTP/1.1"
+            )
+        self._clients: dict[tuple[str, str], AsyncOpenAI] = {}
+
+    def get(self, base_url: str, api_key: str) -> AsyncOpenAI:
+        key = (base_url, api_key)
+        client = self._clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=self._http_client(),
+            )
+            self._clients[key] = client
+        return client
+
+    async def close(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.close()
+
+    def _http_client(self) -> httpx.AsyncClient:
+        limits = self._limits
+        return httpx.AsyncClient(
+            http2=self._http2,
+            limits=httpx.Limits(
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_keepalive_connections,
+                keepalive_expiry=limits.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(limits.read_timeout, connect=limits.connect_timeout),
+        )
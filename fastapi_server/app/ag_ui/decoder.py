@@ -0,0 +1,57 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Mapping
+
+import ag_ui.core
+from ag_ui.core import (
+    BaseEvent,
+    EventType,
+    TextMessageContentEvent,
+    ThinkingTextMessageContentEvent,
+)
+
+
+def _event_models() -> dict[str, type[BaseEvent]]:
+    models: dict[str, type[BaseEvent]] = {}
+    for value in vars(ag_ui.core).values():
+        if isinstance(value, type) and issubclass(value, BaseEvent):
+            event_type = value.model_fields["type"].default
+            if isinstance(event_type, EventType):
+                models[event_type.value] = value
+    return models
+
+
+# Every concrete AG-UI event model, by the value of its `type` discriminator
+EVENT_MODELS = _event_models()
+
+# Streamed once per token, so by far the most frequent events
+CONTENT_EVENT_MODELS: frozenset[type[BaseEvent]] = frozenset(
+    {TextMessageContentEvent, ThinkingTextMessageContentEvent}
+)
+
+
+def decode_event(data: Mapping[str, Any]) -> BaseEvent:
+    """
+    Decode an AG-UI event from its JSON form, dispatching on the `type` discriminator
+    to the event model. Raises ValueError if `data` is not a valid event.
+
+    Unlike validating against the `ag_ui.core.Event` union, this only runs the
+    (prebuilt) validator of one model, and also covers the thinking events.
+    """
+    event_type = data.get("type")
+    model = EVENT_MODELS.get(event_type) if isinstance(event_type, str) else None
+    if model is None:
+        raise ValueError(f"Unknown event type: {event_type!r}")
+    return model.model_validate(data)
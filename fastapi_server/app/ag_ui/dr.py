@@ -15,13 +15,11 @@
 import asyncio
 import logging
 import uuid
-from typing import Any, AsyncGenerator, Dict
+from typing import Any, AsyncGenerator, Callable, Dict
 
 from ag_ui.core import (
     BaseEvent,
     CustomEvent,
-    Event,
-    EventType,
     RunAgentInput,
     RunErrorEvent,
     RunFinishedEvent,
@@ -33,89 +31,75 @@ from ag_ui.core import (
 )
 from openai import AsyncOpenAI, AsyncStream
 from openai.types.chat import ChatCompletionChunk
-from pydantic import TypeAdapter
 
 from app.ag_ui.base import AGUIAgent
+from app.ag_ui.clients import OpenAIClientPool
+from app.ag_ui.decoder import CONTENT_EVENT_MODELS, decode_event
 from app.config import Config
 
 logger = logging.getLogger(__name__)
 
 
-async def _merge_async_generators(
-    main_gen: AsyncGenerator[BaseEvent, None],
-    heartbeat_gen: AsyncGenerator[BaseEvent, None],
-    main_finished_ref: list[bool],
-) -> AsyncGenerator[BaseEvent, None]:
-    """Merge main stream with heartbeat, stopping heartbeat when main stream finishes."""
-    queue: asyncio.Queue[BaseEvent | None] = asyncio.Queue()
+HEARTBEAT_EVENT = "Heartbeat"
+# The number of upstream events read ahead of the consumer before reading pauses
+READ_AHEAD = 64
 
-    async def _run_main() -> None:
-        try:
-            async for event in main_gen:
-                await queue.put(event)
-        except Exception as e:
-            logger.exception("Error in main generator", extra={"error": str(e)})
-        finally:
-            main_finished_ref[0] = True
-            await queue.put(None)  # Signal main stream finished
 
-    async def _run_heartbeat() -> None:
+class _Done:
+    pass
+
+
+async def _with_heartbeat(
+    events: AsyncGenerator[BaseEvent, None],
+    heartbeat: Callable[[], BaseEvent],
+    interval: float,
+) -> AsyncGenerator[BaseEvent, None]:
+    """
+    Yield `events`, plus a `heartbeat()` event whenever none was sent for `interval`
+    seconds.
+
+    The heartbeat is a single timer on the event loop that is only re-armed when it
+    fires, so an idle stream costs one timer and a busy stream never sends heartbeats.
+    At most `READ_AHEAD` events are read ahead of the consumer.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[BaseEvent | _Done] = asyncio.Queue(READ_AHEAD)
+    last_sent = loop.time()
+    heartbeat_queued = False
+    timer: asyncio.TimerHandle
+
+    def beat() -> None:
+        nonlocal timer, heartbeat_queued
+        idle = loop.time() - last_sent
+        if idle >= interval:
+            # A full queue has events to send already
+            if not heartbeat_queued and not queue.full():
+                heartbeat_queued = True
+                queue.put_nowait(heartbeat())
+            idle = 0.0
+        timer = loop.call_later(interval - idle, beat)
+
+    async def pump() -> None:
         try:
-            async for event in heartbeat_gen:
+            async for event in events:
                 await queue.put(event)
-        except asyncio.CancelledError:
-            pass
         except Exception as e:
-            logger.exception("Error in heartbeat generator", extra={"error": str(e)})
-
-    # Start both generators
-    main_task = asyncio.create_task(_run_main())
-    heartbeat_task = asyncio.create_task(_run_heartbeat())
+            logger.exception("Error in main generator", extra={"error": str(e)})
+        await queue.put(_Done())
 
+    task = asyncio.create_task(pump())
+    timer = loop.call_later(interval, beat)
     try:
-        while True:
-            event = await queue.get()
-            if event is None:
-                # Main stream finished, cancel heartbeat and wait for it
-                if not heartbeat_task.done():
-                    heartbeat_task.cancel()
-                break
+        while not isinstance(event := await queue.get(), _Done):
+            heartbeat_queued = False
+            last_sent = loop.time()
             yield event
     finally:
-        # Cancel heartbeat if still running
-        if not heartbeat_task.done():
-            heartbeat_task.cancel()
-        # Wait for both tasks to finish
-        await asyncio.gather(main_task, heartbeat_task, return_exceptions=True)
-
-
-async def _heartbeat_generator(
-    thread_id: str,
-    run_id: str,
-    main_finished_ref: list[bool],
-    heartbeat_interval: float,
-    check_interval: float,
-) -> AsyncGenerator[BaseEvent, None]:
-    """Generate heartbeat events every 15 seconds until main stream finishes."""
-
-    while True:
-        # Sleep in smaller intervals to check if main stream finished
-        elapsed = 0.0
-        while elapsed < heartbeat_interval:
-            if main_finished_ref[0]:
-                return
-            await asyncio.sleep(min(check_interval, heartbeat_interval - elapsed))
-            elapsed += check_interval
-
-        if main_finished_ref[0]:
-            return
-
-        # Create a heartbeat event using Event with CUSTOM type
-        heartbeat_event = CustomEvent(
-            name="Heartbeat",
-            value={"thread_id": thread_id, "run_id": run_id},
-        )
-        yield heartbeat_event
+        timer.cancel()
+        # Stop the main stream too if we were cancelled or closed before it finished
+        if not task.done():
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
 
 
 class DataRobotAGUIAgent(AGUIAgent):
@@ -127,37 +111,31 @@ class DataRobotAGUIAgent(AGUIAgent):
         config: Config,
         headers: Dict[str, str] | None = None,
         heartbeat_interval: float = 15.0,
-        check_interval: float = 1.0,
+        clients: OpenAIClientPool | None = None,
     ) -> None:
         super().__init__(name)
         self.url = config.agent_endpoint
 
-        agent_headers = {"Authorization": f"Bearer {config.datarobot_api_token}"}
-        if headers:
-            agent_headers.update(headers)
-
-        self.client = AsyncOpenAI(
-            base_url=self.url,
-            api_key=config.datarobot_api_token,
-            default_headers=agent_headers,
-        )
+        if clients:
+            self.client = clients.get(self.url, config.datarobot_api_token)
+        else:
+            self.client = AsyncOpenAI(
+                base_url=self.url, api_key=config.datarobot_api_token
+            )
+        # The client may be shared with other runs, so the headers of this run are
+        # sent with each request rather than set on the client.
+        self.headers = dict(headers or {})
         self.heartbeat_interval = heartbeat_interval
-        self.check_interval = check_interval
 
     async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
-        # Create shared flag for heartbeat to check if main stream finished
-        main_finished_ref = [False]
-        # Create heartbeat generator
-        heartbeat_gen = _heartbeat_generator(
-            input.thread_id,
-            input.run_id,
-            main_finished_ref,
-            self.heartbeat_interval,
-            self.check_interval,
-        )
-        # Merge main stream with heartbeat
-        async for event in _merge_async_generators(
-            self._handle_stream_events(input), heartbeat_gen, main_finished_ref
+        def heartbeat() -> BaseEvent:
+            return CustomEvent(
+                name=HEARTBEAT_EVENT,
+                value={"thread_id": input.thread_id, "run_id": input.run_id},
+            )
+
+        async for event in _with_heartbeat(
+            self._handle_stream_events(input), heartbeat, self.heartbeat_interval
         ):
             yield event
 
@@ -178,45 +156,46 @@ class DataRobotAGUIAgent(AGUIAgent):
                 **self._prepare_chat_completions_input(input)
             )
             chunks = 0
-            async for chunk in generator:
-                chunks += 1
-                # Event is already embedded in the chunk, so we don't need to convert it
-                if hasattr(chunk, "event"):
-                    event = TypeAdapter[Event](Event).validate_python(chunk.event)
-                    if event.type not in [
-                        EventType.TEXT_MESSAGE_CONTENT,
-                        EventType.THINKING_TEXT_MESSAGE_CONTENT,
-                    ]:
-                        logger.info(f"Received event: {chunk.event}")
-                    yield event
-                    continue
-
-                if not chunk.choices:
-                    continue
-                if len(chunk.choices) > 1:
-                    logger.warning("Received more than one choice from chat completion")
-
-                choice = chunk.choices[0]
-
-                if choice.delta.content:
-                    if not text_message_started:
-                        yield TextMessageStartEvent(message_id=message_id)
-                        text_message_started = True
-                    yield TextMessageContentEvent(
-                        message_id=message_id, delta=choice.delta.content
-                    )
-                if choice.delta.tool_calls:
-                    for tool_call in choice.delta.tool_calls:
-                        yield ToolCallChunkEvent(
-                            tool_call_id=tool_call.id,
-                            tool_call_name=tool_call.function.name
-                            if tool_call.function
-                            else None,
-                            delta=tool_call.function.arguments
-                            if tool_call.function
-                            else None,
-                            parent_message_id=message_id,
+            # Closing the stream releases the connection if the run is cancelled midway
+            async with generator:
+                async for chunk in generator:
+                    chunks += 1
+                    # Event is already embedded in the chunk, so we don't need to convert it
+                    if hasattr(chunk, "event"):
+                        event = decode_event(chunk.event)
+                        if type(event) not in CONTENT_EVENT_MODELS:
+                            logger.debug("Received event %s", event.type)
+                        yield event
+                        continue
+
+                    if not chunk.choices:
+                        continue
+                    if len(chunk.choices) > 1:
+                        logger.warning(
+                            "Received more than one choice from chat completion"
+                        )
+
+                    choice = chunk.choices[0]
+
+                    if choice.delta.content:
+                        if not text_message_started:
+                            yield TextMessageStartEvent(message_id=message_id)
+                            text_message_started = True
+                        yield TextMessageContentEvent(
+                            message_id=message_id, delta=choice.delta.content
                         )
+                    if choice.delta.tool_calls:
+                        for tool_call in choice.delta.tool_calls:
+                            yield ToolCallChunkEvent(
+                                tool_call_id=tool_call.id,
+                                tool_call_name=tool_call.function.name
+                                if tool_call.function
+                                else None,
+                                delta=tool_call.function.arguments
+                                if tool_call.function
+                                else None,
+                                parent_message_id=message_id,
+                            )
             if chunks == 0:
                 raise RuntimeError(
                     "No response received from the agent. Please check if agent supports streaming."
@@ -247,4 +226,5 @@ class DataRobotAGUIAgent(AGUIAgent):
             "messages": messages,
             "model": "custom-model",
             "stream": True,
+            "extra_headers": self.headers,
         }
@@ -0,0 +1,94 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from ag_ui.core import BaseEvent, TextMessageChunkEvent, ToolCallArgsEvent
+from ag_ui.encoder import EventEncoder
+
+from app.ag_ui.broker import Subscription
+from app.ag_ui.decoder import CONTENT_EVENT_MODELS
+from app.config import Config
+
+# Events that may wait for the next write; any other event is flushed right away
+DEFERRABLE_EVENT_MODELS: frozenset[type[BaseEvent]] = CONTENT_EVENT_MODELS | {
+    TextMessageChunkEvent,
+    ToolCallArgsEvent,
+}
+
+
+class ResumableEventEncoder(EventEncoder):
+    """
+    SSE encoder that tags every frame with the event's position in its run, so that a
+    client can resume the stream by sending it back as `Last-Event-ID`.
+    """
+
+    def encode(self, event: BaseEvent, event_id: int | None = None) -> str:
+        frame = super().encode(event)
+        if event_id is None:
+            return frame
+        return f"id: {event_id}\n{frame}"
+
+
+@dataclass(frozen=True)
+class FlushPolicy:
+    """
+    When the coalesced frames of a stream are written.
+
+    A content delta waits up to `max_delay` seconds for more frames to write along with
+    it, until `max_bytes` are buffered. Any other event, heartbeats included, is written
+    right away together with what is buffered. With `max_delay=0` only the frames that
+    are already available are written together.
+    """
+
+    max_delay: float = 0.01
+    max_bytes: int = 16 * 1024
+
+    @classmethod
+    def from_config(cls, config: Config) -> "FlushPolicy":
+        return cls(
+            max_delay=config.sse_flush_interval_seconds,
+            max_bytes=config.sse_flush_bytes,
+        )
+
+
+async def encode_coalesced(
+    subscription: Subscription[BaseEvent],
+    encoder: ResumableEventEncoder,
+    policy: FlushPolicy,
+) -> AsyncIterator[str]:
+    """
+    Encode the events of `subscription` as SSE frames, joining the frames produced in
+    quick succession (e.g. token deltas) into one write as per `policy`.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            event = await anext(subscription)
+        except StopAsyncIteration:
+            return
+        frames = [encoder.encode(event, subscription.last_event_id)]
+        size = len(frames[0])
+        deadline = loop.time() + policy.max_delay
+        while type(event) in DEFERRABLE_EVENT_MODELS and size < policy.max_bytes:
+            if not subscription.pending and not await subscription.wait(
+                deadline - loop.time()
+            ):
+                break
+            event = await anext(subscription)
+            frames.append(encoder.encode(event, subscription.last_event_id))
+            size += len(frames[-1])
+        yield "".join(frames)
@@ -18,3 +18,4 @@ from enum import Enum
 class ErrorCodes(str, Enum):
     INVALID_INPUT = "INVALID_INPUT"
     INTERNAL_ERROR = "INTERNAL_ERROR"
+    RUN_CANCELLED = "RUN_CANCELLED"
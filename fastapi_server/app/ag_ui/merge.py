@@ -0,0 +1,104 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import AsyncGenerator
+
+from ag_ui.core import BaseEvent, RunAgentInput, TextMessageContentEvent
+
+from app.ag_ui.base import AGUIAgent
+
+
+async def _next(events: AsyncGenerator[BaseEvent, None]) -> BaseEvent:
+    return await anext(events)
+
+
+class AGUIAgentWithDeltaMerging(AGUIAgent):
+    """
+    Wraps an agent that streams one `TextMessageContentEvent` per token, and merges
+    consecutive content deltas of the same message into one event.
+
+    A merged delta is emitted once it has `max_chars` characters, `max_delay` seconds
+    after its first token, or right before any other event, so the order of the
+    content relative to tool call, reasoning and other events is kept.
+    """
+
+    def __init__(
+        self, name: str, inner: AGUIAgent, max_chars: int, max_delay: float
+    ) -> None:
+        super().__init__(name)
+        self._inner = inner
+        self._max_chars = max_chars
+        self._max_delay = max_delay
+
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        loop = asyncio.get_running_loop()
+        events = self._inner.run(input)
+        message_id = ""
+        deltas: list[str] = []
+        size = 0
+        deadline = 0.0
+        pending: asyncio.Task[BaseEvent] | None = None
+
+        def merged() -> TextMessageContentEvent:
+            nonlocal deltas, size
+            event = TextMessageContentEvent(
+                message_id=message_id, delta="".join(deltas)
+            )
+            deltas, size = [], 0
+            return event
+
+        try:
+            while True:
+                try:
+                    if not deltas and not pending:
+                        event = await anext(events)
+                    else:
+                        # Wait for the next event only until the merged delta is due.
+                        pending = pending or asyncio.create_task(_next(events))
+                        if deltas:
+                            await asyncio.wait(
+                                {pending}, timeout=deadline - loop.time()
+                            )
+                            if not pending.done():
+                                yield merged()
+                                continue
+                        event = await pending
+                        pending = None
+                except StopAsyncIteration:
+                    break
+
+                if isinstance(event, TextMessageContentEvent):
+                    if deltas and event.message_id != message_id:
+                        yield merged()
+                    if not deltas:
+                        message_id = event.message_id
+                        deadline = loop.time() + self._max_delay
+                    deltas.append(event.delta)
+                    size += len(event.delta)
+                    if size >= self._max_chars:
+                        yield merged()
+                    continue
+
+                if deltas:
+                    yield merged()
+                yield event
+
+            if deltas:
+                yield merged()
+        finally:
+            if pending and not pending.done():
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+            await events.aclose()
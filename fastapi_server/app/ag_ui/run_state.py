@@ -0,0 +1,315 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import socket
+import time
+from dataclasses import asdict, dataclass
+from enum import Enum
+from pathlib import Path
+from typing import AsyncIterator, final
+
+from ag_ui.core import BaseEvent
+
+from app.ag_ui.decoder import decode_event
+
+logger = logging.getLogger(__name__)
+
+
+class RunStateBackendName(str, Enum):
+    """Run state backends, selectable with the `RUN_STATE_BACKEND` setting."""
+
+    # Runs are only known to the replica that runs them.
+    MEMORY = "memory"
+    # Runs are shared through a directory (`RUN_STATE_DIRECTORY`), see `FileRunState`.
+    FILE = "file"
+
+
+def default_replica_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    """Who runs a run, and whether it has finished."""
+
+    run_id: str
+    thread_id: str
+    owner: str
+    finished: bool = False
+    # When the owner last published an event or finished the run (seconds since epoch)
+    updated_at: float = 0.0
+    # The user who started the run, if any
+    user_uuid: str | None = None
+
+
+class RunStateBackend(abc.ABC):
+    """
+    Shares the runs of `AGUIStreamManager` between the replicas of the application:
+    the replica that runs an agent records that it owns the run and relays its events,
+    so that any other replica can serve clients that follow or resume the run.
+    """
+
+    @abc.abstractmethod
+    async def claim(
+        self, run_id: str, thread_id: str, owner: str, user_uuid: str | None = None
+    ) -> None: ...
+
+    @abc.abstractmethod
+    async def append(self, run_id: str, event_id: int, event: BaseEvent) -> None: ...
+
+    @abc.abstractmethod
+    async def finish(self, run_id: str) -> None: ...
+
+    @abc.abstractmethod
+    async def lookup(self, run_id: str) -> RunRecord | None:
+        """The run's record, or None if it is unknown (or expired)."""
+
+    @abc.abstractmethod
+    async def read(self, run_id: str, after: int = -1) -> list[tuple[int, BaseEvent]]:
+        """The run's events recorded so far after the event with ID `after`."""
+
+    @abc.abstractmethod
+    def events(
+        self, run_id: str, after: int = -1
+    ) -> AsyncIterator[tuple[int, BaseEvent]]:
+        """
+        The run's events after the event with ID `after`, followed until the run
+        finishes, or until its owner stops updating it for too long.
+        """
+
+
+@final
+class InProcessRunState(RunStateBackend):
+    """
+    The default for a single replica: runs only live in the process that runs them
+    (in its `EventBroker`), so there is nothing to record or relay.
+    """
+
+    async def claim(
+        self, run_id: str, thread_id: str, owner: str, user_uuid: str | None = None
+    ) -> None:
+        pass
+
+    async def append(self, run_id: str, event_id: int, event: BaseEvent) -> None:
+        pass
+
+    async def finish(self, run_id: str) -> None:
+        pass
+
+    async def lookup(self, run_id: str) -> RunRecord | None:
+        return None
+
+    async def read(self, run_id: str, after: int = -1) -> list[tuple[int, BaseEvent]]:
+        return []
+
+    async def events(
+        self, run_id: str, after: int = -1
+    ) -> AsyncIterator[tuple[int, BaseEvent]]:
+        return
+        yield
+
+
+@final
+class FileRunState(RunStateBackend):
+    """
+    Records runs and their events in a directory shared by the replicas (e.g. several
+    workers on one host, or a shared volume): one directory per run with a `run.json`
+    record and an `events.jsonl` log, which followers poll every `poll_interval`.
+
+    Finished runs are removed `retention_seconds` after they finish. A run whose owner
+    has not updated it for `stale_seconds` (agent runs send heartbeats) is considered
+    abandoned by its followers, and is removed `retention_seconds` later. Expired runs
+    are swept when runs finish, at most once every `retention_seconds`.
+
+    Files are read and written in a worker thread, off the event loop.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        retention_seconds: float = 60.0,
+        stale_seconds: float = 300.0,
+        poll_interval: float = 0.1,
+    ):
+        self._directory = directory
+        self._retention_seconds = retention_seconds
+        self._stale_seconds = stale_seconds
+        self._poll_interval = poll_interval
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._swept_at = 0.0
+
+    async def claim(
+        self, run_id: str, thread_id: str, owner: str, user_uuid: str | None = None
+    ) -> None:
+        await asyncio.to_thread(self._claim, run_id, thread_id, owner, user_uuid)
+
+    async def append(self, run_id: str, event_id: int, event: BaseEvent) -> None:
+        line = json.dumps(
+            {
+                "id": event_id,
+                "event": event.model_dump(
+                    mode="json", by_alias=True, exclude_none=True
+                ),
+            }
+        )
+        await asyncio.to_thread(self._append, run_id, line)
+
+    async def finish(self, run_id: str) -> None:
+        await asyncio.to_thread(self._finish, run_id)
+
+    async def lookup(self, run_id: str) -> RunRecord | None:
+        return await asyncio.to_thread(self._lookup, run_id)
+
+    async def read(self, run_id: str, after: int = -1) -> list[tuple[int, BaseEvent]]:
+        events, _ = await asyncio.to_thread(self._read_events, run_id, after, 0)
+        return events
+
+    async def events(
+        self, run_id: str, after: int = -1
+    ) -> AsyncIterator[tuple[int, BaseEvent]]:
+        offset = 0
+        while True:
+            record, events, offset, updated_at = await asyncio.to_thread(
+                self._poll, run_id, after, offset
+            )
+            for event in events:
+                yield event
+            if events:
+                after = events[-1][0]
+            if not record or record.finished:
+                return
+            if time.time() - updated_at > self._stale_seconds:
+                logger.warning("Run %s was abandoned by %s", run_id, record.owner)
+                return
+            await asyncio.sleep(self._poll_interval)
+
+    def _claim(
+        self, run_id: str, thread_id: str, owner: str, user_uuid: str | None
+    ) -> None:
+        run_dir = self._run_dir(run_id)
+        if run_dir.exists():
+            # A finished run ID that is reused starts over.
+            shutil.rmtree(run_dir, ignore_errors=True)
+        run_dir.mkdir(parents=True)
+        (run_dir / "events.jsonl").touch()
+        self._write_record(
+            RunRecord(
+                run_id, thread_id, owner, updated_at=time.time(), user_uuid=user_uuid
+            )
+        )
+
+    def _append(self, run_id: str, line: str) -> None:
+        with open(self._run_dir(run_id) / "events.jsonl", "a") as f:
+            f.write(line + "\n")
+        os.utime(self._run_dir(run_id) / "run.json")
+
+    def _finish(self, run_id: str) -> None:
+        record = self._read_record(run_id)
+        if record:
+            self._write_record(
+                RunRecord(
+                    run_id,
+                    record.thread_id,
+                    record.owner,
+                    finished=True,
+                    updated_at=time.time(),
+                    user_uuid=record.user_uuid,
+                )
+            )
+        if time.monotonic() - self._swept_at >= self._retention_seconds:
+            self._swept_at = time.monotonic()
+            self._sweep()
+
+    def _lookup(self, run_id: str) -> RunRecord | None:
+        record = self._read_record(run_id)
+        if record and self._expired(record):
+            shutil.rmtree(self._run_dir(run_id), ignore_errors=True)
+            return None
+        return record
+
+    def _poll(
+        self, run_id: str, after: int, offset: int
+    ) -> tuple[RunRecord | None, list[tuple[int, BaseEvent]], int, float]:
+        """The record, the new events (see `_read_events`) and the last update time."""
+        record = self._read_record(run_id)
+        events, offset = self._read_events(run_id, after, offset)
+        return record, events, offset, self._updated_at(run_id)
+
+    def _sweep(self) -> None:
+        """Remove the runs that have expired."""
+        for run_dir in self._directory.iterdir():
+            try:
+                data = json.loads((run_dir / "run.json").read_text())
+            except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+                # Not a run, or one that is being claimed.
+                continue
+            if self._expired(RunRecord(**data)):
+                shutil.rmtree(run_dir, ignore_errors=True)
+                logger.debug("Removed expired run %s", data["run_id"])
+
+    def _expired(self, record: RunRecord) -> bool:
+        now = time.time()
+        if record.finished:
+            return now - record.updated_at > self._retention_seconds
+        stale = self._stale_seconds + self._retention_seconds
+        return now - self._updated_at(record.run_id) > stale
+
+    def _run_dir(self, run_id: str) -> Path:
+        # Run IDs come from clients, so they are never used as paths themselves.
+        return self._directory / hashlib.sha256(run_id.encode()).hexdigest()
+
+    def _read_events(
+        self, run_id: str, after: int, offset: int
+    ) -> tuple[list[tuple[int, BaseEvent]], int]:
+        """The events after `after` logged from byte `offset` on, and the new offset."""
+        events = []
+        try:
+            with open(self._run_dir(run_id) / "events.jsonl") as f:
+                f.seek(offset)
+                # Only complete lines; the owner may be writing the last one.
+                while (line := f.readline()).endswith("\n"):
+                    offset = f.tell()
+                    entry = json.loads(line)
+                    if entry["id"] > after:
+                        events.append((entry["id"], decode_event(entry["event"])))
+        except FileNotFoundError:
+            pass
+        return events, offset
+
+    def _updated_at(self, run_id: str) -> float:
+        try:
+            return (self._run_dir(run_id) / "run.json").stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def _read_record(self, run_id: str) -> RunRecord | None:
+        try:
+            data = json.loads((self._run_dir(run_id) / "run.json").read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return RunRecord(**data)
+
+    def _write_record(self, record: RunRecord) -> None:
+        path = self._run_dir(record.run_id) / "run.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(record)))
+        # Atomic, so that readers never see a partial record.
+        tmp.replace(path)
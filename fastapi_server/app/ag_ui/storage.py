@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
 from dataclasses import dataclass
@@ -51,6 +52,7 @@ from app.messages import (
     MessageReasoning,
     MessageReasoningCreate,
     MessageReasoningUpdate,
+    MessageRelationship,
     MessageRepository,
     MessageToolCall,
     MessageToolCallCreate,
@@ -61,6 +63,8 @@ from app.messages import (
 
 logger = logging.getLogger(__name__)
 
+RUN_CANCELLED_MESSAGE = "Run cancelled"
+
 
 @dataclass
 class StorageStateMachineState:
@@ -181,56 +185,64 @@ class AGUIAgentWithStorage(AGUIAgent):
                 )
 
         state = StorageStateMachineState()
+        finished = False
+
+        try:
+            async for event in self._inner.run(input):
+                if isinstance(event, RunStartedEvent):
+                    state = StorageStateMachineState()
+                    finished = False
+                if isinstance(event, RunFinishedEvent):
+                    finished = True
+                    await self._close_active(state, None)
+                if isinstance(event, RunErrorEvent):
+                    finished = True
+                    if event.code:
+                        error = f"[{event.code}] {event.message}"
+                    else:
+                        error = event.message
+                    await self._close_active(state, error)
+
+                if isinstance(event, StepStartedEvent):
+                    state.active_step = event.step_name
+                if isinstance(event, StepFinishedEvent):
+                    state.active_step = None
+
+                await self._handle_text_message_events(state, existing_chat, event)
+                await self._handle_tool_call_events(state, existing_chat, event)
+                await self._handle_reasoning_event(state, existing_chat, event)
+
+                yield event
+        except (asyncio.CancelledError, GeneratorExit):
+            # The run was cancelled (or abandoned) midway: leave no message in progress.
+            if not finished:
+                await self._close_active(
+                    state, f"[{ErrorCodes.RUN_CANCELLED.value}] {RUN_CANCELLED_MESSAGE}"
+                )
+            raise
 
-        async for event in self._inner.run(input):
-            if isinstance(event, RunStartedEvent):
-                state = StorageStateMachineState()
-            if isinstance(event, RunFinishedEvent):
-                if state.active_message:
-                    await self._message_repo.update_message(
-                        state.active_message.uuid, MessageUpdate(in_progress=False)
-                    )
-                if state.active_reasoning:
-                    await self._message_repo.update_message_reasoning(
-                        state.active_reasoning.uuid,
-                        MessageReasoningUpdate(in_progress=False),
-                    )
-                if state.active_tool_call:
-                    await self._message_repo.update_message_tool_call(
-                        state.active_tool_call.uuid,
-                        MessageToolCallUpdate(in_progress=False),
-                    )
-            if isinstance(event, RunErrorEvent):
-                if event.code:
-                    error = f"[{event.code}] {event.message}"
-                else:
-                    error = event.message
-                if state.active_message:
-                    await self._message_repo.update_message(
-                        state.active_message.uuid,
-                        MessageUpdate(in_progress=False, error=error),
-                    )
-                if state.active_reasoning:
-                    await self._message_repo.update_message_reasoning(
-                        state.active_reasoning.uuid,
-                        MessageReasoningUpdate(in_progress=False, error=error),
-                    )
-                if state.active_tool_call:
-                    await self._message_repo.update_message_tool_call(
-                        state.active_tool_call.uuid,
-                        MessageToolCallUpdate(in_progress=False, error=error),
-                    )
-
-            if isinstance(event, StepStartedEvent):
-                state.active_step = event.step_name
-            if isinstance(event, StepFinishedEvent):
-                state.active_step = None
-
-            await self._handle_text_message_events(state, existing_chat, event)
-            await self._handle_tool_call_events(state, existing_chat, event)
-            await self._handle_reasoning_event(state, existing_chat, event)
-
-            yield event
+    async def _close_active(
+        self, state: StorageStateMachineState, error: str | None
+    ) -> None:
+        """Persist the active message, reasoning and tool call as no longer in progress."""
+        if state.active_message:
+            message_update = MessageUpdate(in_progress=False, error=error)
+            if state.unpersisted_characters:
+                message_update.content = state.active_message.content
+                state.unpersisted_characters = 0
+            await self._message_repo.update_message(
+                state.active_message.uuid, message_update
+            )
+        if state.active_reasoning:
+            await self._message_repo.update_message_reasoning(
+                state.active_reasoning.uuid,
+                MessageReasoningUpdate(in_progress=False, error=error),
+            )
+        if state.active_tool_call:
+            await self._message_repo.update_message_tool_call(
+                state.active_tool_call.uuid,
+                MessageToolCallUpdate(in_progress=False, error=error),
+            )
 
     async def _handle_reasoning_event(
         self, state: StorageStateMachineState, existing_chat: Chat, event: BaseEvent
@@ -259,38 +271,7 @@ class AGUIAgentWithStorage(AGUIAgent):
                 )
             )
         if isinstance(event, ThinkingTextMessageContentEvent):
-            await self._ensure_message_exists(state, existing_chat, None, None)
-            assert state.active_message, "Message created"
-            if not state.active_reasoning:
-                # We need to ensure that active message is loaded here so that `reasonings` is live.
-                assert state.active_message.chat_id and state.active_message.agui_id
-                state.active_message = await self._message_repo.get_message_by_agui_id(
-                    state.active_message.chat_id, state.active_message.agui_id
-                )
-                assert state.active_message
-                if latest_reasoning := next(
-                    iter(
-                        sorted(
-                            filter(
-                                lambda r: r.in_progress, state.active_message.reasonings
-                            ),
-                            key=lambda r: r.created_at,
-                            reverse=True,
-                        )
-                    ),
-                    None,
-                ):
-                    state.active_reasoning = latest_reasoning
-                else:
-                    state.active_reasoning = (
-                        await self._message_repo.create_message_reasoning(
-                            MessageReasoningCreate(
-                                role=Role.REASONING.value,
-                                message_uuid=state.active_message.uuid,
-                                name=state.active_reasoning_title or "",
-                            )
-                        )
-                    )
+            await self._ensure_reasoning_exists(state, existing_chat)
             assert state.active_reasoning
             new_content = state.active_reasoning.content
             if isinstance(event.delta, str):
@@ -306,38 +287,50 @@ class AGUIAgentWithStorage(AGUIAgent):
                 state.active_reasoning.uuid, MessageReasoningUpdate(content=new_content)
             )
         if isinstance(event, ThinkingTextMessageEndEvent):
-            await self._ensure_message_exists(state, existing_chat, None, None)
-            assert state.active_message, "Message created"
-            if not state.active_reasoning:
-                if latest_reasoning := next(
-                    iter(
-                        sorted(
-                            filter(
-                                lambda r: r.in_progress, state.active_message.reasonings
-                            ),
-                            key=lambda r: r.created_at,
-                            reverse=True,
-                        )
-                    ),
-                    None,
-                ):
-                    state.active_reasoning = latest_reasoning
-                else:
-                    state.active_reasoning = (
-                        await self._message_repo.create_message_reasoning(
-                            MessageReasoningCreate(
-                                role=Role.REASONING.value,
-                                message_uuid=state.active_message.uuid,
-                                name=state.active_reasoning or "",
-                            )
-                        )
-                    )
+            await self._ensure_reasoning_exists(state, existing_chat)
             assert state.active_reasoning
             await self._message_repo.update_message_reasoning(
                 state.active_reasoning.uuid, MessageReasoningUpdate(in_progress=False)
             )
             state.active_reasoning = None
 
+    async def _ensure_reasoning_exists(
+        self, state: StorageStateMachineState, existing_chat: Chat
+    ) -> None:
+        """
+        Ensure there is an active reasoning: the latest one of the active message that
+        is still in progress, or a new one.
+        """
+        await self._ensure_message_exists(state, existing_chat, None, None)
+        assert state.active_message, "Message created"
+        if state.active_reasoning:
+            return
+        # Only the reasonings are read from the database: `state.active_message` may
+        # hold content that is not persisted yet.
+        message = await self._message_repo.get_message(
+            state.active_message.uuid, load={MessageRelationship.REASONINGS}
+        )
+        assert message
+        if latest_reasoning := next(
+            iter(
+                sorted(
+                    filter(lambda r: r.in_progress, message.reasonings),
+                    key=lambda r: r.created_at,
+                    reverse=True,
+                )
+            ),
+            None,
+        ):
+            state.active_reasoning = latest_reasoning
+        else:
+            state.active_reasoning = await self._message_repo.create_message_reasoning(
+                MessageReasoningCreate(
+                    role=Role.REASONING.value,
+                    message_uuid=state.active_message.uuid,
+                    name=state.active_reasoning_title or "",
+                )
+            )
+
     async def _handle_tool_call_events(
         self, state: StorageStateMachineState, existing_chat: Chat, event: BaseEvent
     ) -> None:
@@ -13,26 +13,160 @@
 # limitations under the License.
 
 import asyncio
-import queue
-from collections.abc import AsyncGenerator
+import logging
+from collections import deque
+from dataclasses import dataclass, field
 from functools import partial
-from typing import Callable, Dict, Generic, ParamSpec, final
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Generic, Hashable, ParamSpec, final
 from uuid import UUID
 
-from ag_ui.core import BaseEvent, RunAgentInput
+from ag_ui.core import (
+    BaseEvent,
+    CustomEvent,
+    RunAgentInput,
+    RunErrorEvent,
+    RunStartedEvent,
+)
 
 from app.ag_ui.base import AGUIAgent
+from app.ag_ui.broker import EventBroker, RunChannel, Subscription
+from app.ag_ui.clients import OpenAIClientPool
 from app.ag_ui.dr import DataRobotAGUIAgent
-from app.ag_ui.storage import AGUIAgentWithStorage
+from app.ag_ui.error_codes import ErrorCodes
+from app.ag_ui.merge import AGUIAgentWithDeltaMerging
+from app.ag_ui.run_state import (
+    FileRunState,
+    InProcessRunState,
+    RunStateBackend,
+    RunStateBackendName,
+    default_replica_id,
+)
+from app.ag_ui.storage import RUN_CANCELLED_MESSAGE, AGUIAgentWithStorage
 from app.chats import ChatRepository
 from app.config import Config
 from app.messages import MessageRepository
 
+logger = logging.getLogger(__name__)
+
 P = ParamSpec("P")
 
+QUEUE_POSITION_EVENT = "QueuePosition"
+
+
+class RunNotAdmitted(Exception):
+    """Raised when a run is refused because the run queue is full or the server is shutting down."""
+
+
+@dataclass(eq=False)
+class RunTicket:
+    """A run's place in the `RunScheduler`: granted, or waiting at `position` (1-based)."""
+
+    owner: Hashable
+    granted: bool = False
+    position: int = 0
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@final
+class RunScheduler:
+    """
+    Admits agent runs under a global and a per-owner (user) concurrency limit.
+
+    Runs beyond the limits wait in a fair queue: owners take turns round-robin, and
+    each owner's runs start in the order they were submitted.
+    """
+
+    def __init__(
+        self, max_concurrent: int, max_concurrent_per_owner: int, max_queued: int
+    ):
+        self._max_concurrent = max_concurrent
+        self._max_concurrent_per_owner = max_concurrent_per_owner
+        self._max_queued = max_queued
+        self._running: dict[Hashable, int] = {}
+        self._waiting: dict[Hashable, deque[RunTicket]] = {}
+        # Owners with waiting runs, in the order they get their next turn
+        self._turns: deque[Hashable] = deque()
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._waiting.values())
+
+    def submit(self, owner: Hashable) -> RunTicket:
+        """
+        Get a ticket for a new run, granted right away if the limits allow it.
+        Raises RunNotAdmitted if the run would have to wait and the queue is full.
+        """
+        ticket = RunTicket(owner)
+        if self.running < self._max_concurrent and self._can_start(owner):
+            self._start(ticket)
+            return ticket
+        if self.queued >= self._max_queued:
+            raise RunNotAdmitted("Too many agent runs are waiting, try again later")
+
+        if owner not in self._waiting:
+            self._waiting[owner] = deque()
+            self._turns.append(owner)
+        self._waiting[owner].append(ticket)
+        self._update_positions()
+        return ticket
+
+    def release(self, ticket: RunTicket) -> None:
+        """Release a finished run's slot, or withdraw a run that is still waiting."""
+        if ticket.granted:
+            self._running[ticket.owner] -= 1
+            if not self._running[ticket.owner]:
+                del self._running[ticket.owner]
+            self._dispatch()
+        elif (waiting := self._waiting.get(ticket.owner)) and ticket in waiting:
+            waiting.remove(ticket)
+            if not waiting:
+                del self._waiting[ticket.owner]
+                self._turns.remove(ticket.owner)
+        self._update_positions()
+
+    def _can_start(self, owner: Hashable) -> bool:
+        return (
+            self._running.get(owner, 0) < self._max_concurrent_per_owner
+            and owner not in self._waiting
+        )
+
+    def _start(self, ticket: RunTicket) -> None:
+        ticket.granted = True
+        self._running[ticket.owner] = self._running.get(ticket.owner, 0) + 1
+        ticket.changed.set()
 
-class NoMoreEvents:
-    pass
+    def _dispatch(self) -> None:
+        skipped = 0
+        while self._turns and skipped < len(self._turns):
+            if self.running >= self._max_concurrent:
+                return
+            owner = self._turns[0]
+            self._turns.rotate(-1)
+            if self._running.get(owner, 0) >= self._max_concurrent_per_owner:
+                skipped += 1
+                continue
+            skipped = 0
+            waiting = self._waiting[owner]
+            self._start(waiting.popleft())
+            if not waiting:
+                del self._waiting[owner]
+                self._turns.remove(owner)
+
+    def _update_positions(self) -> None:
+        queues = [list(self._waiting[owner]) for owner in self._turns]
+        position = 0
+        for turn in range(max((len(q) for q in queues), default=0)):
+            for queue in queues:
+                if turn < len(queue):
+                    position += 1
+                    if queue[turn].position != position:
+                        queue[turn].position = position
+                        queue[turn].changed.set()
 
 
 @final
@@ -41,37 +175,253 @@ class AGUIStreamManager(Generic[P]):
     This is a wrapper around an AGUIAgent that ensures that the whole output stream of the agent is consumed.
     The intention is to use this in concert with `AGUIAgentWithStorage` to make sure that the whole response
     from the agent is persisted even if the user disconnects from the stream midway.
+
+    Events are published to a per-run `RunChannel`, so more than one client (e.g. a second browser tab)
+    can follow the same run, and a client that lost its connection can resume it from the last event ID
+    it received.
+
+    With a shared `run_state` backend, runs are also recorded there and their events relayed through it,
+    so that clients can follow or resume them on any replica.
+
+    With a `scheduler`, runs are admitted under its concurrency limits, keyed by `run_owner` of the
+    agent factory arguments. A run that has to wait emits `RUN_STARTED` right away, followed by
+    `QueuePosition` custom events until the agent starts.
+
+    Runs in progress can be stopped with `cancel`, which ends their stream with a `RUN_ERROR` event.
     """
 
-    def __init__(self, agent_factory: Callable[P, AGUIAgent]):
+    def __init__(
+        self,
+        agent_factory: Callable[P, AGUIAgent],
+        broker: EventBroker[BaseEvent] | None = None,
+        scheduler: RunScheduler | None = None,
+        run_owner: Callable[P, Hashable] | None = None,
+        run_state: RunStateBackend | None = None,
+        replica_id: str | None = None,
+    ):
         self._agent_factory = agent_factory
+        self._broker: EventBroker[BaseEvent] = broker or EventBroker()
+        self._scheduler = scheduler
+        self._run_owner = run_owner
+        self._run_state = run_state or InProcessRunState()
+        self._replica_id = replica_id or default_replica_id()
+        self._tasks: set[asyncio.Task[None]] = set()
+        # Runs in progress, by run ID
+        self._runs: dict[str, asyncio.Task[None]] = {}
+        self._shutting_down = False
 
     async def run(
         self, input: RunAgentInput, *args: P.args, **kwargs: P.kwargs
-    ) -> AsyncGenerator[BaseEvent, None]:
-        q: queue.Queue[BaseEvent | NoMoreEvents] = queue.Queue()
+    ) -> Subscription[BaseEvent]:
+        """
+        Start the agent run in the background and subscribe to its events.
+        Raises ValueError if a run with the same ID is already in progress, and RunNotAdmitted if the
+        run queue is full or the manager is shutting down.
+        """
+        if self._shutting_down:
+            raise RunNotAdmitted("The server is shutting down")
 
-        async def populate_queue() -> None:
+        owner = self._run_owner(*args, **kwargs) if self._run_owner else None
+        user_uuid = str(owner) if owner is not None else None
+        ticket = None
+        if self._scheduler:
+            ticket = self._scheduler.submit(owner)
+        try:
+            channel = self._broker.open(input.run_id, input.thread_id, user_uuid)
+        except ValueError:
+            if self._scheduler and ticket:
+                self._scheduler.release(ticket)
+            raise
+        try:
+            subscription = channel.subscribe()
             agent = self._agent_factory(*args, **kwargs)
+            await self._run_state.claim(
+                input.run_id, input.thread_id, self._replica_id, user_uuid
+            )
+        except BaseException:
+            if self._scheduler and ticket:
+                self._scheduler.release(ticket)
+            self._broker.close(input.run_id)
+            raise
+
+        task = asyncio.create_task(self._drain(agent, input, channel, ticket))
+        self._tasks.add(task)
+        self._runs[input.run_id] = task
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(partial(self._forget_run, input.run_id))
+
+        return subscription
+
+    def cancel(self, run_id: str, thread_id: str, user_uuid: str | None) -> bool:
+        """
+        Cancel a run in progress, or withdraw it from the run queue. The agent's upstream stream is
+        closed and the run's subscribers receive a final `RUN_ERROR` event.
+        Returns False if no run with this ID is in progress in the thread for this user.
+        """
+        task = self._runs.get(run_id)
+        channel = self._broker.get(run_id)
+        if not task or task.done() or not _belongs_to(channel, thread_id, user_uuid):
+            return False
+        task.cancel()
+        return True
+
+    async def subscribe(
+        self,
+        run_id: str,
+        thread_id: str,
+        user_uuid: str | None,
+        after: int | None = None,
+    ) -> Subscription[BaseEvent] | None:
+        """
+        Subscribe to the events of a run after the event with ID `after` (see `RunChannel.subscribe`),
+        or to the events it publishes from now on. Runs of other replicas are followed through the
+        run state backend.
+        Returns None if the run is unknown, or is not a run of this user in the thread.
+        Raises ValueError if the requested events are no longer available.
+        """
+        channel = self._broker.get(run_id) or await self._relay(run_id)
+        if not channel or not _belongs_to(channel, thread_id, user_uuid):
+            return None
+        return channel.subscribe(after)
+
+    async def shutdown(self, timeout: float) -> None:
+        """
+        Stop accepting runs and wait up to `timeout` seconds for the runs in progress to finish,
+        then cancel the rest.
+        """
+        self._shutting_down = True
+        if not self._tasks:
+            return
+        logger.info("Waiting for %d agent runs to finish", len(self._tasks))
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _drain(
+        self,
+        agent: AGUIAgent,
+        input: RunAgentInput,
+        channel: RunChannel[BaseEvent],
+        ticket: RunTicket | None,
+    ) -> None:
+        try:
+            queued = ticket is not None and not ticket.granted
+            if ticket and queued:
+                await self._wait_for_turn(input, channel, ticket)
             async for event in agent.run(input):
-                q.put(event)
-            q.put(NoMoreEvents())
-
-        async def iterate_queue() -> AsyncGenerator[BaseEvent, None]:
-            while True:
-                try:
-                    e = q.get_nowait()
-                except queue.Empty:
-                    await asyncio.sleep(0.05)
+                if queued and isinstance(event, RunStartedEvent):
+                    # Already sent when the run was queued.
+                    queued = False
                     continue
-                if isinstance(e, NoMoreEvents):
-                    break
-                else:
-                    yield e
+                await self._publish(channel, event)
+        except asyncio.CancelledError:
+            logger.info("Agent run %s was cancelled", input.run_id)
+            await self._publish(
+                channel,
+                RunErrorEvent(
+                    message=RUN_CANCELLED_MESSAGE, code=ErrorCodes.RUN_CANCELLED.value
+                ),
+            )
+            raise
+        except Exception:
+            logger.exception("Agent run %s failed", input.run_id)
+            await self._publish(
+                channel,
+                RunErrorEvent(
+                    message="The agent run failed",
+                    code=ErrorCodes.INTERNAL_ERROR.value,
+                ),
+            )
+        finally:
+            if self._scheduler and ticket:
+                self._scheduler.release(ticket)
+            self._broker.close(input.run_id)
+            try:
+                await self._run_state.finish(input.run_id)
+            except Exception:
+                logger.exception("Could not record the end of run %s", input.run_id)
+
+    async def _publish(self, channel: RunChannel[BaseEvent], event: BaseEvent) -> None:
+        event_id = channel.end
+        await channel.publish(event)
+        try:
+            await self._run_state.append(channel.run_id, event_id, event)
+        except Exception:
+            # Other replicas miss the event, but the run and its local clients go on.
+            logger.exception("Could not relay an event of run %s", channel.run_id)
+
+    async def _relay(self, run_id: str) -> RunChannel[BaseEvent] | None:
+        """
+        Mirror a run of another replica into a local channel, so that its clients here can share it.
+        The events so far are replayed into the channel first, so it has the same event IDs.
+        """
+        record = await self._run_state.lookup(run_id)
+        if not record or record.owner == self._replica_id:
+            return None
+        channel = self._broker.open(run_id, record.thread_id, record.user_uuid)
+        last_event_id = -1
+        for last_event_id, event in await self._run_state.read(run_id):
+            await channel.publish(event)
+        if record.finished:
+            self._broker.close(run_id)
+            return channel
+        # Follow the rest in the background.
+        events = self._run_state.events(run_id, after=last_event_id)
+        task = asyncio.create_task(self._follow(channel, events))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return channel
+
+    async def _follow(
+        self,
+        channel: RunChannel[BaseEvent],
+        events: AsyncIterator[tuple[int, BaseEvent]],
+    ) -> None:
+        try:
+            async for _, event in events:
+                await channel.publish(event)
+        except Exception:
+            logger.exception("Relaying run %s failed", channel.run_id)
+        finally:
+            self._broker.close(channel.run_id)
+
+    def _forget_run(self, run_id: str, task: asyncio.Task[None]) -> None:
+        # The run ID may have been reused by a newer run in the meantime.
+        if self._runs.get(run_id) is task:
+            del self._runs[run_id]
 
-        asyncio.create_task(populate_queue())
+    async def _wait_for_turn(
+        self, input: RunAgentInput, channel: RunChannel[BaseEvent], ticket: RunTicket
+    ) -> None:
+        await self._publish(
+            channel, RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
+        )
+        reported = 0
+        while not ticket.granted:
+            ticket.changed.clear()
+            if ticket.position != reported:
+                reported = ticket.position
+                await self._publish(
+                    channel,
+                    CustomEvent(
+                        name=QUEUE_POSITION_EVENT,
+                        value={"run_id": input.run_id, "position": reported},
+                    ),
+                )
+            if not ticket.granted:
+                await ticket.changed.wait()
 
-        return iterate_queue()
+
+def _belongs_to(
+    channel: RunChannel[BaseEvent] | None, thread_id: str, user_uuid: str | None
+) -> bool:
+    # Thread IDs are chosen by clients and only unique per user.
+    return (
+        channel is not None
+        and channel.thread_id == thread_id
+        and channel.user_uuid == user_uuid
+    )
 
 
 def _normalize_model_id(raw_model: str) -> str:
@@ -90,17 +440,25 @@ def create_storage_dr_agent(
     chat_repo: ChatRepository,
     message_repo: MessageRepository,
     config: Config,
+    clients: OpenAIClientPool | None,
     user_id: UUID,
     headers: Dict[str, str],
 ) -> AGUIAgent:
-    dr_agui = DataRobotAGUIAgent(name, config, headers)
+    agent: AGUIAgent = DataRobotAGUIAgent(name, config, headers, clients=clients)
+    if config.text_delta_merge_max_chars > 1:
+        agent = AGUIAgentWithDeltaMerging(
+            name,
+            agent,
+            max_chars=config.text_delta_merge_max_chars,
+            max_delay=config.text_delta_merge_max_delay_seconds,
+        )
 
     storage = AGUIAgentWithStorage(
         name=name,
         user_id=user_id,
         chat_repo=chat_repo,
         message_repo=message_repo,
-        inner=dr_agui,
+        inner=agent,
         minimal_chunk_to_persist=config.minimal_chunks_to_persist,
     )
 
@@ -112,6 +470,26 @@ def create_stream_manager(
     chat_repo: ChatRepository,
     message_repo: MessageRepository,
     config: Config,
+    clients: OpenAIClientPool | None = None,
 ) -> AGUIStreamManager[UUID, Dict[str, str]]:
-    factory = partial(create_storage_dr_agent, name, chat_repo, message_repo, config)
-    return AGUIStreamManager(factory)
+    factory = partial(
+        create_storage_dr_agent, name, chat_repo, message_repo, config, clients
+    )
+    scheduler = RunScheduler(
+        max_concurrent=config.max_concurrent_runs,
+        max_concurrent_per_owner=config.max_concurrent_runs_per_user,
+        max_queued=config.max_queued_runs,
+    )
+    run_state: RunStateBackend | None = None
+    if config.run_state_backend == RunStateBackendName.FILE:
+        run_state = FileRunState(
+            Path(config.run_state_directory),
+            retention_seconds=config.run_event_retention_seconds,
+        )
+    return AGUIStreamManager(
+        factory,
+        EventBroker(config.run_event_buffer_size, config.run_event_retention_seconds),
+        scheduler,
+        run_owner=lambda user_id, headers: user_id,
+        run_state=run_state,
+    )
@@ -0,0 +1,138 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Anomaly detection over the timeseries of a report stored in DuckDB.
+
+The divergence of the power from its prediction is computed for the whole
+series in one SQL query: its absolute and relative size, and its z-score
+against the preceding readings (a rolling window).  Readings beyond any of the
+configured thresholds are flagged as anomalies in ``report_timeseries`` and
+summarized for the divergence-analysis agent.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid as uuidpkg
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from app.analysis_duckdb import TIMESERIES_TABLE, DuckDBConnectionManager
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AnomalyThresholds:
+    """When a reading's power diverges too much from its prediction."""
+
+    # Absolute divergence (kWh)
+    divergence_kwh: float | None = 100.0
+    # Divergence relative to the prediction (%)
+    divergence_pct: float | None = None
+    # Z-score of the divergence against the `window` preceding readings
+    zscore: float | None = None
+    window: int = 60
+
+    @classmethod
+    def from_config(cls, config: Config) -> AnomalyThresholds:
+        return cls(
+            divergence_kwh=config.analysis_anomaly_divergence_kwh,
+            divergence_pct=config.analysis_anomaly_divergence_pct,
+            zscore=config.analysis_anomaly_zscore,
+            window=config.analysis_anomaly_window,
+        )
+
+
+_DIVERGENCE = f"""
+    SELECT "timestamp", power, power_prediction, diff,
+           CASE WHEN power_prediction != 0
+                THEN diff / abs(power_prediction) * 100 ELSE 0 END AS diff_pct,
+           -- Against the preceding readings only, so that a spike does not
+           -- raise its own baseline.
+           (diff - avg(diff) OVER baseline)
+               / nullif(stddev_samp(diff) OVER baseline, 0) AS zscore
+    FROM (
+        SELECT "timestamp", power, power_prediction,
+               power - power_prediction AS diff
+        FROM {TIMESERIES_TABLE}
+        WHERE report_uuid = $report_uuid
+    )
+    WINDOW baseline AS (
+        ORDER BY "timestamp" ROWS BETWEEN {{window}} PRECEDING AND 1 PRECEDING
+    )
+    ORDER BY "timestamp"
+"""
+
+
+def _beyond(values: np.ndarray, threshold: float | None) -> np.ndarray:
+    """Whether the values exceed the threshold in magnitude (never if unset/NULL)."""
+    if threshold is None:
+        return np.zeros(len(values), dtype=bool)
+    magnitude = np.abs(np.ma.filled(np.ma.asarray(values, dtype=np.float64), np.nan))
+    with np.errstate(invalid="ignore"):
+        return magnitude > threshold
+
+
+def _as_python(value: Any) -> Any:
+    return None if value is np.ma.masked else value.item()
+
+
+def detect_anomalies(
+    db: DuckDBConnectionManager,
+    report_uuid: uuidpkg.UUID,
+    thresholds: AnomalyThresholds,
+) -> list[dict[str, Any]]:
+    """Flag the anomalies of a report's timeseries.
+
+    The ``is_anomaly`` column of the report's rows is set to whether they are
+    beyond any of the ``thresholds``.
+
+    Returns:
+        The anomalies in timestamp order, as dicts with keys: timestamp, power,
+        power_prediction, diff, diff_pct (relative to the prediction) and zscore
+        (None without enough preceding readings).
+    """
+    if thresholds.window < 2:
+        raise ValueError("The z-score window needs at least 2 readings")
+    with db.writer() as con:
+        series = con.execute(
+            _DIVERGENCE.format(window=int(thresholds.window)),
+            {"report_uuid": report_uuid},
+        ).fetchnumpy()
+        flagged = (
+            _beyond(series["diff"], thresholds.divergence_kwh)
+            | _beyond(series["diff_pct"], thresholds.divergence_pct)
+            | _beyond(series["zscore"], thresholds.zscore)
+        )
+        con.register("anomaly_timestamps", {"ts": series["timestamp"][flagged]})
+        try:
+            con.execute(
+                f"""
+                UPDATE {TIMESERIES_TABLE}
+                SET is_anomaly = "timestamp" IN (SELECT ts FROM anomaly_timestamps)
+                WHERE report_uuid = $report_uuid
+                """,
+                {"report_uuid": report_uuid},
+            )
+        finally:
+            con.unregister("anomaly_timestamps")
+    logger.info("Detected %d anomalies in %s", int(flagged.sum()), report_uuid)
+    return [
+        {name: _as_python(values[i]) for name, values in series.items()}
+        for i in np.flatnonzero(flagged)
+    ]
@@ -14,33 +14,172 @@
 
 """DuckDB helper for persisting per-report timeseries chart data.
 
-Each analysis report stores its raw timeseries rows in a dedicated DuckDB
-table named ``ts_<uuid_hex>``.  The DuckDB file is automatically synced to
-DataRobot persistent storage via ``DRFileSystem`` when running inside a
-Custom Application container.
+The timeseries rows of all analysis reports are stored in a single
+``report_timeseries`` table keyed by ``report_uuid`` and ``timestamp``.  Each
+report's rows are inserted together in timestamp order, so DuckDB's zone maps
+prune both the per-report filters and time ranges.  The process keeps a
+single connection to the DuckDB file (see ``DuckDBConnectionManager``),
+which is synced to DataRobot persistent storage via ``DRFileSystem`` when
+running inside a Custom Application container.
 """
 
 from __future__ import annotations
 
+import importlib.util
 import logging
 import re
+import tempfile
+import threading
 import uuid as uuidpkg
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from core.persistent_fs.duckdb_extension import connect_dr_fs
+import duckdb
+import numpy as np
+from core.persistent_fs.dr_file_system import (
+    DRFileSystem,
+    all_env_variables_present,
+    calculate_checksum,
+)
+
+from app.config import Config
+from app.snowflake import SnowflakeClient
 
 logger = logging.getLogger(__name__)
 
 DUCKDB_PATH = ".data/analysis_timeseries.duckdb"
 
 
-def _table_name(report_uuid: uuidpkg.UUID) -> str:
-    return f"ts_{report_uuid.hex}"
+class DuckDBConnectionManager:
+    """One read-write DuckDB connection per process, shared by all requests.
+
+    The database is opened (and downloaded from persistent storage, if any)
+    on first use.  Every caller gets its own cursor, a ``duplicate()`` of the
+    shared connection, so that it can be used from any thread.  Writers are
+    serialized, and the file is published to persistent storage by a
+    checkpoint at most once every ``checkpoint_delay`` seconds after a write,
+    and on ``close()``, rather than after every call.  A failed checkpoint is
+    retried ``checkpoint_delay`` seconds later.
+    """
+
+    def __init__(
+        self,
+        database: str = DUCKDB_PATH,
+        checkpoint_delay: float = 5.0,
+        fs: DRFileSystem | None = None,
+    ) -> None:
+        self._database = database
+        self._checkpoint_delay = checkpoint_delay
+        self._fs = fs
+        self._con: duckdb.DuckDBPyConnection | None = None
+        self._checksum = b""
+        self._open_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    @classmethod
+    def from_config(cls, config: Config) -> DuckDBConnectionManager:
+        return cls(
+            config.analysis_duckdb_path,
+            checkpoint_delay=config.analysis_duckdb_checkpoint_delay_seconds,
+            fs=DRFileSystem() if all_env_variables_present() else None,
+        )
+
+    def _connection(self) -> duckdb.DuckDBPyConnection:
+        with self._open_lock:
+            if self._con is None:
+                Path(self._database).parent.mkdir(parents=True, exist_ok=True)
+                if self._fs and self._fs.exists(self._database):
+                    self._fs.get(self._database, self._database)
+                    self._checksum = calculate_checksum(self._database)
+                self._con = duckdb.connect(self._database)
+                _ensure_table(self._con)
+            return self._con
+
+    @contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """A cursor for reads, closed on exit."""
+        cur = self._connection().duplicate()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+    @contextmanager
+    def writer(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """A cursor for writes, one writer at a time, in a single transaction."""
+        with self._write_lock, self.cursor() as cur:
+            cur.begin()
+            try:
+                yield cur
+            except BaseException:
+                cur.rollback()
+                raise
+            cur.commit()
+        self._schedule_checkpoint()
+
+    def _schedule_checkpoint(self) -> None:
+        if not self._fs:
+            return
+        with self._open_lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self._checkpoint_delay, self.checkpoint)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def checkpoint(self) -> None:
+        """Write the WAL into the database file and publish it if it changed."""
+        with self._open_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        with self._write_lock:
+            if self._con is None:
+                return
+            try:
+                self._con.execute("CHECKPOINT")
+                if not self._fs:
+                    return
+                checksum = calculate_checksum(self._database)
+                if checksum == self._checksum:
+                    return
+                self._fs.put(self._database, self._database)
+            except Exception:
+                # Runs on a timer thread, where an exception would only be printed.
+                logger.exception("Failed to checkpoint %s", self._database)
+                self._schedule_checkpoint()
+                return
+            self._checksum = checksum
+
+    def close(self) -> None:
+        """Publish pending writes and close the connection."""
+        self.checkpoint()
+        with self._write_lock, self._open_lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
 
 
-def _ensure_dir() -> None:
-    Path(DUCKDB_PATH).parent.mkdir(parents=True, exist_ok=True)
+TIMESERIES_TABLE = "report_timeseries"
+
+_COLUMNS = [
+    "timestamp",
+    "temperature",
+    "fluid_temperature",
+    "pressure",
+    "power",
+    "power_prediction",
+    "flow",
+    "is_anomaly",
+]
+
+
+def _legacy_table_name(report_uuid: uuidpkg.UUID) -> str:
+    """The table of a report saved before ``report_timeseries`` existed."""
+    return f"ts_{report_uuid.hex}"
 
 
 def _validate_table_name(name: str) -> str:
@@ -50,105 +189,497 @@ def _validate_table_name(name: str) -> str:
     return name
 
 
+def _ensure_table(con: duckdb.DuckDBPyConnection) -> None:
+    con.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TIMESERIES_TABLE} (
+            report_uuid          UUID NOT NULL,
+            "timestamp"          TIMESTAMP NOT NULL,
+            temperature          DOUBLE,
+            fluid_temperature    DOUBLE,
+            pressure             DOUBLE,
+            power                DOUBLE,
+            power_prediction     DOUBLE,
+            flow                 DOUBLE,
+            is_anomaly           BOOLEAN
+        )
+        """
+    )
+
+
+def _as_timestamp(value: Any) -> Any:
+    """A naive timestamp; aware ones are converted to UTC first."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def timeseries_columns(rows: list[dict[str, Any]]) -> dict[str, np.ndarray]:
+    """Columnar NumPy arrays of timeseries rows (missing values are NaN/None)."""
+    return {
+        # Converted by DuckDB's scan, much faster than by NumPy.
+        "timestamp": np.array(
+            [_as_timestamp(r.get("timestamp")) for r in rows], dtype=object
+        ),
+        **{
+            name: np.array([r.get(name) for r in rows], dtype=np.float64)
+            for name in _COLUMNS[1:-1]
+        },
+        "is_anomaly": np.array([bool(r.get("is_anomaly")) for r in rows]),
+    }
+
+
+def _insert_from(
+    con: duckdb.DuckDBPyConnection,
+    report_uuid: uuidpkg.UUID,
+    source: str,
+    timestamp: str = '"timestamp"',
+    params: dict[str, Any] | None = None,
+) -> int:
+    """Insert a report's rows from a table or registered view, in bulk.
+
+    ``timestamp`` is the SQL expression of the rows' timestamps.
+    """
+    result = con.execute(
+        f"""
+        INSERT INTO {TIMESERIES_TABLE}
+        SELECT $report_uuid, ts, temperature, fluid_temperature, pressure,
+               power, power_prediction, flow, coalesce(is_anomaly, false)
+        FROM (SELECT *, {timestamp} AS ts FROM "{source}")
+        WHERE ts IS NOT NULL
+        -- Rows in timestamp order keep the zone maps of each row group tight.
+        ORDER BY ts
+        """,
+        {"report_uuid": report_uuid, **(params or {})},
+    ).fetchone()
+    return result[0] if result else 0
+
+
+def _insert_rows(
+    con: duckdb.DuckDBPyConnection,
+    report_uuid: uuidpkg.UUID,
+    rows: list[dict[str, Any]],
+) -> int:
+    if not rows:
+        return 0
+    # DuckDB scans the arrays directly, without binding parameters row by row.
+    con.register("incoming_timeseries", timeseries_columns(rows))
+    try:
+        count = _insert_from(con, report_uuid, "incoming_timeseries")
+    finally:
+        con.unregister("incoming_timeseries")
+    if count < len(rows):
+        logger.warning(
+            "Skipped %d timeseries rows without timestamp", len(rows) - count
+        )
+    return count
+
+
+def _has_legacy_table(db: DuckDBConnectionManager, report_uuid: uuidpkg.UUID) -> bool:
+    table = _validate_table_name(_legacy_table_name(report_uuid))
+    with db.cursor() as con:
+        found = con.execute(
+            "SELECT 1 FROM duckdb_tables() WHERE table_name = ?", [table]
+        ).fetchone()
+    return found is not None
+
+
+# The legacy tables have the chart labels (``MM/dd HH:mm``) without a year: it is
+# taken from the report's start date, or the following year for labels before it
+# (periods spanning New Year, or 02/29 outside of a leap year).
+_LABEL_TIMESTAMP = """
+    coalesce(
+        CASE WHEN try_strptime($year || '/' || "timestamp", '%Y/%m/%d %H:%M')
+                  >= $start_date
+             THEN try_strptime($year || '/' || "timestamp", '%Y/%m/%d %H:%M')
+        END,
+        try_strptime($next_year || '/' || "timestamp", '%Y/%m/%d %H:%M')
+    )
+"""
+
+
+def _migrate_legacy_table(
+    db: DuckDBConnectionManager, report_uuid: uuidpkg.UUID, start_date: str
+) -> None:
+    """Move a report's rows from its ``ts_<hex>`` table to ``report_timeseries``."""
+    table = _validate_table_name(_legacy_table_name(report_uuid))
+    start = date.fromisoformat(start_date)
+    with db.writer() as con:
+        count = _insert_from(
+            con,
+            report_uuid,
+            table,
+            _LABEL_TIMESTAMP,
+            {
+                "year": str(start.year),
+                "next_year": str(start.year + 1),
+                "start_date": start,
+            },
+        )
+        con.execute(f'DROP TABLE "{table}"')
+    logger.info("Migrated %d timeseries rows from %s", count, table)
+
+
 def save_timeseries(
+    db: DuckDBConnectionManager,
     report_uuid: uuidpkg.UUID,
     rows: list[dict[str, Any]],
 ) -> str:
-    """Persist timeseries rows to a DuckDB table.
+    """Persist timeseries rows of a report.
 
     Args:
+        db: The process's DuckDB connection manager.
         report_uuid: The UUID of the analysis report.
-        rows: List of dicts with keys: timestamp, temperature,
-              fluid_temperature, pressure, power, power_prediction,
-              flow, is_anomaly.
+        rows: List of dicts with keys: timestamp (a ``datetime``),
+              temperature, fluid_temperature, pressure, power,
+              power_prediction, flow, is_anomaly.
 
     Returns:
-        The DuckDB table name (``ts_<hex>``).
+        The DuckDB table name (``report_timeseries``).
     """
-    _ensure_dir()
-    table = _validate_table_name(_table_name(report_uuid))
-    con = connect_dr_fs(DUCKDB_PATH)
-    try:
-        con.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS "{table}" (
-                "timestamp"          VARCHAR,
-                temperature          DOUBLE,
-                fluid_temperature    DOUBLE,
-                pressure             DOUBLE,
-                power                DOUBLE,
-                power_prediction     DOUBLE,
-                flow                 DOUBLE,
-                is_anomaly           BOOLEAN
-            )
-            """
+    with db.writer() as con:
+        count = _insert_rows(con, report_uuid, rows)
+    logger.info("Saved %d timeseries rows of %s", count, report_uuid)
+    return TIMESERIES_TABLE
+
+
+# The readings of the sensors page joined with their predictions, named after the
+# columns of ``report_timeseries``.
+_SNOWFLAKE_TIMESERIES = """
+    SELECT d.TIMESTAMP AS "timestamp",
+           d.TEMPERATURE_C::DOUBLE AS "temperature",
+           d.FLUID_TEMPERATURE_C::DOUBLE AS "fluid_temperature",
+           d.PUMP_OUTLET_PRESSURE_MPA::DOUBLE AS "pressure",
+           d.POWER_CONSUMPTION_KWH::DOUBLE AS "power",
+           p.POWER_CONSUMPTION_KWH_PREDICTION::DOUBLE AS "power_prediction",
+           d.PUMP_FLOW_L_PER_H::DOUBLE AS "flow",
+           FALSE AS "is_anomaly"
+    FROM PUMP_SYSTEM_DATA d
+    LEFT JOIN PUMP_SYSTEM_DATA_PREDICTION p ON p.TIMESTAMP = d.TIMESTAMP
+    WHERE d.TIMESTAMP >= %(start)s AND d.TIMESTAMP < %(end)s
+    ORDER BY d.TIMESTAMP
+"""
+
+
+def ingest_snowflake_timeseries(
+    db: DuckDBConnectionManager,
+    report_uuid: uuidpkg.UUID,
+    snowflake: SnowflakeClient,
+    start_date: date,
+    end_date: date,
+) -> int:
+    """Pull the timeseries of a report from Snowflake straight into DuckDB.
+
+    The readings from ``start_date`` to ``end_date`` (inclusive) are fetched as
+    an Arrow table when ``pyarrow`` is installed, which DuckDB scans in place,
+    and as rows otherwise.
+
+    Returns:
+        The number of rows stored.
+    """
+    params = {
+        "start": datetime.combine(start_date, time()),
+        "end": datetime.combine(end_date + timedelta(days=1), time()),
+    }
+    source: Any
+    if _arrow_available():
+        source = snowflake.fetch_arrow(_SNOWFLAKE_TIMESERIES, params)
+    else:
+        source = timeseries_columns(
+            snowflake.execute_query(_SNOWFLAKE_TIMESERIES, params)
+        )
+    with db.writer() as con:
+        con.register("incoming_timeseries", source)
+        try:
+            count = _insert_from(con, report_uuid, "incoming_timeseries")
+        finally:
+            con.unregister("incoming_timeseries")
+    logger.info("Ingested %d timeseries rows of %s from Snowflake", count, report_uuid)
+    return count
+
+
+class TimeseriesFormat(str, Enum):
+    """Media types of the timeseries of a report, negotiated with ``Accept``."""
+
+    # A JSON array of row objects.
+    ROWS = "application/json"
+    # A JSON object with one array per column.
+    COLUMNS = "application/vnd.timeseries.columns+json"
+    PARQUET = "application/vnd.apache.parquet"
+    # Requires the optional ``pyarrow`` package.
+    ARROW = "application/vnd.apache.arrow.stream"
+
+
+def _arrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def negotiate_timeseries_format(accept: str) -> TimeseriesFormat | None:
+    """The preferred available format of an ``Accept`` header, if any."""
+    available: list[TimeseriesFormat] = [
+        f for f in TimeseriesFormat if f != TimeseriesFormat.ARROW
+    ]
+    if _arrow_available():
+        available.append(TimeseriesFormat.ARROW)
+    ranges = []
+    for i, part in enumerate(accept.split(",")):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    pass
+        if media_type and quality > 0:
+            ranges.append((-quality, i, media_type.lower()))
+    if not ranges:
+        return TimeseriesFormat.ROWS
+    for _, _, media_type in sorted(ranges):
+        if media_type in ("*/*", "application/*"):
+            return TimeseriesFormat.ROWS
+        for fmt in available:
+            if fmt.value == media_type:
+                return fmt
+    return None
+
+
+class DownsampleMethod(str, Enum):
+    """How ``max_points`` of a series are picked for a chart."""
+
+    # Largest-Triangle-Three-Buckets: one point per bucket, keeping the shape.
+    LTTB = "lttb"
+    # The lowest and highest point of each bucket, keeping the peaks.
+    MINMAX = "minmax"
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """The indices of the points picked by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between
+    keeps the point forming the largest triangle with the point kept in the
+    previous bucket and the average of the next bucket.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
         )
-        if rows:
-            con.executemany(
-                f"""
-                INSERT INTO "{table}"
-                    ("timestamp", temperature, fluid_temperature, pressure,
-                     power, power_prediction, flow, is_anomaly)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [
-                    (
-                        r.get("timestamp", ""),
-                        r.get("temperature"),
-                        r.get("fluid_temperature"),
-                        r.get("pressure"),
-                        r.get("power"),
-                        r.get("power_prediction"),
-                        r.get("flow"),
-                        r.get("is_anomaly", False),
-                    )
-                    for r in rows
-                ],
-            )
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """The indices of the lowest and highest point of ``max_points / 2`` buckets."""
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+    buckets = max(1, max_points // 2)
+    bucket = np.arange(n) * buckets // n
+    # Sorted by bucket, then value: each bucket's first is its min, its last its max.
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def downsample_mask(
+    x: np.ndarray,
+    y: np.ndarray,
+    is_anomaly: np.ndarray,
+    max_points: int,
+    method: DownsampleMethod = DownsampleMethod.LTTB,
+) -> np.ndarray:
+    """A mask of the points to keep: ``max_points`` of them, plus all anomalies."""
+    # Gaps in the series count as its mean, so they neither attract nor hide peaks.
+    finite = np.isfinite(y)
+    y = np.where(finite, y, y[finite].mean() if finite.any() else 0.0)
+    if method == DownsampleMethod.MINMAX:
+        indices = minmax_indices(y, max_points)
+    else:
+        indices = lttb_indices(x, y, max_points)
+    mask = is_anomaly.astype(bool)
+    mask[indices] = True
+    return mask
+
+
+_REPORT_ROWS = f"""
+    SELECT "timestamp", temperature, fluid_temperature, pressure, power,
+           power_prediction, flow, is_anomaly
+    FROM {TIMESERIES_TABLE}
+    WHERE {{where}}
+    ORDER BY "timestamp"
+"""
+
+# JSON has no timestamp type: ISO 8601, as FastAPI serializes the rows.
+_ISO_TIMESTAMP = """strftime("timestamp", '%Y-%m-%dT%H:%M:%S')"""
+
+_COLUMN_LISTS = ", ".join(
+    f"'{name}': coalesce(list({expr} ORDER BY \"timestamp\"), [])"
+    for name, expr in zip(_COLUMNS, [_ISO_TIMESTAMP, *_COLUMNS[1:]])
+)
+
+_REPORT_COLUMNS = f"""
+    SELECT to_json({{{{{_COLUMN_LISTS}}}}})::VARCHAR
+    FROM {TIMESERIES_TABLE}
+    WHERE {{where}}
+"""
+
+
+@contextmanager
+def _selection(
+    con: duckdb.DuckDBPyConnection,
+    report_uuid: uuidpkg.UUID,
+    start: datetime | None,
+    end: datetime | None,
+    max_points: int | None,
+    method: DownsampleMethod,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """The filter of the report's rows and its parameters.
+
+    Rows are limited to ``[start, end)`` (pruned by the zone maps), and
+    downsampled to ``max_points`` if given.
+    """
+    where = "report_uuid = $report_uuid"
+    params: dict[str, Any] = {"report_uuid": report_uuid}
+    if start is not None:
+        where += ' AND "timestamp" >= $start'
+        params["start"] = _as_timestamp(start)
+    if end is not None:
+        where += ' AND "timestamp" < $end'
+        params["end"] = _as_timestamp(end)
+    if max_points is None:
+        yield where, params
+        return
+    series = con.execute(
+        f"""
+        SELECT "timestamp", epoch("timestamp") AS x, power, is_anomaly
+        FROM {TIMESERIES_TABLE}
+        WHERE {where}
+        ORDER BY "timestamp"
+        """,
+        params,
+    ).fetchnumpy()
+    power = np.ma.filled(np.ma.asarray(series["power"], dtype=np.float64), np.nan)
+    mask = downsample_mask(
+        np.asarray(series["x"], dtype=np.float64),
+        power,
+        np.ma.filled(np.ma.asarray(series["is_anomaly"]), False),
+        max_points,
+        method,
+    )
+    con.register("selected_timestamps", {"ts": series["timestamp"][mask]})
+    try:
+        yield where + ' AND "timestamp" IN (SELECT ts FROM selected_timestamps)', params
     finally:
-        con.close()
-    logger.info("Saved %d timeseries rows to %s", len(rows), table)
-    return table
+        con.unregister("selected_timestamps")
+
+
+def _migrate_if_needed(
+    db: DuckDBConnectionManager, report_uuid: uuidpkg.UUID, start_date: str
+) -> None:
+    """Reports saved in their own ``ts_<hex>`` table are migrated when read."""
+    if _has_legacy_table(db, report_uuid):
+        _migrate_legacy_table(db, report_uuid, start_date)
+
 
+def load_timeseries(
+    db: DuckDBConnectionManager,
+    report_uuid: uuidpkg.UUID,
+    start_date: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    max_points: int | None = None,
+    method: DownsampleMethod = DownsampleMethod.LTTB,
+) -> list[dict[str, Any]]:
+    """Load the timeseries rows for a report from DuckDB.
 
-def load_timeseries(report_uuid: uuidpkg.UUID) -> list[dict[str, Any]]:
-    """Load all timeseries rows for a report from DuckDB.
+    Args:
+        start_date: The start of the report's period (``yyyy-MM-dd``), for
+              reports saved before timestamps were stored with their year.
+        start: Only the rows from this time on.
+        end: Only the rows before this time.
+        max_points: Downsample the series (by its ``power``) to about this
+              many points with ``method``.  Anomalies are always kept.
 
     Returns:
-        A list of dicts matching the DuckDB column names.
+        A list of dicts matching the DuckDB column names, in timestamp order.
     """
-    _ensure_dir()
-    table = _validate_table_name(_table_name(report_uuid))
-    con = connect_dr_fs(DUCKDB_PATH, read_only=True)
     try:
-        result = con.execute(
-            f'SELECT * FROM "{table}" ORDER BY "timestamp"'
-        ).fetchall()
-        columns = [
-            "timestamp",
-            "temperature",
-            "fluid_temperature",
-            "pressure",
-            "power",
-            "power_prediction",
-            "flow",
-            "is_anomaly",
-        ]
-        return [dict(zip(columns, row)) for row in result]
+        _migrate_if_needed(db, report_uuid, start_date)
+        with (
+            db.cursor() as con,
+            _selection(con, report_uuid, start, end, max_points, method) as (
+                where,
+                params,
+            ),
+        ):
+            result = con.execute(_REPORT_ROWS.format(where=where), params).fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in result]
     except Exception:
         logger.exception("Failed to load timeseries for %s", report_uuid)
         return []
-    finally:
-        con.close()
 
 
-def delete_timeseries(report_uuid: uuidpkg.UUID) -> None:
-    """Drop the DuckDB table for a given report."""
-    _ensure_dir()
-    table = _validate_table_name(_table_name(report_uuid))
-    con = connect_dr_fs(DUCKDB_PATH)
-    try:
-        con.execute(f'DROP TABLE IF EXISTS "{table}"')
-    finally:
-        con.close()
-    logger.info("Deleted timeseries table %s", table)
+def export_timeseries(
+    db: DuckDBConnectionManager,
+    report_uuid: uuidpkg.UUID,
+    start_date: str,
+    fmt: TimeseriesFormat,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    max_points: int | None = None,
+    method: DownsampleMethod = DownsampleMethod.LTTB,
+) -> bytes:
+    """Serialize the timeseries of a report in a columnar format within DuckDB.
+
+    Takes the same arguments as ``load_timeseries``, but no Python object is
+    built per row.
+    """
+    if fmt == TimeseriesFormat.ROWS:
+        raise ValueError("Rows are loaded with load_timeseries")
+    _migrate_if_needed(db, report_uuid, start_date)
+    with (
+        db.cursor() as con,
+        _selection(con, report_uuid, start, end, max_points, method) as (
+            where,
+            params,
+        ),
+    ):
+        if fmt == TimeseriesFormat.COLUMNS:
+            result = con.execute(_REPORT_COLUMNS.format(where=where), params).fetchone()
+            return result[0].encode() if result else b"{}"
+        rows_sql = _REPORT_ROWS.format(where=where)
+        if fmt == TimeseriesFormat.PARQUET:
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / "timeseries.parquet"
+                con.execute(f"COPY ({rows_sql}) TO '{path}' (FORMAT parquet)", params)
+                return path.read_bytes()
+        import pyarrow as pa  # type: ignore[import-not-found, unused-ignore]
+
+        table = con.execute(rows_sql, params).fetch_arrow_table()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return bytes(sink.getvalue().to_pybytes())
+
+
+def delete_timeseries(db: DuckDBConnectionManager, report_uuid: uuidpkg.UUID) -> None:
+    """Delete the timeseries rows of a report."""
+    legacy = _validate_table_name(_legacy_table_name(report_uuid))
+    with db.writer() as con:
+        con.execute(
+            f"DELETE FROM {TIMESERIES_TABLE} WHERE report_uuid = ?", [report_uuid]
+        )
+        con.execute(f'DROP TABLE IF EXISTS "{legacy}"')
+    logger.info("Deleted timeseries of %s", report_uuid)
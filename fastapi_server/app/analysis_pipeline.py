@@ -0,0 +1,188 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A small DAG executor for the stages of the analysis pipeline.
+
+Each stage declares the stages it needs (``after``) and starts as soon as they
+have completed, so independent stages run concurrently.  Blocking stages (e.g.
+DuckDB writes) run in a thread pool, off the event loop.  The executor yields
+an event whenever a stage starts, reports progress (e.g. the text an agent
+streams), completes, fails or is skipped (because a stage it needs failed).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, AsyncGenerator, Callable, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class StageStatus(str, Enum):
+    RUNNING = "running"
+    # Reported by the running stage, see `PipelineExecutor.report`
+    PROGRESS = "progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    # A stage it needs failed (or was skipped)
+    SKIPPED = "skipped"
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A step of a pipeline, called with the results of the stages it needs."""
+
+    name: str
+    # A coroutine function, or a plain function if `blocking`
+    run: Callable[[Mapping[str, Any]], Any]
+    after: tuple[str, ...] = ()
+    # Run in the thread pool rather than on the event loop
+    blocking: bool = False
+
+
+@dataclass(frozen=True)
+class StageEvent:
+    stage: str
+    status: StageStatus
+    result: Any = None
+    error: BaseException | None = None
+    # How long the stage ran (seconds), once it has completed or failed
+    elapsed: float = 0.0
+
+
+class PipelineExecutor:
+    """Runs a DAG of stages; see `run`."""
+
+    def __init__(self, stages: list[Stage], executor: Executor | None = None):
+        """
+        `executor` is the thread pool of the blocking stages (the event loop's
+        default executor if None).
+        """
+        names = {stage.name for stage in stages}
+        if len(names) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            if missing := set(stage.after) - names:
+                raise ValueError(f"Stage {stage.name} needs unknown {missing}")
+        ordered: set[str] = set()
+        while len(ordered) < len(stages):
+            ready = {
+                stage.name
+                for stage in stages
+                if stage.name not in ordered and set(stage.after) <= ordered
+            }
+            if not ready:
+                raise ValueError("The stages have a cycle")
+            ordered |= ready
+        self._stages = stages
+        self._executor = executor
+        self.results: dict[str, Any] = {}
+        # From the start of the first stage to the end of the last one (seconds)
+        self.elapsed = 0.0
+        # Progress and completions, in the order they happen
+        self._events: asyncio.Queue[StageEvent] = asyncio.Queue()
+
+    def report(self, stage: str, progress: Any) -> None:
+        """Report the progress of a running stage, yielded by `run` in order.
+
+        To be called on the event loop, i.e. by stages that are not blocking.
+        """
+        self._events.put_nowait(StageEvent(stage, StageStatus.PROGRESS, progress))
+
+    def _finished(self, task: asyncio.Task[StageEvent]) -> None:
+        if not task.cancelled():
+            self._events.put_nowait(task.result())
+
+    async def _run_stage(self, stage: Stage) -> StageEvent:
+        started = time.perf_counter()
+        try:
+            if stage.blocking:
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(
+                    self._executor, functools.partial(stage.run, self.results)
+                )
+                try:
+                    result = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # The thread cannot be interrupted: wait for it, so that
+                    # nothing it does outlives the cancelled stage.
+                    await asyncio.wait([future])
+                    raise
+            else:
+                result = await stage.run(self.results)
+        except Exception as e:
+            logger.exception("Pipeline stage %s failed", stage.name)
+            return StageEvent(
+                stage.name,
+                StageStatus.FAILED,
+                error=e,
+                elapsed=time.perf_counter() - started,
+            )
+        return StageEvent(
+            stage.name,
+            StageStatus.COMPLETED,
+            result=result,
+            elapsed=time.perf_counter() - started,
+        )
+
+    async def run(self) -> AsyncGenerator[StageEvent, None]:
+        """Run the stages, yielding their events as they happen.
+
+        The results of the completed stages are in `results`, and `elapsed` is
+        set once all stages have finished.  Stages still running are cancelled
+        (and waited for, blocking ones until their thread returns) if the
+        iteration is stopped, so close it with `contextlib.aclosing`.
+        """
+        started = time.perf_counter()
+        pending = list(self._stages)
+        finished: dict[str, StageStatus] = {}
+        running: dict[str, asyncio.Task[StageEvent]] = {}
+        try:
+            while pending or running:
+                for stage in list(pending):
+                    needed = [finished.get(name) for name in stage.after]
+                    if any(
+                        status in (StageStatus.FAILED, StageStatus.SKIPPED)
+                        for status in needed
+                    ):
+                        pending.remove(stage)
+                        finished[stage.name] = StageStatus.SKIPPED
+                        yield StageEvent(stage.name, StageStatus.SKIPPED)
+                    elif all(status == StageStatus.COMPLETED for status in needed):
+                        pending.remove(stage)
+                        task = asyncio.create_task(self._run_stage(stage))
+                        task.add_done_callback(self._finished)
+                        running[stage.name] = task
+                        yield StageEvent(stage.name, StageStatus.RUNNING)
+                if not running:
+                    # Skipped stages may have made others skipped in turn.
+                    continue
+                event = await self._events.get()
+                if event.status != StageStatus.PROGRESS:
+                    del running[event.stage]
+                    if event.status == StageStatus.COMPLETED:
+                        self.results[event.stage] = event.result
+                    finished[event.stage] = event.status
+                yield event
+        finally:
+            for task in running.values():
+                task.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+        self.elapsed = time.perf_counter() - started
@@ -20,20 +20,36 @@ Agents 2 and 3 still return mock responses (to be implemented later).
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
 import io
 import json
 import logging
 import uuid as uuidpkg
-from typing import Any, AsyncIterator
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Mapping
 
 from datarobot.auth.session import AuthCtx
 from datarobot.auth.typing import Metadata
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from openai import AsyncOpenAI
 from pydantic import BaseModel, Field
 
-from app.analysis_duckdb import delete_timeseries, load_timeseries, save_timeseries
+from app.analysis_anomalies import AnomalyThresholds, detect_anomalies
+from app.analysis_duckdb import (
+    TIMESERIES_TABLE,
+    DownsampleMethod,
+    TimeseriesFormat,
+    delete_timeseries,
+    export_timeseries,
+    ingest_snowflake_timeseries,
+    load_timeseries,
+    negotiate_timeseries_format,
+    save_timeseries,
+)
+from app.analysis_pipeline import PipelineExecutor, Stage, StageStatus
 from app.analysis_reports import (
     AnalysisReportCreate,
     AnalysisReportPublic,
@@ -41,6 +57,7 @@ from app.analysis_reports import (
 )
 from app.auth.ctx import must_get_auth_ctx
 from app.deps import Deps
+from app.snowflake import get_snowflake_client, snowflake_configured
 from app.users.user import User, UserRepository
 
 logger = logging.getLogger(__name__)
@@ -61,17 +78,20 @@ async def _get_current_user(user_repo: UserRepository, user_id: int) -> User:
 
 
 class AnomalyItem(BaseModel):
-    timestamp: str
+    timestamp: datetime
     power: float
     power_prediction: float
     diff: float
     diff_pct: float
+    # Against the preceding readings (None without enough of them)
+    zscore: float | None = None
 
 
 class ChartDataRow(BaseModel):
     """A single row of chart data sent from the frontend."""
 
-    timestamp: str = ""
+    # The reading's time as stored in Snowflake (ISO 8601)
+    timestamp: datetime
     temperature: float | None = None
     fluidTemperature: float | None = None
     pressure: float | None = None
@@ -81,15 +101,23 @@ class ChartDataRow(BaseModel):
 
 
 class AnalysisRequest(BaseModel):
-    """Payload sent by the sensors page."""
+    """Payload sent by the sensors page.
+
+    Only the period is required: without ``chart_data``, the series is pulled
+    from Snowflake on the server.  Either way, its anomalies are detected on the
+    server (see ``app.analysis_anomalies``), which fills in ``anomaly_points``
+    and ``total_data_points``.
+    """
 
     start_date: str = Field(..., description="分析期間の開始日 (yyyy-MM-dd)")
     end_date: str = Field(..., description="分析期間の終了日 (yyyy-MM-dd)")
     anomaly_points: list[AnomalyItem] = Field(
         default_factory=list,
-        description="予実乖離が閾値を超えた異常データポイント",
+        description="予実乖離が閾値を超えた異常データポイント（サーバーで検出）",
+    )
+    total_data_points: int = Field(
+        0, description="期間内の全データポイント数（サーバーで集計）"
     )
-    total_data_points: int = Field(0, description="期間内の全データポイント数")
     chart_data: list[ChartDataRow] = Field(
         default_factory=list,
         description="チャートに表示されている時系列データ全件",
@@ -119,10 +147,38 @@ _NO_ANOMALY_REPORT = (
 )
 
 
+async def _stream_completion(
+    payload: dict[str, Any],
+    client: AsyncOpenAI,
+    on_delta: Callable[[str], None] | None = None,
+) -> str:
+    """Send the payload to the agent and stream its answer.
+
+    ``client`` is a shared client of ``Deps.agent_clients``.  Each piece of
+    text is passed to ``on_delta`` as it arrives, and the whole text is
+    returned.
+    """
+    stream = await client.chat.completions.create(
+        model="custom-model",
+        messages=[
+            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+        ],
+        stream=True,
+    )
+    parts = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            if on_delta:
+                on_delta(delta)
+    return "".join(parts)
+
+
 async def _agent_1_divergence_analysis(
     req: AnalysisRequest,
-    agent_endpoint: str,
-    api_token: str,
+    client: AsyncOpenAI,
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     """Agent 1: 予実乖離の時系列分析（LLM Gateway 経由）."""
     if not req.anomaly_points:
@@ -134,23 +190,11 @@ async def _agent_1_divergence_analysis(
         "start_date": req.start_date,
         "end_date": req.end_date,
         "total_data_points": req.total_data_points,
-        "anomaly_points": [ap.model_dump() for ap in req.anomaly_points],
+        "anomaly_points": [ap.model_dump(mode="json") for ap in req.anomaly_points],
     }
 
-    client = AsyncOpenAI(
-        base_url=agent_endpoint,
-        api_key=api_token,
-        default_headers={"Authorization": f"Bearer {api_token}"},
-    )
     try:
-        response = await client.chat.completions.create(
-            model="custom-model",
-            messages=[
-                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
-            ],
-            stream=False,
-        )
-        return response.choices[0].message.content or ""
+        return await _stream_completion(payload, client, on_delta)
     except Exception:
         logger.exception("Agent 1 LLM call failed")
         raise
@@ -159,8 +203,8 @@ async def _agent_1_divergence_analysis(
 async def _agent_2_past_cases(
     analysis_summary: str,
     req: AnalysisRequest,
-    agent_endpoint: str,
-    api_token: str,
+    client: AsyncOpenAI,
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     """Agent 2: 過去の類似事例検索（LLM Gateway 経由）."""
     if not req.anomaly_points:
@@ -173,23 +217,11 @@ async def _agent_2_past_cases(
     payload = {
         "agent_type": "past_case_search",
         "analysis_summary": analysis_summary,
-        "anomaly_points": [ap.model_dump() for ap in req.anomaly_points],
+        "anomaly_points": [ap.model_dump(mode="json") for ap in req.anomaly_points],
     }
 
-    client = AsyncOpenAI(
-        base_url=agent_endpoint,
-        api_key=api_token,
-        default_headers={"Authorization": f"Bearer {api_token}"},
-    )
     try:
-        response = await client.chat.completions.create(
-            model="custom-model",
-            messages=[
-                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
-            ],
-            stream=False,
-        )
-        return response.choices[0].message.content or ""
+        return await _stream_completion(payload, client, on_delta)
     except Exception:
         logger.exception("Agent 2 LLM call failed")
         raise
@@ -199,8 +231,8 @@ async def _agent_3_maintenance_actions(
     analysis_summary: str,
     past_cases: str,
     req: AnalysisRequest,
-    agent_endpoint: str,
-    api_token: str,
+    client: AsyncOpenAI,
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     """Agent 3: 保守アクション提案（LLM Gateway 経由）."""
     if len(req.anomaly_points) == 0:
@@ -217,20 +249,8 @@ async def _agent_3_maintenance_actions(
         "past_cases": past_cases,
     }
 
-    client = AsyncOpenAI(
-        base_url=agent_endpoint,
-        api_key=api_token,
-        default_headers={"Authorization": f"Bearer {api_token}"},
-    )
     try:
-        response = await client.chat.completions.create(
-            model="custom-model",
-            messages=[
-                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
-            ],
-            stream=False,
-        )
-        return response.choices[0].message.content or ""
+        return await _stream_completion(payload, client, on_delta)
     except Exception:
         logger.exception("Agent 3 LLM call failed")
         raise
@@ -241,170 +261,268 @@ async def _agent_3_maintenance_actions(
 # ---------------------------------------------------------------------------
 
 
-async def _run_analysis_pipeline(
-    req: AnalysisRequest,
-    agent_endpoint: str,
-    api_token: str,
-    deps: Deps,
-    user_uuid: uuidpkg.UUID | None = None,
-) -> AsyncIterator[str]:
-    """Run the 3-agent pipeline, yielding SSE events."""
-
-    agents = [
-        {
-            "agent_id": 1,
-            "title": "予実乖離の時系列分析",
-            "description": "予測と実績の乖離パターンを時間軸方向に分析しています…",
-        },
-        {
-            "agent_id": 2,
-            "title": "過去事例の検索",
-            "description": "過去の保守報告書から類似事例を検索しています…",
-        },
+def _chart_rows(req: AnalysisRequest) -> list[dict[str, Any]]:
+    """The chart data sent with the request, as DuckDB timeseries rows."""
+    return [
         {
-            "agent_id": 3,
-            "title": "保守アクションの提案",
-            "description": "分析結果と過去事例に基づき推奨アクションを生成しています…",
-        },
+            "timestamp": r.timestamp,
+            "temperature": r.temperature,
+            "fluid_temperature": r.fluidTemperature,
+            "pressure": r.pressure,
+            "power": r.power,
+            "power_prediction": r.powerPrediction,
+            "flow": r.flow,
+        }
+        for r in req.chart_data
     ]
 
-    # Emit all agents as "pending" first
-    for agent in agents:
-        yield _sse_event(
-            "agent_step",
-            {
-                "agent_id": agent["agent_id"],
-                "title": agent["title"],
-                "description": agent["description"],
-                "status": "pending",
-                "content": "",
-            },
-        )
 
-    # --- Agent 1 ---
-    yield _sse_event(
-        "agent_step",
-        {
-            "agent_id": 1,
-            "title": agents[0]["title"],
-            "status": "running",
-            "content": "",
-        },
-    )
+def _period(req: AnalysisRequest) -> tuple[date, date]:
     try:
-        agent1_result = await _agent_1_divergence_analysis(
-            req, agent_endpoint, api_token
-        )
-    except Exception as exc:
-        agent1_result = f"## エラー\n\nAgent 1 の実行中にエラーが発生しました: {exc}"
-    yield _sse_event(
-        "agent_step",
-        {
-            "agent_id": 1,
-            "title": agents[0]["title"],
-            "status": "completed",
-            "content": agent1_result,
-        },
-    )
+        return date.fromisoformat(req.start_date), date.fromisoformat(req.end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # --- Agent 2 ---
-    yield _sse_event(
-        "agent_step",
-        {
-            "agent_id": 2,
-            "title": agents[1]["title"],
-            "status": "running",
-            "content": "",
-        },
-    )
+
+def _store_timeseries(
+    req: AnalysisRequest, deps: Deps, report_uuid: uuidpkg.UUID
+) -> int:
+    """Store the request's series in DuckDB under ``report_uuid`` (blocking).
+
+    The series is pulled from Snowflake, unless it was sent as ``chart_data``.
+
+    Returns:
+        The number of readings stored.
+    """
+    if req.chart_data:
+        save_timeseries(deps.analysis_duckdb, report_uuid, _chart_rows(req))
+        return len(req.chart_data)
+    start_date, end_date = _period(req)
+    snowflake_client = get_snowflake_client(deps.config)
     try:
-        agent2_result = await _agent_2_past_cases(
-            agent1_result, req, agent_endpoint, api_token
+        return ingest_snowflake_timeseries(
+            deps.analysis_duckdb, report_uuid, snowflake_client, start_date, end_date
         )
-    except Exception as exc:
-        agent2_result = f"## エラー\n\nAgent 2 の実行中にエラーが発生しました: {exc}"
-    yield _sse_event(
-        "agent_step",
-        {
-            "agent_id": 2,
-            "title": agents[1]["title"],
-            "status": "completed",
-            "content": agent2_result,
-        },
-    )
+    finally:
+        snowflake_client.close()
 
-    # --- Agent 3 ---
-    yield _sse_event(
-        "agent_step",
-        {
-            "agent_id": 3,
-            "title": agents[2]["title"],
-            "status": "running",
-            "content": "",
-        },
+
+def _detect_anomalies(
+    req: AnalysisRequest, deps: Deps, report_uuid: uuidpkg.UUID, count: int
+) -> AnalysisRequest:
+    """The request completed with the stored series' size and anomalies (blocking)."""
+    anomalies = detect_anomalies(
+        deps.analysis_duckdb, report_uuid, AnomalyThresholds.from_config(deps.config)
     )
-    try:
-        agent3_result = await _agent_3_maintenance_actions(
-            agent1_result, agent2_result, req, agent_endpoint, api_token
-        )
-    except Exception as exc:
-        agent3_result = f"## エラー\n\nAgent 3 の実行中にエラーが発生しました: {exc}"
-    yield _sse_event(
-        "agent_step",
-        {
-            "agent_id": 3,
-            "title": agents[2]["title"],
-            "status": "completed",
-            "content": agent3_result,
-        },
+    return req.model_copy(
+        update={
+            "total_data_points": count,
+            "anomaly_points": [AnomalyItem(**a) for a in anomalies],
+        }
     )
 
-    # --- Save results to SQLite + DuckDB ---
-    report_uuid: str | None = None
-    try:
-        # Determine anomaly timestamps for marking
-        anomaly_timestamps = {ap.timestamp for ap in req.anomaly_points}
 
-        # Convert chart_data rows for DuckDB
-        ts_rows = [
-            {
-                "timestamp": r.timestamp,
-                "temperature": r.temperature,
-                "fluid_temperature": r.fluidTemperature,
-                "pressure": r.pressure,
-                "power": r.power,
-                "power_prediction": r.powerPrediction,
-                "flow": r.flow,
-                "is_anomaly": r.timestamp in anomaly_timestamps,
-            }
-            for r in req.chart_data
-        ]
+_AGENTS = [
+    {
+        "agent_id": 1,
+        "title": "予実乖離の時系列分析",
+        "description": "予測と実績の乖離パターンを時間軸方向に分析しています…",
+    },
+    {
+        "agent_id": 2,
+        "title": "過去事例の検索",
+        "description": "過去の保守報告書から類似事例を検索しています…",
+    },
+    {
+        "agent_id": 3,
+        "title": "保守アクションの提案",
+        "description": "分析結果と過去事例に基づき推奨アクションを生成しています…",
+    },
+]
+
+
+def _analysis_stages(
+    req: AnalysisRequest,
+    agent_endpoint: str,
+    api_token: str,
+    deps: Deps,
+    report_uuid: uuidpkg.UUID,
+    user_uuid: uuidpkg.UUID | None,
+    on_delta: Callable[[str, str], None],
+) -> list[Stage]:
+    """The stages of the analysis and what each of them needs.
+
+    Each stage builds on the one before, so they run one after the other: the
+    executor moves the DuckDB work off the event loop and streams the stages'
+    progress, it does not make this pipeline any faster.  The agents pass the
+    text they stream to ``on_delta`` with their stage's name.  Agent errors
+    are reported in their output rather than failing the stage, so that the
+    following agents and the report still run.
+    """
 
-        new_uuid = uuidpkg.uuid4()
-        duckdb_table = save_timeseries(new_uuid, ts_rows)
-
-        report_data = AnalysisReportCreate(
-            uuid=new_uuid,
-            user_uuid=user_uuid,
-            start_date=req.start_date,
-            end_date=req.end_date,
-            total_data_points=req.total_data_points,
-            anomaly_count=len(req.anomaly_points),
-            divergence_report=agent1_result,
-            past_cases_report=agent2_result,
-            maintenance_actions_report=agent3_result,
-            duckdb_table_name=duckdb_table,
+    client = deps.agent_clients.get(agent_endpoint, api_token)
+
+    def timeseries(results: Mapping[str, Any]) -> int:
+        return _store_timeseries(req, deps, report_uuid)
+
+    def anomalies(results: Mapping[str, Any]) -> AnalysisRequest:
+        return _detect_anomalies(req, deps, report_uuid, results["timeseries"])
+
+    async def agent_1(results: Mapping[str, Any]) -> str:
+        try:
+            return await _agent_1_divergence_analysis(
+                results["anomalies"],
+                client,
+                functools.partial(on_delta, "agent_1"),
+            )
+        except Exception as exc:
+            return f"## エラー\n\nAgent 1 の実行中にエラーが発生しました: {exc}"
+
+    async def agent_2(results: Mapping[str, Any]) -> str:
+        try:
+            return await _agent_2_past_cases(
+                results["agent_1"],
+                results["anomalies"],
+                client,
+                functools.partial(on_delta, "agent_2"),
+            )
+        except Exception as exc:
+            return f"## エラー\n\nAgent 2 の実行中にエラーが発生しました: {exc}"
+
+    async def agent_3(results: Mapping[str, Any]) -> str:
+        try:
+            return await _agent_3_maintenance_actions(
+                results["agent_1"],
+                results["agent_2"],
+                results["anomalies"],
+                client,
+                functools.partial(on_delta, "agent_3"),
+            )
+        except Exception as exc:
+            return f"## エラー\n\nAgent 3 の実行中にエラーが発生しました: {exc}"
+
+    async def report(results: Mapping[str, Any]) -> str:
+        analysed: AnalysisRequest = results["anomalies"]
+        saved = await deps.analysis_report_repo.create(
+            AnalysisReportCreate(
+                uuid=report_uuid,
+                user_uuid=user_uuid,
+                start_date=analysed.start_date,
+                end_date=analysed.end_date,
+                total_data_points=analysed.total_data_points,
+                anomaly_count=len(analysed.anomaly_points),
+                divergence_report=results["agent_1"],
+                past_cases_report=results["agent_2"],
+                maintenance_actions_report=results["agent_3"],
+                duckdb_table_name=TIMESERIES_TABLE,
+            )
         )
-        saved = await deps.analysis_report_repo.create(report_data)
-        report_uuid = str(saved.uuid)
-    except Exception:
-        logger.exception("Failed to save analysis report")
+        return str(saved.uuid)
+
+    # Agent 2 needs Agent 1's summary, and Agent 3 both of their outputs.
+    return [
+        Stage("timeseries", timeseries, blocking=True),
+        Stage("anomalies", anomalies, after=("timeseries",), blocking=True),
+        Stage("agent_1", agent_1, after=("anomalies",)),
+        Stage("agent_2", agent_2, after=("anomalies", "agent_1")),
+        Stage("agent_3", agent_3, after=("anomalies", "agent_1", "agent_2")),
+        Stage("report", report, after=("anomalies", "agent_1", "agent_2", "agent_3")),
+    ]
+
 
-    # --- Done ---
-    yield _sse_event(
-        "analysis_complete",
-        {"status": "done", "report_uuid": report_uuid},
+async def _run_analysis_pipeline(
+    req: AnalysisRequest,
+    agent_endpoint: str,
+    api_token: str,
+    deps: Deps,
+    report_uuid: uuidpkg.UUID,
+    user_uuid: uuidpkg.UUID | None = None,
+) -> AsyncIterator[str]:
+    """Run the analysis pipeline, yielding SSE events.
+
+    The stages (see ``_analysis_stages``) run as soon as what they need is
+    done, with the DuckDB work in a thread pool.  Each stage reports its
+    progress with a ``pipeline_stage`` event, and the agents with their
+    ``agent_step`` events, including one per piece of text they stream
+    (``delta``); the completed step still carries the whole text.  The series
+    stored under ``report_uuid`` is deleted unless the report is saved, once
+    the stages still running have stopped.
+    """
+    pipeline = PipelineExecutor(
+        _analysis_stages(
+            req,
+            agent_endpoint,
+            api_token,
+            deps,
+            report_uuid,
+            user_uuid,
+            on_delta=lambda stage, delta: pipeline.report(stage, delta),
+        )
     )
+    agents = {f"agent_{agent['agent_id']}": agent for agent in _AGENTS}
+
+    # Emit all agents as "pending" first
+    for agent in _AGENTS:
+        yield _sse_event("agent_step", {**agent, "status": "pending", "content": ""})
+
+    error: str | None = None
+    try:
+        async with contextlib.aclosing(pipeline.run()) as events:
+            async for event in events:
+                step = agents.get(event.stage)
+                if event.status == StageStatus.PROGRESS:
+                    if step:
+                        yield _sse_event(
+                            "agent_step",
+                            {
+                                "agent_id": step["agent_id"],
+                                "title": step["title"],
+                                "status": StageStatus.RUNNING.value,
+                                "delta": event.result,
+                            },
+                        )
+                    continue
+                yield _sse_event(
+                    "pipeline_stage",
+                    {
+                        "stage": event.stage,
+                        "status": event.status.value,
+                        "elapsed_ms": round(event.elapsed * 1000),
+                    },
+                )
+                if event.status == StageStatus.FAILED and error is None:
+                    error = f"{event.stage}: {event.error}"
+                if step and event.status in (
+                    StageStatus.RUNNING,
+                    StageStatus.COMPLETED,
+                ):
+                    yield _sse_event(
+                        "agent_step",
+                        {
+                            "agent_id": step["agent_id"],
+                            "title": step["title"],
+                            "status": event.status.value,
+                            "content": event.result or "",
+                        },
+                    )
+
+        # --- Done ---
+        logger.info("Analysis %s took %.1fs", report_uuid, pipeline.elapsed)
+        yield _sse_event(
+            "analysis_complete",
+            {
+                "status": "done",
+                "report_uuid": pipeline.results.get("report"),
+                "error": error,
+                "elapsed_ms": round(pipeline.elapsed * 1000),
+            },
+        )
+    finally:
+        if "report" not in pipeline.results:
+            # Failed, or the client went away: the series has no report.
+            await asyncio.to_thread(
+                delete_timeseries, deps.analysis_duckdb, report_uuid
+            )
 
 
 @analysis_router.post("/power-consumption")
@@ -415,19 +533,28 @@ async def analyze_power_consumption(
 ) -> StreamingResponse:
     """Run the 3-agent power-consumption analysis pipeline.
 
-    Returns an SSE stream with ``agent_step`` events for each agent
-    and an ``analysis_complete`` event when the pipeline finishes.
+    Returns an SSE stream with ``agent_step`` events for each agent, a
+    ``pipeline_stage`` event for each stage (including storing the series in
+    DuckDB, pulled from Snowflake without ``chart_data``, and detecting its
+    anomalies) and an ``analysis_complete`` event when the pipeline finishes.
     """
     deps: Deps = request.app.state.deps
     current_user = await _get_current_user(
         deps.user_repo, int(auth_ctx.user.id)
     )
+    _period(req)
+    if not req.chart_data and not snowflake_configured(deps.config):
+        # Checked here, while an error can still be an HTTP status.
+        raise HTTPException(
+            status_code=400, detail="Snowflake credentials not configured"
+        )
     return StreamingResponse(
         _run_analysis_pipeline(
             req,
             agent_endpoint=deps.config.agent_endpoint,
             api_token=deps.config.datarobot_api_token,
             deps=deps,
+            report_uuid=uuidpkg.uuid4(),
             user_uuid=current_user.uuid,
         ),
         media_type="text/event-stream",
@@ -485,13 +612,24 @@ async def get_report(
     return AnalysisReportPublic(**report.model_dump())
 
 
-@analysis_router.get("/reports/{report_uuid}/timeseries")
+@analysis_router.get("/reports/{report_uuid}/timeseries", response_model=None)
 async def get_report_timeseries(
     report_uuid: uuidpkg.UUID,
     request: Request,
+    start: datetime | None = Query(None, description="Only the rows from this time on"),
+    end: datetime | None = Query(None, description="Only the rows before this time"),
+    max_points: int | None = Query(
+        None, ge=3, description="Downsample to about this many points (anomalies kept)"
+    ),
+    method: DownsampleMethod = DownsampleMethod.LTTB,
     auth_ctx: AuthCtx[Metadata] = Depends(must_get_auth_ctx),
-) -> list[dict[str, Any]]:
-    """Return the timeseries chart data stored in DuckDB."""
+) -> list[dict[str, Any]] | Response:
+    """Return the timeseries chart data stored in DuckDB.
+
+    JSON rows by default; columnar JSON, Parquet or Arrow IPC (see
+    ``TimeseriesFormat``) when requested with the ``Accept`` header.  The
+    series is read in a worker thread, off the event loop.
+    """
     deps: Deps = request.app.state.deps
     current_user = await _get_current_user(
         deps.user_repo, int(auth_ctx.user.id)
@@ -499,7 +637,32 @@ async def get_report_timeseries(
     report = await deps.analysis_report_repo.get_by_uuid(report_uuid)
     if not report or report.user_uuid != current_user.uuid:
         raise HTTPException(status_code=404, detail="Report not found")
-    return load_timeseries(report.uuid)
+    fmt = negotiate_timeseries_format(request.headers.get("accept") or "")
+    if fmt is None:
+        raise HTTPException(status_code=406, detail="Unsupported timeseries format")
+    if fmt == TimeseriesFormat.ROWS:
+        return await asyncio.to_thread(
+            load_timeseries,
+            deps.analysis_duckdb,
+            report.uuid,
+            report.start_date,
+            start=start,
+            end=end,
+            max_points=max_points,
+            method=method,
+        )
+    content = await asyncio.to_thread(
+        export_timeseries,
+        deps.analysis_duckdb,
+        report.uuid,
+        report.start_date,
+        fmt,
+        start=start,
+        end=end,
+        max_points=max_points,
+        method=method,
+    )
+    return Response(content, media_type=fmt.value)
 
 
 @analysis_router.delete("/reports/{report_uuid}")
@@ -516,7 +679,7 @@ async def delete_report(
     report = await deps.analysis_report_repo.get_by_uuid(report_uuid)
     if not report or report.user_uuid != current_user.uuid:
         raise HTTPException(status_code=404, detail="Report not found")
-    delete_timeseries(report.uuid)
+    await asyncio.to_thread(delete_timeseries, deps.analysis_duckdb, report.uuid)
     await deps.analysis_report_repo.delete(report_uuid)
     return {"status": "deleted"}
 
@@ -526,6 +689,10 @@ async def delete_report(
 # ---------------------------------------------------------------------------
 
 
+# About one point per pixel of the chart (10 inches at 150 dpi)
+_WORD_CHART_MAX_POINTS = 1500
+
+
 def _generate_word_report(
     report: AnalysisReportPublic,
     ts_rows: list[dict[str, Any]],
@@ -562,7 +729,7 @@ def _generate_word_report(
     # Chart
     if ts_rows:
         fig, ax = plt.subplots(figsize=(10, 4))
-        timestamps = [r["timestamp"] for r in ts_rows]
+        timestamps = [r["timestamp"].strftime("%m/%d %H:%M") for r in ts_rows]
         power = [r.get("power") for r in ts_rows]
         prediction = [r.get("power_prediction") for r in ts_rows]
 
@@ -648,7 +815,13 @@ async def download_report(
     if not report or report.user_uuid != current_user.uuid:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    ts_rows = load_timeseries(report_uuid)
+    ts_rows = await asyncio.to_thread(
+        load_timeseries,
+        deps.analysis_duckdb,
+        report_uuid,
+        report.start_date,
+        max_points=_WORD_CHART_MAX_POINTS,
+    )
     report_public = AnalysisReportPublic(**report.model_dump())
     docx_bytes = _generate_word_report(report_public, ts_rows)
 
@@ -16,22 +16,35 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import AsyncIterator
 
-from ag_ui.core import RunAgentInput
-from ag_ui.encoder import EventEncoder
+from ag_ui.core import BaseEvent, RunAgentInput
 from datarobot.auth.session import AuthCtx
 from datarobot.auth.typing import Metadata
 from datarobot.core import getenv
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from app.ag_ui.broker import Subscription, SubscriptionLagged
+from app.ag_ui.encoder import FlushPolicy, ResumableEventEncoder, encode_coalesced
+from app.ag_ui.stream_manager import RunNotAdmitted
 from app.ag_ui.translate import ExtendedBaseMessage, translate_messages
 from app.auth.ctx import get_agent_headers, must_get_auth_ctx
 from app.chats import Chat, ChatBase, ChatRepository
 from app.deps import Deps
 from app.messages import (
+    ALL_MESSAGE_RELATIONSHIPS,
     MessageRepository,
 )
+from app.pagination import NEXT_CURSOR_HEADER, Cursor
 from app.users.user import User, UserRepository
 
 logger = logging.getLogger(__name__)
@@ -39,6 +52,8 @@ chat_router = APIRouter(tags=["Chat"])
 
 agent_deployment_token = getenv("AGENT_DEPLOYMENT_TOKEN") or "dummy"
 AGENT_MODEL_NAME = "web-agents"
+MAX_PAGE_SIZE = 1000
+RETRY_AFTER_SECONDS = 5
 
 
 SYSTEM_PROMPT = "You are a helpful assistant. Answer the user's provided question."
@@ -62,33 +77,54 @@ class ChatWithUpdateTimeAndMessages(ChatBase):
     messages: list[ExtendedBaseMessage]
 
 
+def _parse_cursor(cursor: str | None) -> Cursor | None:
+    if not cursor:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor"
+        )
+
+
 @chat_router.get("/chat")
 async def get_list_of_chats(
-    request: Request, auth_ctx: AuthCtx[Metadata] = Depends(must_get_auth_ctx)
+    request: Request,
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    auth_ctx: AuthCtx[Metadata] = Depends(must_get_auth_ctx),
 ) -> list[ChatWithUpdateTime]:
-    """Return list of all chats"""
+    """
+    Return list of chats, most recently updated first.
+
+    When `limit` is given and more chats exist, the cursor for the next page is
+    returned in the `X-Next-Cursor` header.
+    """
     current_user = await _get_current_user(
         request.app.state.deps.user_repo, int(auth_ctx.user.id)
     )
 
     chat_repo: ChatRepository = request.app.state.deps.chat_repo
-    message_repo: MessageRepository = request.app.state.deps.message_repo
 
-    chats = await chat_repo.get_all_chats(current_user)
-    chat_ids = [chat.uuid for chat in chats]
-    last_messages = await message_repo.get_last_messages(chat_ids)
-
-    chats_with_update_time = []
-    for chat in chats:
-        last_message = last_messages.get(chat.uuid)
-        chats_with_update_time.append(
-            ChatWithUpdateTime(
-                update_time=last_message.created_at
-                if last_message
-                else chat.created_at,
-                **chat.model_dump(),
-            )
+    chats = await chat_repo.get_all_chats(
+        current_user, limit=limit, cursor=_parse_cursor(cursor)
+    )
+    if limit and len(chats) == limit:
+        last_chat = chats[-1]
+        response.headers[NEXT_CURSOR_HEADER] = Cursor(
+            timestamp=last_chat.updated_at,
+            uuid=last_chat.uuid,
+        ).encode()
+
+    chats_with_update_time = [
+        ChatWithUpdateTime(
+            update_time=chat.updated_at,
+            **chat.model_dump(),
         )
+        for chat in chats
+    ]
 
     return chats_with_update_time
 
@@ -96,10 +132,19 @@ async def get_list_of_chats(
 @chat_router.get("/chat/{thread_id}")
 async def get_chat(
     request: Request,
+    response: Response,
     thread_id: str,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     auth_ctx: AuthCtx[Metadata] = Depends(must_get_auth_ctx),
 ) -> ChatWithUpdateTimeAndMessages:
-    """Return a chat and its messages."""
+    """
+    Return a chat and its messages.
+
+    When `limit` is given, only the newest `limit` messages (older than `cursor`, if
+    given) are returned, and the cursor for the next, older page is returned in the
+    `X-Next-Cursor` header if there may be more.
+    """
     current_user = await _get_current_user(
         request.app.state.deps.user_repo, int(auth_ctx.user.id)
     )
@@ -113,16 +158,26 @@ async def get_chat(
             status_code=status.HTTP_404_NOT_FOUND, detail="chat not found"
         )
 
-    messages = list(await message_repo.get_chat_messages(chat.uuid))
-    if messages:
-        update_time = max(m.created_at for m in messages)
-    else:
-        update_time = chat.created_at
+    messages = list(
+        await message_repo.get_chat_messages(
+            chat.uuid,
+            limit=limit,
+            cursor=_parse_cursor(cursor),
+            load=ALL_MESSAGE_RELATIONSHIPS,
+        )
+    )
+    if limit and len(messages) == limit:
+        oldest_message = messages[0]
+        response.headers[NEXT_CURSOR_HEADER] = Cursor(
+            timestamp=oldest_message.created_at, uuid=oldest_message.uuid
+        ).encode()
 
     extended_messages = list(translate_messages(messages))
 
     return ChatWithUpdateTimeAndMessages(
-        update_time=update_time, messages=extended_messages, **chat.model_dump()
+        update_time=chat.updated_at,
+        messages=extended_messages,
+        **chat.model_dump(),
     )
 
 
@@ -197,14 +252,123 @@ async def create_chat_messages(
     deps: Deps = request.app.state.deps
 
     # Create an event encoder to properly format SSE events
-    encoder = EventEncoder(accept=request.headers.get("accept") or "")
+    encoder = ResumableEventEncoder(accept=request.headers.get("accept") or "")
     agent_headers = get_agent_headers(request, auth_ctx, deps.config.session_secret_key)
 
-    stream = deps.stream_manager.run(run_input, current_user.uuid, agent_headers)
+    try:
+        subscription = await deps.stream_manager.run(
+            run_input, current_user.uuid, agent_headers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except RunNotAdmitted as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+
+    return _event_stream_response(
+        subscription, encoder, FlushPolicy.from_config(deps.config)
+    )
+
+
+@chat_router.get("/chat/{thread_id}/runs/{run_id}/events")
+async def follow_chat_run(
+    request: Request,
+    thread_id: str,
+    run_id: str,
+    last_event_id: int | None = Query(default=None, ge=-1),
+    last_event_id_header: int | None = Header(
+        default=None, alias="Last-Event-ID", ge=-1
+    ),
+    auth_ctx: AuthCtx[Metadata] = Depends(must_get_auth_ctx),
+) -> StreamingResponse:
+    """
+    Follow the events of a run, e.g. from a second browser tab, or resume a stream
+    that lost its connection.
+
+    Events are replayed after the event with ID `Last-Event-ID` (header or
+    `last_event_id` query parameter; `-1` replays the run from the start), then
+    followed live. Without it, only the events from now on are streamed. Runs can be
+    followed while in progress and for a short while after they finish; after that,
+    use `GET /chat/{thread_id}`.
+    """
+    current_user = await _get_current_user(
+        request.app.state.deps.user_repo, int(auth_ctx.user.id)
+    )
+    deps: Deps = request.app.state.deps
 
+    if last_event_id is None:
+        last_event_id = last_event_id_header
+
+    chat = await deps.chat_repo.get_chat_by_thread_id(current_user.uuid, thread_id)
+    if not chat:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="run not found"
+        )
+    try:
+        subscription = await deps.stream_manager.subscribe(
+            run_id, thread_id, str(current_user.uuid), last_event_id
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE, detail="events no longer available"
+        )
+    if not subscription:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="run not found"
+        )
+
+    encoder = ResumableEventEncoder(accept=request.headers.get("accept") or "")
+    return _event_stream_response(
+        subscription, encoder, FlushPolicy.from_config(deps.config)
+    )
+
+
+@chat_router.delete(
+    "/chat/{thread_id}/runs/{run_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def cancel_chat_run(
+    request: Request,
+    thread_id: str,
+    run_id: str,
+    auth_ctx: AuthCtx[Metadata] = Depends(must_get_auth_ctx),
+) -> None:
+    """
+    Cancel a run in progress. Its stream ends with a `RUN_ERROR` event and the
+    messages written so far are kept.
+    """
+    current_user = await _get_current_user(
+        request.app.state.deps.user_repo, int(auth_ctx.user.id)
+    )
+    deps: Deps = request.app.state.deps
+
+    chat = await deps.chat_repo.get_chat_by_thread_id(current_user.uuid, thread_id)
+    if not chat or not deps.stream_manager.cancel(
+        run_id, thread_id, str(current_user.uuid)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="run not in progress"
+        )
+
+
+def _event_stream_response(
+    subscription: Subscription[BaseEvent],
+    encoder: ResumableEventEncoder,
+    flush_policy: FlushPolicy,
+) -> StreamingResponse:
     async def run_agent_in_background() -> AsyncIterator[str]:
-        async for event in await stream:
-            yield encoder.encode(event)
+        try:
+            async for frames in encode_coalesced(subscription, encoder, flush_policy):
+                yield frames
+        except SubscriptionLagged:
+            # The client stopped reading for too long; it can resume from its last
+            # event ID, or reload the chat once those events are gone.
+            pass
+        finally:
+            # The run keeps going without this client.
+            subscription.close()
 
     headers: dict[str, str] = {
         "Cache-Control": "no-cache",
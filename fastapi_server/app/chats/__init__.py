@@ -17,10 +17,11 @@ import uuid as uuidpkg
 from datetime import datetime, timezone
 from typing import Any, Sequence, cast
 
-from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint
-from sqlmodel import Field, Index, SQLModel, select
+from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint, desc
+from sqlmodel import Field, Index, SQLModel, col, select
 
 from app.db import DBCtx
+from app.pagination import Cursor
 from app.users.user import User
 
 logger = logging.getLogger(__name__)
@@ -40,6 +41,8 @@ class ChatBase(SQLModel):
     __table_args__ = (
         UniqueConstraint("thread_id", "user", name="uq_thread_id_user"),
         Index("ix_thread_id_user", "thread_id", "user"),
+        # Serves listing a user's chats by recent activity (see `Chat.updated_at`).
+        Index("ix_chat_user_updated_at", "user", "updated_at"),
     )
 
     def dump_json_compatible(self) -> dict[str, Any]:
@@ -54,6 +57,13 @@ class Chat(ChatBase, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(DateTime(timezone=True), nullable=False),
     )
+    # Creation time of the latest message (or of the chat, before its first message),
+    # maintained by `MessageRepository` in the same transaction as the message write so
+    # listing chats needs no extra query.
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
 
     def dump_json_compatible(self) -> dict[str, Any]:
         return cast(dict[str, Any], json.loads(self.model_dump_json()))
@@ -75,6 +85,7 @@ class ChatRepository:
 
     async def create_chat(self, chat_data: ChatCreate) -> Chat:
         chat = Chat(**chat_data.model_dump())
+        chat.updated_at = chat.created_at
 
         async with self._db.session(writable=True) as session:
             session.add(chat)
@@ -99,10 +110,28 @@ class ChatRepository:
             response = await sess.exec(query)
             return response.one_or_none()
 
-    async def get_all_chats(self, user: User | None) -> Sequence[Chat]:
-        query = select(Chat)
+    async def get_all_chats(
+        self,
+        user: User | None,
+        limit: int | None = None,
+        cursor: Cursor | None = None,
+    ) -> Sequence[Chat]:
+        """
+        Return chats, most recently updated first.
+
+        Args:
+            user (User | None): Only return chats of this user, if given.
+            limit (int | None): Maximum number of chats to return (all if None).
+            cursor (Cursor | None): Only return chats after this position, i.e. the
+                `(updated_at, uuid)` of the last chat of the previous page.
+        """
+        query = select(Chat).order_by(desc(col(Chat.updated_at)), desc(col(Chat.uuid)))
         if user:
             query = query.where(Chat.user_uuid == user.uuid)
+        if cursor:
+            query = query.where(cursor.before(col(Chat.updated_at), col(Chat.uuid)))
+        if limit:
+            query = query.limit(limit)
         async with self._db.session() as sess:
             response = await sess.exec(query)
             return response.all()
@@ -23,7 +23,9 @@ from datarobot.core.config import (
 )
 from pydantic_settings import PydanticBaseSettingsSource
 
+from app.ag_ui.run_state import RunStateBackendName
 from app.auth.oauth import OAuthImpl
+from app.db import EngineProfileName
 
 
 class Config(DataRobotAppFrameworkBaseSettings):
@@ -47,6 +49,7 @@ class Config(DataRobotAppFrameworkBaseSettings):
             file_secret_settings,
             PulumiConfigSettingsSource(settings_cls),
         )
+
     session_secret_key: str
 
     datarobot_endpoint: str
@@ -60,6 +63,15 @@ class Config(DataRobotAppFrameworkBaseSettings):
     log_format: FormatType = "text"
 
     agent_endpoint: str = "http://localhost:8842"
+    # Connection pool of the shared clients used to call the agent
+    agent_max_connections: int = 100
+    agent_max_keepalive_connections: int = 20
+    agent_keepalive_expiry_seconds: float = 60.0
+    # How long a streamed agent run may go without sending anything before it fails
+    agent_read_timeout_seconds: float = 600.0
+    # Opt-in: requires the `h2` package (httpx[http2]), which is not a dependency;
+    # HTTP/1.1 is used without it
+    agent_http2: bool = False
 
     oauth_impl: OAuthImpl = OAuthImpl.DATAROBOT
     datarobot_oauth_providers: Sequence[str] = ()
@@ -80,9 +92,47 @@ class Config(DataRobotAppFrameworkBaseSettings):
     test_user_email: str | None = None
 
     database_uri: str = "sqlite+aiosqlite:///.data/database.sqlite"
+    # Engine tuning profile (see app.db.ENGINE_PROFILES) and per-setting overrides
+    database_engine_profile: EngineProfileName = EngineProfileName.TUNED
+    database_pool_size: int | None = None
+    database_max_overflow: int | None = None
+    database_statement_cache_size: int | None = None
 
     # The number of characters to stream before persisting
     minimal_chunks_to_persist: int = 5000
+    # Merge consecutive text deltas of the agent up to this many characters or this
+    # long after the first one (0 or 1: disabled)
+    text_delta_merge_max_chars: int = 0
+    text_delta_merge_max_delay_seconds: float = 0.05
+    # The number of events of a run buffered for its clients; a client that falls further
+    # behind is dropped and has to resume from its last event ID
+    run_event_buffer_size: int = 1024
+    # How long the buffered events of a finished run can still be resumed
+    run_event_retention_seconds: float = 60.0
+    # Admission control for agent runs; runs beyond the limits wait in a fair queue
+    max_concurrent_runs: int = 32
+    max_concurrent_runs_per_user: int = 2
+    max_queued_runs: int = 256
+    # How long shutdown waits for agent runs in progress before cancelling them
+    run_shutdown_timeout_seconds: float = 30.0
+    # Where runs are recorded, so that any replica can serve their clients
+    run_state_backend: RunStateBackendName = RunStateBackendName.MEMORY
+    run_state_directory: str = ".data/runs"
+    # Token deltas streamed to clients are written together within this window / size
+    sse_flush_interval_seconds: float = 0.01
+    sse_flush_bytes: int = 16 * 1024
+
+    # The DuckDB file of the analysis timeseries, and how long after a write it is
+    # published to persistent storage (writes within that window are published together)
+    analysis_duckdb_path: str = ".data/analysis_timeseries.duckdb"
+    analysis_duckdb_checkpoint_delay_seconds: float = 5.0
+    # A reading is an anomaly when its power diverges from the prediction by more than
+    # this many kWh, this percentage of the prediction, or this z-score against the
+    # window of preceding readings (unset: not checked)
+    analysis_anomaly_divergence_kwh: float | None = 100.0
+    analysis_anomaly_divergence_pct: float | None = None
+    analysis_anomaly_zscore: float | None = None
+    analysis_anomaly_window: int = 60
 
     # Snowflake configuration
     snowflake_account: str | None = None
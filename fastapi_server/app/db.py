@@ -15,33 +15,148 @@
 import logging
 from asyncio import Lock
 from contextlib import asynccontextmanager, nullcontext
-from typing import AsyncGenerator, cast
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncGenerator, Mapping, cast
 
 from core.persistent_fs.dr_file_system import (
     DRFileSystem,
     all_env_variables_present,
     calculate_checksum,
 )
-from sqlalchemy import event, text
+from sqlalchemy import URL, event, make_url, text
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import UOWTransaction
+from sqlalchemy.pool import ConnectionPoolEntry
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 logger = logging.getLogger()
 
 
+@dataclass(frozen=True)
+class EngineProfile:
+    """
+    Engine tuning knobs. `None` leaves the SQLAlchemy / driver default in place.
+
+    Pool sizing only applies to pooled engines (file SQLite databases and PostgreSQL);
+    in-memory SQLite always uses a single static connection.
+    """
+
+    pool_size: int | None = None
+    max_overflow: int | None = None
+    pool_timeout: float | None = None
+    pool_recycle: int | None = None
+    pool_pre_ping: bool = False
+    # SQLAlchemy's cache of compiled SQL constructs, per engine.
+    query_cache_size: int | None = None
+    # The driver's prepared statement cache, per connection
+    # (sqlite3 `cached_statements`, asyncpg `prepared_statement_cache_size`).
+    statement_cache_size: int | None = None
+    # Applied with `PRAGMA name=value` on every new SQLite connection.
+    sqlite_pragmas: Mapping[str, str | int] = field(default_factory=dict)
+    # Sent as asyncpg `server_settings` on every new PostgreSQL connection.
+    postgres_server_settings: Mapping[str, str] = field(default_factory=dict)
+
+    def engine_kwargs(self, url: URL) -> dict[str, Any]:
+        """Keyword arguments for `create_async_engine` for the given database URL."""
+        kwargs: dict[str, Any] = {"pool_pre_ping": self.pool_pre_ping}
+        if self.query_cache_size is not None:
+            kwargs["query_cache_size"] = self.query_cache_size
+
+        if not _is_in_memory_sqlite(url):
+            pool_options = {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "pool_timeout": self.pool_timeout,
+                "pool_recycle": self.pool_recycle,
+            }
+            kwargs.update({k: v for k, v in pool_options.items() if v is not None})
+
+        connect_args: dict[str, Any] = {}
+        if url.get_backend_name() == "sqlite":
+            if self.statement_cache_size is not None:
+                connect_args["cached_statements"] = self.statement_cache_size
+        elif url.get_driver_name() == "asyncpg":
+            if self.statement_cache_size is not None:
+                connect_args["prepared_statement_cache_size"] = (
+                    self.statement_cache_size
+                )
+            if self.postgres_server_settings:
+                connect_args["server_settings"] = dict(self.postgres_server_settings)
+        if connect_args:
+            kwargs["connect_args"] = connect_args
+        return kwargs
+
+    def sqlite_pragmas_for(self, url: URL) -> dict[str, str | int]:
+        """
+        The pragmas to apply for the given SQLite URL.
+
+        WAL journaling and memory mapping are skipped where they cannot work: in-memory
+        databases have no journal file, and databases synced to DataRobot file storage
+        are copied and replaced as a single file underneath open connections.
+        """
+        pragmas = dict(self.sqlite_pragmas)
+        if _is_in_memory_sqlite(url):
+            pragmas.pop("journal_mode", None)
+        elif _is_persisted_sqlite(url):
+            pragmas.pop("mmap_size", None)
+            if str(pragmas.get("journal_mode", "")).upper() == "WAL":
+                pragmas.pop("journal_mode")
+        return pragmas
+
+
+class EngineProfileName(str, Enum):
+    """Named engine profiles, selectable with the `DATABASE_ENGINE_PROFILE` setting."""
+
+    # SQLAlchemy and driver defaults, with no pragmas.
+    DEFAULT = "default"
+    # Larger pools and statement caches, WAL journaling and a bigger page cache.
+    TUNED = "tuned"
+
+
+ENGINE_PROFILES: dict[EngineProfileName, EngineProfile] = {
+    EngineProfileName.DEFAULT: EngineProfile(),
+    EngineProfileName.TUNED: EngineProfile(
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=10,
+        pool_recycle=30 * 60,
+        query_cache_size=1000,
+        statement_cache_size=256,
+        sqlite_pragmas={
+            "journal_mode": "WAL",
+            # Durable with WAL except on power loss, without an fsync per commit.
+            "synchronous": "NORMAL",
+            # Negative values are KiB: 64 MiB of page cache per connection.
+            "cache_size": -64 * 1024,
+            "mmap_size": 256 * 1024 * 1024,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,
+        },
+        postgres_server_settings={"jit": "off"},
+    ),
+}
+
+
+def _is_in_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _is_persisted_sqlite(url: URL) -> bool:
+    return (
+        all_env_variables_present()
+        and url.get_backend_name() == "sqlite"
+        and not _is_in_memory_sqlite(url)
+    )
+
+
 def _prepare_persistence_storage(
     engine: AsyncEngine,
 ) -> tuple[DRFileSystem, str] | tuple[None, None]:
-    if not all_env_variables_present():
-        return None, None
-
-    if "sqlite" not in engine.url.drivername:
-        return None, None
-    if not engine.url.database or ":memory:" == engine.url.database:
+    if not _is_persisted_sqlite(engine.url):
         return None, None
 
-    file_path = engine.url.database
+    file_path = cast(str, engine.url.database)
     persistent_fs = DRFileSystem()
     return persistent_fs, file_path
 
@@ -114,11 +229,34 @@ class DBCtx:
         await self.engine.dispose()
 
 
-async def create_db_ctx(db_url: str, log_sql_stmts: bool = False) -> DBCtx:
+def _listen_sqlite_pragmas(
+    engine: AsyncEngine, pragmas: Mapping[str, str | int]
+) -> None:
+    def set_pragmas(
+        dbapi_connection: Any, connection_record: ConnectionPoolEntry
+    ) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    event.listen(engine.sync_engine, "connect", set_pragmas)
+
+
+async def create_db_ctx(
+    db_url: str,
+    log_sql_stmts: bool = False,
+    profile: EngineProfile = ENGINE_PROFILES[EngineProfileName.TUNED],
+) -> DBCtx:
+    url = make_url(db_url)
     async_engine = create_async_engine(
-        db_url,
+        url,
         echo=log_sql_stmts,
+        **profile.engine_kwargs(url),
     )
+    if url.get_backend_name() == "sqlite":
+        if pragmas := profile.sqlite_pragmas_for(url):
+            _listen_sqlite_pragmas(async_engine, pragmas)
 
     async with async_engine.begin() as conn:
         # testing DB credentials...
@@ -13,21 +13,23 @@
 # limitations under the License.
 import logging
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import AsyncGenerator, Dict
+from typing import Any, AsyncGenerator, Dict
 from urllib.parse import urlparse
 from uuid import UUID
 
 from datarobot.auth.oauth import AsyncOAuthComponent
 
+from app.ag_ui.clients import ClientLimits, OpenAIClientPool
 from app.ag_ui.stream_manager import AGUIStreamManager, create_stream_manager
+from app.analysis_duckdb import DuckDBConnectionManager
 from app.analysis_reports import AnalysisReportRepository
 from app.auth.api_key import APIKeyValidator
 from app.auth.oauth import get_oauth
 from app.chats import ChatRepository
 from app.config import Config
-from app.db import DBCtx, create_db_ctx
+from app.db import ENGINE_PROFILES, DBCtx, EngineProfile, create_db_ctx
 from app.messages import MessageRepository
 from app.users.identity import IdentityRepository
 from app.users.tokens import Tokens
@@ -38,7 +40,9 @@ logger = logging.getLogger(__name__)
 
 @dataclass
 class Deps:
+    agent_clients: OpenAIClientPool
     api_key_validator: APIKeyValidator
+    analysis_duckdb: DuckDBConnectionManager
     analysis_report_repo: AnalysisReportRepository
     auth: AsyncOAuthComponent
     chat_repo: ChatRepository
@@ -70,6 +74,19 @@ def sqlite_uri_to_path(uri: str) -> Path | None:
     return Path(db_path_str)
 
 
+def engine_profile(config: Config) -> EngineProfile:
+    """The configured engine profile with any per-setting overrides applied."""
+    overrides: dict[str, Any] = {
+        "pool_size": config.database_pool_size,
+        "max_overflow": config.database_max_overflow,
+        "statement_cache_size": config.database_statement_cache_size,
+    }
+    return replace(
+        ENGINE_PROFILES[config.database_engine_profile],
+        **{k: v for k, v in overrides.items() if v is not None},
+    )
+
+
 @asynccontextmanager
 async def create_deps(
     config: Config, deps: Deps | None = None
@@ -89,7 +106,7 @@ async def create_deps(
     if db_path:
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    db = await create_db_ctx(config.database_uri)
+    db = await create_db_ctx(config.database_uri, profile=engine_profile(config))
 
     api_key_validator = APIKeyValidator(datarobot_endpoint=config.datarobot_endpoint)
 
@@ -112,16 +129,22 @@ async def create_deps(
     chat_repo = ChatRepository(db)
     message_repo = MessageRepository(db)
     analysis_report_repo = AnalysisReportRepository(db)
+    analysis_duckdb = DuckDBConnectionManager.from_config(config)
 
+    # Connections to the agent are shared by all runs and kept alive between them
+    agent_clients = OpenAIClientPool(ClientLimits.from_config(config))
     stream_manager = create_stream_manager(
         name="agent",
         chat_repo=chat_repo,
         message_repo=message_repo,
         config=config,
+        clients=agent_clients,
     )
 
     yield Deps(
         config=config,
+        agent_clients=agent_clients,
+        analysis_duckdb=analysis_duckdb,
         analysis_report_repo=analysis_report_repo,
         chat_repo=chat_repo,
         message_repo=message_repo,
@@ -135,5 +158,8 @@ async def create_deps(
     )
 
     # shutdown routine
+    await stream_manager.shutdown(config.run_shutdown_timeout_seconds)
+    await agent_clients.close()
     await oauth.close()
+    analysis_duckdb.close()
     await db.shutdown()
@@ -16,14 +16,34 @@ import logging
 import uuid as uuidpkg
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Sequence, cast
-
-from sqlalchemy import Column, DateTime, ForeignKey, desc
+from typing import Any, Collection, Sequence, cast
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Update,
+    case,
+    desc,
+    func,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
-from sqlmodel import Field, Index, Relationship, SQLModel, UniqueConstraint, select
-
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlmodel import (
+    Field,
+    Index,
+    Relationship,
+    SQLModel,
+    UniqueConstraint,
+    col,
+    select,
+)
+
+from app.chats import Chat
 from app.db import DBCtx
+from app.pagination import Cursor
 
 logger = logging.getLogger(__name__)
 
@@ -212,6 +232,43 @@ class MessageReasoningUpdate(SQLModel):
     in_progress: bool | None = Field(default=False)
 
 
+class MessageRelationship(str, Enum):
+    """Relationships of a message that read methods can eagerly load with `load=`."""
+
+    TOOL_CALLS = "tool_calls"
+    REASONINGS = "reasonings"
+
+
+ALL_MESSAGE_RELATIONSHIPS = frozenset(MessageRelationship)
+
+
+def _load_options(load: Collection[MessageRelationship]) -> list[LoaderOption]:
+    return [selectinload(getattr(Message, relationship.value)) for relationship in load]
+
+
+def _update_values(changes: SQLModel) -> dict[str, Any]:
+    return {
+        field: value
+        for field, value in changes.model_dump(exclude_unset=True).items()
+        if value is not None
+    }
+
+
+def _touch_chat(chat_id: uuidpkg.UUID, created_at: datetime) -> Update:
+    """Move the chat's `updated_at` forward to a new message's creation time."""
+    updated_at = col(Chat.updated_at)
+    return (
+        update(Chat)
+        .where(col(Chat.uuid) == chat_id)
+        .values(
+            updated_at=case(
+                (updated_at < created_at, created_at),
+                else_=updated_at,
+            )
+        )
+    )
+
+
 class MessageRepository:
     """
     Message repository class to handle message-related database operations.
@@ -230,41 +287,26 @@ class MessageRepository:
 
         async with self._db.session(writable=True) as session:
             session.add(message)
+            if message.chat_id:
+                await session.exec(_touch_chat(message.chat_id, message.created_at))
             try:
                 await session.commit()
             except IntegrityError:
                 await session.rollback()
                 raise ValueError(f"Chat with ID {message_data.chat_id} does not exist")
-            await session.refresh(message)
             return message
 
     async def update_message(
         self,
         uuid: uuidpkg.UUID,
         update: "MessageUpdate",
-    ) -> Message | None:
-        """Update a message (must be owned by the user)."""
+    ) -> bool:
+        """
+        Update a message with a single UPDATE statement (without loading it).
+        Returns whether the message exists and was updated.
+        """
         logger.debug("Writing message")
-        async with self._db.session(writable=True) as session:
-            query = await session.exec(
-                select(Message)
-                .where(
-                    Message.uuid == uuid,
-                )
-                .options(selectinload("*"))
-            )
-            message = query.first()
-            if not message:
-                return None
-
-            for field, value in update.model_dump(exclude_unset=True).items():
-                if value is not None:
-                    setattr(message, field, value)
-
-            await session.commit()
-            await session.refresh(message)
-
-            return message
+        return await self._update(Message, uuid, update)
 
     async def create_message_tool_call(
         self, message_tool_call_data: MessageToolCallCreate
@@ -282,34 +324,15 @@ class MessageRepository:
                 raise ValueError(
                     f"Message with ID {message_tool_call_data.message_uuid} does not exist"
                 )
-            await session.refresh(message_tool_call)
             return message_tool_call
 
     async def update_message_tool_call(
         self, uuid: uuidpkg.UUID, update: MessageToolCallUpdate
-    ) -> MessageToolCall | None:
+    ) -> bool:
         """
-        Updates a tool call in a message.
+        Updates a tool call in a message. Returns whether the tool call was updated.
         """
-        async with self._db.session(writable=True) as session:
-            query = await session.exec(
-                select(MessageToolCall)
-                .where(
-                    MessageToolCall.uuid == uuid,
-                )
-                .options(selectinload("*"))
-            )
-            tool_call = query.first()
-            if not tool_call:
-                return None
-
-            for field, value in update.model_dump(exclude_unset=True).items():
-                if value is not None:
-                    setattr(tool_call, field, value)
-
-            await session.commit()
-            await session.refresh(tool_call)
-            return tool_call
+        return await self._update(MessageToolCall, uuid, update)
 
     async def create_message_reasoning(
         self, message_tool_call_data: MessageReasoningCreate
@@ -327,59 +350,67 @@ class MessageRepository:
                 raise ValueError(
                     f"Message with ID {message_tool_call_data.message_uuid} does not exist"
                 )
-            await session.refresh(reasoning)
             return reasoning
 
     async def update_message_reasoning(
         self, uuid: uuidpkg.UUID, update: MessageReasoningUpdate
-    ) -> MessageReasoning | None:
+    ) -> bool:
         """
-        Updates a tool call in a message.
+        Updates a reasoning in a message. Returns whether the reasoning was updated.
         """
-        async with self._db.session(writable=True) as session:
-            query = await session.exec(
-                select(MessageReasoning)
-                .where(
-                    MessageReasoning.uuid == uuid,
-                )
-                .options(selectinload("*"))
-            )
-            reasoning = query.first()
-            if not reasoning:
-                return None
+        return await self._update(MessageReasoning, uuid, update)
 
-            for field, value in update.model_dump(exclude_unset=True).items():
-                if value is not None:
-                    setattr(reasoning, field, value)
+    async def _update(
+        self,
+        table: type[Message] | type[MessageToolCall] | type[MessageReasoning],
+        uuid: uuidpkg.UUID,
+        changes: SQLModel,
+    ) -> bool:
+        values = _update_values(changes)
+        if not values:
+            return False
 
+        async with self._db.session(writable=True) as session:
+            result = await session.exec(
+                update(table)
+                .where(col(table.uuid) == uuid)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
             await session.commit()
-            await session.refresh(reasoning)
-            return reasoning
+            return bool(result.rowcount)
 
-    async def get_message(self, uuid: uuidpkg.UUID) -> Message | None:
+    async def get_message(
+        self,
+        uuid: uuidpkg.UUID,
+        load: Collection[MessageRelationship] = (),
+    ) -> Message | None:
         """
-        Retrieve a message by their ID.
+        Retrieve a message by their ID, eagerly loading the `load` relationships.
         """
         async with self._db.session() as sess:
             response = await sess.exec(
                 select(Message)
                 .where(Message.uuid == uuid)
-                .options(selectinload("*"))
+                .options(*_load_options(load))
                 .limit(1)
             )
             return response.one_or_none()
 
     async def get_message_by_agui_id(
-        self, chat_id: uuidpkg.UUID, agui_id: str
+        self,
+        chat_id: uuidpkg.UUID,
+        agui_id: str,
+        load: Collection[MessageRelationship] = (),
     ) -> Message | None:
         """
-        Retrieve messages from an AGUI ID.
+        Retrieve messages from an AGUI ID, eagerly loading the `load` relationships.
         """
         async with self._db.session(False) as sess:
             response = await sess.exec(
                 select(Message)
                 .where(Message.chat_id == chat_id, Message.agui_id == agui_id)
-                .options(selectinload("*"))
+                .options(*_load_options(load))
                 .limit(1)
             )
             return response.one_or_none()
@@ -397,48 +428,80 @@ class MessageRepository:
                     MessageToolCall.message_uuid == message_uuid,
                     MessageToolCall.agui_id == agui_id,
                 )
-                .options(selectinload("*"))
                 .limit(1)
             )
             return response.one_or_none()
 
-    async def get_chat_messages(self, chat_id: uuidpkg.UUID) -> Sequence[Message]:
+    async def get_chat_messages(
+        self,
+        chat_id: uuidpkg.UUID,
+        limit: int | None = None,
+        cursor: Cursor | None = None,
+        load: Collection[MessageRelationship] = (),
+    ) -> Sequence[Message]:
         """
-        Retrieve all messages from the chat.
+        Retrieve messages from the chat in chronological order, eagerly loading the
+        `load` relationships.
+
+        With a `limit`, only the newest `limit` messages are returned; pass a cursor
+        built from the oldest of them (`created_at`, `uuid`) to page further back.
         """
-        async with self._db.session() as sess:
-            response = await sess.exec(
-                select(Message)
-                .where(Message.chat_id == chat_id)
-                .order_by(Message.created_at)  # type: ignore[arg-type]
-                .options(selectinload("*"))
+        query = (
+            select(Message)
+            .where(Message.chat_id == chat_id)
+            .order_by(desc(col(Message.created_at)), desc(col(Message.uuid)))
+            .options(*_load_options(load))
+        )
+        if cursor:
+            query = query.where(
+                cursor.before(col(Message.created_at), col(Message.uuid))
             )
-            return response.all()
+        if limit:
+            query = query.limit(limit)
+
+        async with self._db.session() as sess:
+            response = await sess.exec(query)
+            return list(reversed(response.all()))
 
     async def get_last_messages(
-        self, chat_ids: list[uuidpkg.UUID]
+        self,
+        chat_ids: list[uuidpkg.UUID],
+        load: Collection[MessageRelationship] = (),
     ) -> dict[uuidpkg.UUID, Message]:
         """
-        Retrieve last messages from each chat in the list.
+        Retrieve last messages from each chat in the list, eagerly loading the `load`
+        relationships.
+
+        The latest message per chat is picked with a single ``ROW_NUMBER()`` window
+        query (supported by both SQLite and PostgreSQL) instead of one query per chat.
         """
         if not chat_ids:
             return {}
 
-        async with self._db.session() as sess:
-            result_dict = {}
-
-            # For each chat, get the latest message
-            # This approach avoids the GROUP BY error and is compatible with both SQLite and PostgreSQL
-            for chat_id in chat_ids:
-                response = await sess.exec(
-                    select(Message)
-                    .where(Message.chat_id == chat_id)
-                    .order_by(desc(Message.created_at))  # type: ignore[arg-type]
-                    .options(selectinload("*"))
-                    .limit(1)
+        ranked = (
+            select(
+                col(Message.uuid).label("uuid"),
+                func.row_number()
+                .over(
+                    partition_by=col(Message.chat_id),
+                    order_by=(desc(col(Message.created_at)), desc(col(Message.uuid))),
                 )
-                message = response.first()
-                if message:
-                    result_dict[chat_id] = message
+                .label("rank"),
+            )
+            .where(col(Message.chat_id).in_(chat_ids))
+            .subquery()
+        )
+        query = (
+            select(Message)
+            .join(ranked, col(Message.uuid) == ranked.c.uuid)
+            .where(ranked.c.rank == 1)
+            .options(*_load_options(load))
+        )
 
-            return result_dict
+        async with self._db.session() as sess:
+            response = await sess.exec(query)
+            return {
+                message.chat_id: message
+                for message in response.all()
+                if message.chat_id is not None
+            }
@@ -0,0 +1,61 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import binascii
+import uuid as uuidpkg
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Keyset pagination position: the (timestamp, uuid) sort key of the last row of a page.
+    The next page holds the rows strictly before it in descending order.
+    """
+
+    timestamp: datetime
+    uuid: uuidpkg.UUID
+
+    def encode(self) -> str:
+        raw = f"{self.timestamp.isoformat()}|{self.uuid.hex}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        """Parse an encoded cursor. Raises ValueError if it is malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(value.encode()).decode()
+            timestamp, uuid = raw.split("|")
+            parsed = datetime.fromisoformat(timestamp)
+            return cls(timestamp=parsed, uuid=uuidpkg.UUID(uuid))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {value}") from e
+
+    def before(self, timestamp_column: Any, uuid_column: Any) -> ColumnElement[bool]:
+        """A filter selecting rows that sort after this cursor in descending order."""
+        timestamp = self.timestamp
+        if timestamp.tzinfo is None:
+            # SQLite hands back naive datetimes; stored values are UTC.
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return or_(
+            timestamp_column < timestamp,
+            and_(timestamp_column == timestamp, uuid_column < self.uuid),
+        )
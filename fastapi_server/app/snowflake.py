@@ -44,13 +44,7 @@ class SnowflakeClient:
         Raises:
             ValueError: If Snowflake credentials are not configured
         """
-        if not all(
-            [
-                self.config.snowflake_account,
-                self.config.snowflake_user,
-                self.config.snowflake_password,
-            ]
-        ):
+        if not snowflake_configured(self.config):
             raise ValueError(
                 "Snowflake credentials not configured. "
                 "Please set SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, and SNOWFLAKE_PASSWORD in .env"
@@ -106,6 +100,40 @@ class SnowflakeClient:
         finally:
             cursor.close()
 
+    def fetch_arrow(self, query: str, params: dict[str, Any] | None = None) -> Any:
+        """Execute a SQL query and return results as an Arrow table.
+
+        The result batches are fetched in Snowflake's Arrow format, without
+        building a Python object per row. Requires the optional ``pyarrow``
+        package.
+
+        Args:
+            query: SQL query to execute
+            params: Optional query parameters for parameterized queries
+
+        Returns:
+            A ``pyarrow.Table`` (empty, with the query's columns, if no rows)
+
+        Raises:
+            ValueError: If Snowflake is not configured
+            Exception: If query execution fails
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            logger.info(f"Executing query: {query[:100]}...")
+            cursor.execute(query, params)
+            table = cursor.fetch_arrow_all(force_return_table=True)
+            logger.info(f"Query returned {table.num_rows} rows")
+            return table
+
+        except Exception as e:
+            logger.error(f"Query execution failed: {e}")
+            raise
+        finally:
+            cursor.close()
+
     def close(self) -> None:
         """Close the Snowflake connection."""
         if self._connection and not self._connection.is_closed():
@@ -114,6 +142,20 @@ class SnowflakeClient:
             self._connection = None
 
 
+def snowflake_configured(config: Config) -> bool:
+    """Whether the Snowflake credentials are set.
+
+    Args:
+        config: Application configuration
+
+    Returns:
+        True if the account, user and password are all set
+    """
+    return all(
+        [config.snowflake_account, config.snowflake_user, config.snowflake_password]
+    )
+
+
 def get_snowflake_client(config: Config) -> SnowflakeClient:
     """Factory function to create a Snowflake client.
 
@@ -0,0 +1,172 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark for fetching the last message of every chat (the `GET /chat` workload).
+
+Compares the former per-chat query loop with the set-based
+`MessageRepository.get_last_messages`, with and without relationship loading, and
+with listing chats by their denormalized `Chat.updated_at` column.
+
+Usage:
+    uv run python -m benchmarks.chat_list --chats 1000 --messages 5
+"""
+
+import argparse
+import asyncio
+import time
+import uuid as uuidpkg
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Sized
+
+from sqlalchemy import desc, event
+from sqlalchemy.orm import selectinload
+from sqlmodel import SQLModel, select
+
+from app.chats import Chat, ChatRepository
+from app.db import DBCtx, create_db_ctx
+from app.messages import (
+    ALL_MESSAGE_RELATIONSHIPS,
+    Message,
+    MessageRepository,
+    MessageToolCall,
+)
+from app.users.user import User
+
+
+class QueryCounter:
+    """Counts the SQL statements sent through an engine."""
+
+    def __init__(self, db: DBCtx):
+        self.count = 0
+        event.listen(db.engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args: Any) -> None:
+        self.count += 1
+
+
+async def seed(
+    db: DBCtx, chats: int, messages_per_chat: int
+) -> tuple[User, list[uuidpkg.UUID]]:
+    async with db.engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    user = User(email="bench@example.com")
+    base_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    chat_ids = []
+    async with db.session(writable=True) as session:
+        session.add(user)
+        for i in range(chats):
+            chat = Chat(
+                name=f"chat {i}",
+                thread_id=str(i),
+                user_uuid=user.uuid,
+                updated_at=base_time + timedelta(minutes=i + messages_per_chat - 1),
+            )
+            chat_ids.append(chat.uuid)
+            session.add(chat)
+            for j in range(messages_per_chat):
+                message = Message(
+                    chat_id=chat.uuid,
+                    agui_id=f"{i}-{j}",
+                    content="lorem ipsum " * 20,
+                    created_at=base_time + timedelta(minutes=i + j),
+                )
+                session.add(message)
+                session.add(MessageToolCall(message_uuid=message.uuid, name="tool"))
+        await session.commit()
+    return user, chat_ids
+
+
+async def legacy_get_last_messages(
+    db: DBCtx, chat_ids: list[uuidpkg.UUID]
+) -> dict[uuidpkg.UUID, Message]:
+    """The previous implementation: one query (plus eager loads) per chat."""
+    result_dict = {}
+    async with db.session() as sess:
+        for chat_id in chat_ids:
+            response = await sess.exec(
+                select(Message)
+                .where(Message.chat_id == chat_id)
+                .order_by(desc(Message.created_at))  # type: ignore[arg-type]
+                .options(selectinload("*"))
+                .limit(1)
+            )
+            message = response.first()
+            if message:
+                result_dict[chat_id] = message
+    return result_dict
+
+
+async def measure(
+    label: str,
+    counter: QueryCounter,
+    fn: Callable[[], Awaitable[Sized]],
+    repeat: int,
+) -> None:
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        counter.count = 0
+        start = time.perf_counter()
+        result = await fn()
+        timings.append(time.perf_counter() - start)
+        queries = counter.count
+    best = min(timings) * 1000
+    print(f"{label:<50} {best:>10.1f} ms {queries:>8} queries {len(result):>6} rows")
+
+
+async def main(db_url: str, chats: int, messages_per_chat: int, repeat: int) -> None:
+    db = await create_db_ctx(db_url)
+    user, chat_ids = await seed(db, chats, messages_per_chat)
+    repo = MessageRepository(db)
+    chat_repo = ChatRepository(db)
+    counter = QueryCounter(db)
+
+    print(f"{chats} chats x {messages_per_chat} messages, best of {repeat}")
+    await measure(
+        "legacy per-chat loop",
+        counter,
+        lambda: legacy_get_last_messages(db, chat_ids),
+        repeat,
+    )
+    await measure(
+        "get_last_messages(load=ALL_MESSAGE_RELATIONSHIPS)",
+        counter,
+        lambda: repo.get_last_messages(chat_ids, load=ALL_MESSAGE_RELATIONSHIPS),
+        repeat,
+    )
+    await measure(
+        "get_last_messages",
+        counter,
+        lambda: repo.get_last_messages(chat_ids),
+        repeat,
+    )
+    await measure(
+        "get_all_chats (Chat.updated_at)",
+        counter,
+        lambda: chat_repo.get_all_chats(user),
+        repeat,
+    )
+    await db.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db-url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--chats", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.chats, args.messages, args.repeat))
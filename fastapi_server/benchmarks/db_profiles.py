@@ -0,0 +1,169 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark for the database engine profiles in `app.db.ENGINE_PROFILES`.
+
+Runs the chat workload against each profile: concurrent writers streaming messages
+into their chats (one insert and several updates per message, as the storage agent
+does), followed by concurrent readers listing chats and loading chat histories.
+
+Usage:
+    uv run python -m benchmarks.db_profiles --chats 50 --messages 20
+    uv run python -m benchmarks.db_profiles --db-url postgresql+asyncpg://...
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from sqlmodel import SQLModel
+
+from app.chats import Chat, ChatCreate, ChatRepository
+from app.db import ENGINE_PROFILES, DBCtx, EngineProfileName, create_db_ctx
+from app.messages import (
+    ALL_MESSAGE_RELATIONSHIPS,
+    MessageCreate,
+    MessageRepository,
+    MessageUpdate,
+)
+from app.users.user import User, UserCreate, UserRepository
+
+UPDATES_PER_MESSAGE = 5
+
+
+async def reset(db: DBCtx) -> None:
+    async with db.engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+async def gather_limited(
+    tasks: list[Callable[[], Awaitable[object]]], concurrency: int
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(task: Callable[[], Awaitable[object]]) -> None:
+        async with semaphore:
+            await task()
+
+    await asyncio.gather(*(run(task) for task in tasks))
+
+
+async def write_chat(
+    chat_repo: ChatRepository,
+    message_repo: MessageRepository,
+    user: User,
+    index: int,
+    messages: int,
+) -> None:
+    chat = await chat_repo.create_chat(
+        ChatCreate(user_uuid=user.uuid, name=f"chat {index}", thread_id=str(index))
+    )
+    for i in range(messages):
+        message = await message_repo.create_message(
+            MessageCreate(chat_id=chat.uuid, agui_id=str(i), content="")
+        )
+        content = ""
+        for _ in range(UPDATES_PER_MESSAGE):
+            content += "lorem ipsum " * 10
+            await message_repo.update_message(
+                message.uuid, MessageUpdate(content=content, in_progress=True)
+            )
+
+
+async def read_chat(
+    chat_repo: ChatRepository, message_repo: MessageRepository, user: User
+) -> None:
+    chats: list[Chat] = list(await chat_repo.get_all_chats(user, limit=50))
+    chat = random.choice(chats)
+    await message_repo.get_chat_messages(
+        chat.uuid, limit=100, load=ALL_MESSAGE_RELATIONSHIPS
+    )
+
+
+async def run_profile(
+    db_url: str,
+    name: EngineProfileName,
+    chats: int,
+    messages: int,
+    reads: int,
+    concurrency: int,
+) -> None:
+    db = await create_db_ctx(db_url, profile=ENGINE_PROFILES[name])
+    await reset(db)
+    chat_repo = ChatRepository(db)
+    message_repo = MessageRepository(db)
+    user = await UserRepository(db).create_user(
+        UserCreate(email="bench@example.com", first_name="Bench", last_name="Mark")
+    )
+
+    start = time.perf_counter()
+    await gather_limited(
+        [
+            partial(write_chat, chat_repo, message_repo, user, i, messages)
+            for i in range(chats)
+        ],
+        concurrency,
+    )
+    write_time = time.perf_counter() - start
+    writes = chats * messages * (1 + UPDATES_PER_MESSAGE)
+
+    start = time.perf_counter()
+    await gather_limited(
+        [lambda: read_chat(chat_repo, message_repo, user) for _ in range(reads)],
+        concurrency,
+    )
+    read_time = time.perf_counter() - start
+
+    print(
+        f"{name.value:<10} "
+        f"writes {write_time * 1000:>9.1f} ms ({writes / write_time:>8.0f}/s)  "
+        f"reads {read_time * 1000:>9.1f} ms ({reads / read_time:>8.0f}/s)"
+    )
+    await db.shutdown()
+
+
+async def main(
+    db_url: str | None, chats: int, messages: int, reads: int, concurrency: int
+) -> None:
+    print(
+        f"{chats} chats x {messages} messages, {reads} reads, concurrency {concurrency}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in EngineProfileName:
+            url = db_url or f"sqlite+aiosqlite:///{Path(tmp) / name.value}.sqlite"
+            await run_profile(url, name, chats, messages, reads, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--db-url",
+        default=None,
+        help="Database to benchmark against (default: a SQLite file per profile)",
+    )
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.db_url, args.chats, args.messages, args.reads, args.concurrency)
+    )
@@ -0,0 +1,82 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for decoding the AG-UI events embedded in the agent's chat completion
+chunks.
+
+Compares the former per-chunk `TypeAdapter[Event](Event)` with a cached adapter and
+with `decode_event`, on a stream that is mostly text content events. Building the
+events without validation (`model_construct`) is included for reference: it is slower
+than pydantic-core's validation.
+
+Usage:
+    uv run python -m benchmarks.event_decoding --chunks 20000
+"""
+
+import argparse
+import time
+from typing import Any, Callable
+
+from ag_ui.core import BaseEvent, Event
+from pydantic import TypeAdapter
+
+from app.ag_ui.decoder import EVENT_MODELS, decode_event
+
+
+def chunk_events(chunks: int) -> list[dict[str, Any]]:
+    events: list[dict[str, Any]] = [{"type": "TEXT_MESSAGE_START", "messageId": "m"}]
+    for i in range(chunks - 2):
+        events.append(
+            {"type": "TEXT_MESSAGE_CONTENT", "messageId": "m", "delta": f"token {i} "}
+        )
+    events.append({"type": "TEXT_MESSAGE_END", "messageId": "m"})
+    return events
+
+
+def measure(
+    label: str,
+    decode: Callable[[dict[str, Any]], BaseEvent],
+    events: list[dict[str, Any]],
+) -> None:
+    start = time.perf_counter()
+    for event in events:
+        decode(event)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed / len(events) * 1e6:>8.2f} us/chunk")
+
+
+def main(chunks: int) -> None:
+    events = chunk_events(chunks)
+    cached = TypeAdapter[Event](Event)
+    print(f"{len(events)} chunks")
+    measure(
+        "per-chunk adapter",
+        lambda data: TypeAdapter[Event](Event).validate_python(data),
+        events,
+    )
+    measure("cached adapter", cached.validate_python, events)
+    measure("decode_event", decode_event, events)
+    measure(
+        "model_construct",
+        lambda data: EVENT_MODELS[data["type"]].model_construct(**data),
+        events,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.chunks)
@@ -0,0 +1,146 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark for the latency between an agent yielding a token and the chat endpoint
+receiving it from `AGUIStreamManager`.
+
+Compares the former polling `queue.Queue` hand-off with the `RunChannel` broker, for
+several concurrent streams of tokens arriving at a fixed interval.
+
+Usage:
+    uv run python -m benchmarks.stream_latency --streams 20 --tokens 200
+"""
+
+import argparse
+import asyncio
+import queue
+import statistics
+import time
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable
+
+from ag_ui.core import BaseEvent, RunAgentInput, TextMessageContentEvent
+
+from app.ag_ui.base import AGUIAgent
+from app.ag_ui.stream_manager import AGUIStreamManager
+
+
+class TimedAgent(AGUIAgent):
+    """Yields `tokens` content events `interval` seconds apart, recording when."""
+
+    def __init__(self, tokens: int, interval: float):
+        super().__init__("timed")
+        self.tokens = tokens
+        self.interval = interval
+        self.sent: list[float] = []
+
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        for i in range(self.tokens):
+            await asyncio.sleep(self.interval)
+            self.sent.append(time.perf_counter())
+            yield TextMessageContentEvent(message_id="m", delta=str(i))
+
+
+class NoMoreEvents:
+    pass
+
+
+async def legacy_run(
+    agent: AGUIAgent, input: RunAgentInput
+) -> AsyncGenerator[BaseEvent, None]:
+    """The previous `AGUIStreamManager.run`: a thread-safe queue polled every 50 ms."""
+    q: queue.Queue[BaseEvent | NoMoreEvents] = queue.Queue()
+
+    async def populate_queue() -> None:
+        async for event in agent.run(input):
+            q.put(event)
+        q.put(NoMoreEvents())
+
+    async def iterate_queue() -> AsyncGenerator[BaseEvent, None]:
+        while True:
+            try:
+                e = q.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(0.05)
+                continue
+            if isinstance(e, NoMoreEvents):
+                break
+            else:
+                yield e
+
+    asyncio.create_task(populate_queue())
+    return iterate_queue()
+
+
+async def broker_run(
+    agent: AGUIAgent, input: RunAgentInput
+) -> AsyncIterator[BaseEvent]:
+    return await AGUIStreamManager(lambda: agent).run(input)
+
+
+async def stream_latencies(
+    run: Callable[[AGUIAgent, RunAgentInput], Awaitable[AsyncIterator[BaseEvent]]],
+    index: int,
+    tokens: int,
+    interval: float,
+) -> list[float]:
+    agent = TimedAgent(tokens, interval)
+    input = RunAgentInput(
+        thread_id=str(index),
+        run_id=str(index),
+        state=None,
+        messages=[],
+        tools=[],
+        context=[],
+        forwarded_props=None,
+    )
+    received = []
+    async for _ in await run(agent, input):
+        received.append(time.perf_counter())
+    return [(r - s) * 1000 for s, r in zip(agent.sent, received)]
+
+
+async def measure(
+    label: str,
+    run: Callable[[AGUIAgent, RunAgentInput], Awaitable[AsyncIterator[BaseEvent]]],
+    streams: int,
+    tokens: int,
+    interval: float,
+) -> None:
+    results = await asyncio.gather(
+        *(stream_latencies(run, i, tokens, interval) for i in range(streams))
+    )
+    latencies = sorted(latency for result in results for latency in result)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{label:<10} mean {statistics.mean(latencies):>7.2f} ms  "
+        f"p50 {statistics.median(latencies):>7.2f} ms  p99 {p99:>7.2f} ms"
+    )
+
+
+async def main(streams: int, tokens: int, interval: float) -> None:
+    print(f"{streams} streams x {tokens} tokens, one every {interval * 1000:.0f} ms")
+    await measure("polling", legacy_run, streams, tokens, interval)
+    await measure("broker", broker_run, streams, tokens, interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument(
+        "--interval", type=float, default=0.01, help="Seconds between tokens"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.streams, args.tokens, args.interval))
@@ -0,0 +1,109 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark for saving the timeseries of an analysis report to DuckDB.
+
+Compares the former row-by-row `executemany` insert with `save_timeseries`, which
+builds NumPy columns once and inserts them with a single `INSERT ... SELECT`.
+The default is a month of minute-level pump data.
+
+Usage:
+    uv run python -m benchmarks.timeseries_ingest --rows 43200
+"""
+
+import argparse
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from app.analysis_duckdb import (
+    TIMESERIES_TABLE,
+    DuckDBConnectionManager,
+    save_timeseries,
+)
+
+
+def chart_rows(rows: int) -> list[dict[str, Any]]:
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "timestamp": start + timedelta(minutes=i),
+            "temperature": 20.0 + i % 7,
+            "fluid_temperature": 18.0 + i % 5,
+            "pressure": 1.2,
+            "power": 300.0 + i % 50,
+            "power_prediction": 310.0,
+            "flow": None if i % 100 == 0 else 4.0,
+            "is_anomaly": i % 500 == 0,
+        }
+        for i in range(rows)
+    ]
+
+
+def executemany(db: DuckDBConnectionManager, rows: list[dict[str, Any]]) -> None:
+    report_uuid = uuid.uuid4()
+    with db.writer() as con:
+        con.executemany(
+            f"INSERT INTO {TIMESERIES_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    report_uuid,
+                    r["timestamp"],
+                    r["temperature"],
+                    r["fluid_temperature"],
+                    r["pressure"],
+                    r["power"],
+                    r["power_prediction"],
+                    r["flow"],
+                    r["is_anomaly"],
+                )
+                for r in rows
+            ],
+        )
+
+
+def measure(
+    label: str,
+    save: Callable[[DuckDBConnectionManager, list[dict[str, Any]]], object],
+    rows: list[dict[str, Any]],
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        db = DuckDBConnectionManager(str(Path(directory) / "bench.duckdb"))
+        start = time.perf_counter()
+        save(db, rows)
+        elapsed = time.perf_counter() - start
+        db.close()
+    print(f"{label:<12} {elapsed:>8.3f} s {len(rows) / elapsed:>12,.0f} rows/s")
+
+
+def main(rows: int) -> None:
+    data = chart_rows(rows)
+    print(f"{rows} rows")
+    measure("executemany", executemany, data)
+    measure(
+        "bulk",
+        lambda db, rows: save_timeseries(db, uuid.uuid4(), rows),
+        data,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=43200)
+    args = parser.parse_args()
+    main(args.rows)
@@ -0,0 +1,66 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""add_chat_updated_at
+
+Adds a denormalized `chat.updated_at` column (creation time of the latest message)
+so chats can be listed without querying their messages.
+
+Revision ID: c81e5d2a7f60
+Revises: b3a7c1f04e92
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c81e5d2a7f60"
+down_revision: Union[str, Sequence[str], None] = "b3a7c1f04e92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add and backfill chat.updated_at."""
+    op.add_column(
+        "chat",
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE chat
+        SET updated_at = COALESCE(
+            (SELECT MAX(message.created_at) FROM message
+             WHERE message.chat_id = chat.uuid),
+            chat.created_at
+        )
+        """
+    )
+    op.create_index(
+        op.f("ix_chat_user_updated_at"),
+        "chat",
+        ["user", "updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop chat.updated_at."""
+    op.drop_index(op.f("ix_chat_user_updated_at"), table_name="chat")
+    with op.batch_alter_table("chat") as batch_op:
+        batch_op.drop_column("updated_at")
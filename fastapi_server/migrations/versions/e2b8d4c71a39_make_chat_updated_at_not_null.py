@@ -0,0 +1,56 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""make_chat_updated_at_not_null
+
+Chats are listed and paged by `chat.updated_at`, so it must always be set: chats
+without one fall back to their creation time.
+
+Revision ID: e2b8d4c71a39
+Revises: c81e5d2a7f60
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b8d4c71a39"
+down_revision: Union[str, Sequence[str], None] = "c81e5d2a7f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Backfill and require chat.updated_at."""
+    op.execute("UPDATE chat SET updated_at = created_at WHERE updated_at IS NULL")
+    with op.batch_alter_table("chat") as batch_op:
+        batch_op.alter_column(
+            "updated_at",
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+        )
+
+
+def downgrade() -> None:
+    """Allow chat.updated_at to be null again."""
+    with op.batch_alter_table("chat") as batch_op:
+        batch_op.alter_column(
+            "updated_at",
+            existing_type=sa.DateTime(timezone=True),
+            nullable=True,
+        )
@@ -0,0 +1,118 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from app.ag_ui.broker import EventBroker, RunChannel, Subscription, SubscriptionLagged
+
+
+async def _collect(subscription: Subscription[int]) -> list[int]:
+    return [event async for event in subscription]
+
+
+async def test_fans_out_to_all_subscribers() -> None:
+    channel: RunChannel[int] = RunChannel("run", "thread")
+    first = channel.subscribe()
+    second = channel.subscribe()
+
+    for i in range(3):
+        await channel.publish(i)
+    channel.close()
+
+    assert await _collect(first) == [0, 1, 2]
+    assert await _collect(second) == [0, 1, 2]
+
+
+async def test_late_subscriber_receives_new_events_only() -> None:
+    channel: RunChannel[int] = RunChannel("run", "thread")
+    await channel.publish(0)
+    late = channel.subscribe()
+    await channel.publish(1)
+    channel.close()
+
+    assert await _collect(late) == [1]
+
+
+async def test_subscriber_wakes_up_on_publish() -> None:
+    channel: RunChannel[int] = RunChannel("run", "thread")
+    subscription = channel.subscribe()
+
+    pending = asyncio.create_task(anext(subscription))
+    await asyncio.sleep(0)
+    assert not pending.done()
+
+    await channel.publish(42)
+    assert await asyncio.wait_for(pending, timeout=1) == 42
+
+
+async def test_lagging_subscriber_is_dropped() -> None:
+    channel: RunChannel[int] = RunChannel("run", "thread", capacity=2)
+    lagging = channel.subscribe()
+    reading = channel.subscribe()
+
+    # Publishing never waits, even for a subscriber that does not read at all.
+    for i in range(3):
+        await asyncio.wait_for(channel.publish(i), timeout=1)
+        assert await anext(reading) == i
+    channel.close()
+
+    with pytest.raises(SubscriptionLagged):
+        await anext(lagging)
+    # Its client cannot resume either: event 0 is gone.
+    with pytest.raises(ValueError):
+        channel.subscribe(after=lagging.last_event_id)
+    assert await _collect(reading) == []
+
+
+async def test_resume_after_event_id() -> None:
+    channel: RunChannel[int] = RunChannel("run", "thread", capacity=2)
+    for i in range(3):
+        await channel.publish(i)
+    channel.close()
+
+    resumed = channel.subscribe(after=1)
+    assert await _collect(resumed) == [2]
+    assert resumed.last_event_id == 2
+    assert await _collect(channel.subscribe(after=0)) == [1, 2]
+    with pytest.raises(ValueError):
+        # Event 0 has been evicted from the ring buffer.
+        channel.subscribe(after=-1)
+    with pytest.raises(ValueError):
+        channel.subscribe(after=3)
+
+
+async def test_broker_retains_finished_runs() -> None:
+    broker: EventBroker[int] = EventBroker(retention_seconds=0.01)
+    channel = broker.open("run", "thread")
+    with pytest.raises(ValueError):
+        broker.open("run", "thread")
+
+    broker.close("run")
+    assert channel.closed
+    assert broker.get("run") is channel
+
+    await asyncio.sleep(0.05)
+    assert broker.get("run") is None
+
+
+async def test_broker_reopens_finished_run() -> None:
+    broker: EventBroker[int] = EventBroker(retention_seconds=0.01)
+    broker.open("run", "thread")
+    broker.close("run")
+    reopened = broker.open("run", "thread")
+
+    await asyncio.sleep(0.05)
+    assert broker.get("run") is reopened
@@ -0,0 +1,88 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import httpx
+import respx
+from ag_ui.core import EventType, RunAgentInput, UserMessage
+
+from app.ag_ui.clients import ClientLimits, OpenAIClientPool
+from app.ag_ui.dr import DataRobotAGUIAgent
+from app.config import Config
+
+
+async def test_pool_shares_clients_per_endpoint_and_token() -> None:
+    pool = OpenAIClientPool()
+
+    client = pool.get("http://agent/v1", "token")
+    assert pool.get("http://agent/v1", "token") is client
+    assert pool.get("http://agent/v1", "other-token") is not client
+    assert pool.get("http://other/v1", "token") is not client
+
+    await pool.close()
+    assert client.is_closed()
+    assert pool.get("http://agent/v1", "token") is not client
+    await pool.close()
+
+
+async def test_read_timeout_is_configurable(config: Config) -> None:
+    config.agent_read_timeout_seconds = 30
+    pool = OpenAIClientPool(ClientLimits.from_config(config))
+
+    client = pool.get("http://agent/v1", "token")
+    assert client.timeout == httpx.Timeout(30, connect=10)
+    await pool.close()
+
+
+async def test_agents_share_client_and_send_own_headers(config: Config) -> None:
+    config.agent_endpoint = "http://agent.test/v1"
+    # HTTP/2 is opt-in.
+    assert not ClientLimits.from_config(config).http2
+    pool = OpenAIClientPool(ClientLimits.from_config(config))
+    agents = [
+        DataRobotAGUIAgent("a", config, {"X-Run": str(i)}, clients=pool)
+        for i in range(2)
+    ]
+    assert agents[0].client is agents[1].client
+
+    with respx.mock:
+        route = respx.post("http://agent.test/v1/chat/completions").mock(
+            return_value=httpx.Response(
+                200,
+                text="data: [DONE]\n\n",
+                headers={"content-type": "text/event-stream"},
+            )
+        )
+        for i, agent in enumerate(agents):
+            events = [
+                e
+                async for e in agent.run(
+                    RunAgentInput(
+                        thread_id="t",
+                        run_id=str(i),
+                        state=None,
+                        messages=[UserMessage(id="m", content="Hi")],
+                        tools=[],
+                        context=[],
+                        forwarded_props=None,
+                    )
+                )
+            ]
+            assert events[0].type == EventType.RUN_STARTED
+
+    sent = [call.request.headers for call in route.calls]
+    assert [h["X-Run"] for h in sent] == ["0", "1"]
+    assert all(
+        h["Authorization"] == f"Bearer {config.datarobot_api_token}" for h in sent
+    )
+    await pool.close()
@@ -0,0 +1,50 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from ag_ui.core import (
+    EventType,
+    TextMessageContentEvent,
+    ThinkingTextMessageContentEvent,
+    ToolCallStartEvent,
+)
+
+from app.ag_ui.decoder import decode_event
+
+
+def test_decodes_events_by_type() -> None:
+    assert decode_event(
+        {"type": "TEXT_MESSAGE_CONTENT", "messageId": "m", "delta": "Hi"}
+    ) == TextMessageContentEvent(message_id="m", delta="Hi")
+    # Thinking events are not part of the `ag_ui.core.Event` union.
+    thinking = decode_event({"type": "THINKING_TEXT_MESSAGE_CONTENT", "delta": "Hm"})
+    assert thinking == ThinkingTextMessageContentEvent(delta="Hm")
+    assert thinking.type is EventType.THINKING_TEXT_MESSAGE_CONTENT
+    assert decode_event(
+        {"type": "TOOL_CALL_START", "toolCallId": "tc", "toolCallName": "search"}
+    ) == ToolCallStartEvent(tool_call_id="tc", tool_call_name="search")
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"type": "NOT_AN_EVENT"},
+        {"delta": "no type"},
+        {"type": "TOOL_CALL_START", "toolCallId": "tc"},
+        {"type": "TEXT_MESSAGE_CONTENT", "messageId": "m", "delta": ""},
+    ],
+)
+def test_rejects_invalid_events(data: dict[str, str]) -> None:
+    with pytest.raises(ValueError):
+        decode_event(data)
@@ -14,7 +14,7 @@
 
 import asyncio
 import uuid
-from typing import Any, AsyncIterator, Callable, Coroutine, Iterator
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Coroutine, Iterator
 from unittest.mock import patch
 
 import pytest
@@ -39,7 +39,7 @@ from openai.types.chat.chat_completion_chunk import (
     ChoiceDeltaToolCallFunction,
 )
 
-from app.ag_ui.dr import DataRobotAGUIAgent
+from app.ag_ui.dr import READ_AHEAD, DataRobotAGUIAgent, _with_heartbeat
 from app.config import Config
 
 
@@ -54,7 +54,7 @@ def set_completions(
         *args: Any, **kwargs: Any
     ) -> Coroutine[None, None, AsyncIterator[ChatCompletionChunk]]:
         async def foo() -> AsyncIterator[ChatCompletionChunk]:
-            return generate(*mock_responses)
+            return FakeStream(generate(*mock_responses))
 
         return foo()
 
@@ -80,7 +80,7 @@ def set_completions_slow(
         *args: Any, **kwargs: Any
     ) -> Coroutine[None, None, AsyncIterator[ChatCompletionChunk]]:
         async def foo() -> AsyncIterator[ChatCompletionChunk]:
-            return generate_slow(*mock_responses)
+            return FakeStream(generate_slow(*mock_responses))
 
         return foo()
 
@@ -142,7 +142,8 @@ def dr_agui_agent(name: str, config: Config) -> Iterator[DataRobotAGUIAgent]:
 
 @pytest.fixture
 def dr_agui_agent_heartbeat(name: str, config: Config) -> Iterator[DataRobotAGUIAgent]:
-    yield DataRobotAGUIAgent(name, config, heartbeat_interval=0.1, check_interval=0.02)
+    # Chunks arrive 0.1 s apart, so one heartbeat is sent before each
+    yield DataRobotAGUIAgent(name, config, heartbeat_interval=0.06)
 
 
 def run_input(*messages: Message) -> RunAgentInput:
@@ -157,12 +158,30 @@ def run_input(*messages: Message) -> RunAgentInput:
     )
 
 
-async def generate(*args: Any) -> AsyncIterator[Any]:
+class FakeStream:
+    """Stands in for `openai.AsyncStream`: iterable, and closed by `async with`."""
+
+    def __init__(self, chunks: AsyncGenerator[Any, None]):
+        self._chunks = chunks
+        self.closed = False
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._chunks
+
+    async def __aenter__(self) -> "FakeStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.closed = True
+        await self._chunks.aclose()
+
+
+async def generate(*args: Any) -> AsyncGenerator[Any, None]:
     for a in args:
         yield a
 
 
-async def generate_slow(*args: Any) -> AsyncIterator[Any]:
+async def generate_slow(*args: Any) -> AsyncGenerator[Any, None]:
     for a in args:
         await asyncio.sleep(0.1)
         yield a
@@ -329,6 +348,9 @@ async def test_run_complex_slow_stream(
         result = await run(dr_agui_agent_heartbeat)
         assert result == [
             RunStartedEvent(thread_id="thread", run_id="run"),
+            CustomEvent(
+                name="Heartbeat", value={"thread_id": "thread", "run_id": "run"}
+            ),
             TextMessageStartEvent(message_id="8825aa49-97ce-4fdf-9807-2ad9b4158acc"),
             TextMessageContentEvent(
                 message_id="8825aa49-97ce-4fdf-9807-2ad9b4158acc", delta="Hi"
@@ -354,3 +376,24 @@ async def test_run_complex_slow_stream(
             TextMessageEndEvent(message_id="8825aa49-97ce-4fdf-9807-2ad9b4158acc"),
             RunFinishedEvent(thread_id="thread", run_id="run"),
         ]
+
+
+async def test_heartbeat_reads_ahead_boundedly() -> None:
+    read = 0
+
+    async def events() -> AsyncGenerator[BaseEvent, None]:
+        nonlocal read
+        for i in range(READ_AHEAD * 2):
+            read += 1
+            yield CustomEvent(name="event", value=i)
+
+    stream = _with_heartbeat(
+        events(), lambda: CustomEvent(name="Heartbeat", value=None), 60
+    )
+    first = await anext(stream)
+    # Let the upstream run ahead while the consumer is not reading
+    await asyncio.sleep(0.05)
+    assert read <= READ_AHEAD + 2
+
+    rest = [event async for event in stream]
+    assert [e.value for e in [first, *rest]] == list(range(READ_AHEAD * 2))
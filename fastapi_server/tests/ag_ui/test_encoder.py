@@ -0,0 +1,73 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from ag_ui.core import (
+    BaseEvent,
+    CustomEvent,
+    RunFinishedEvent,
+    TextMessageContentEvent,
+)
+
+from app.ag_ui.broker import RunChannel
+from app.ag_ui.encoder import FlushPolicy, ResumableEventEncoder, encode_coalesced
+
+
+def _delta(text: str) -> TextMessageContentEvent:
+    return TextMessageContentEvent(message_id="m", delta=text)
+
+
+async def test_coalesces_deltas_and_flushes_other_events() -> None:
+    channel: RunChannel[BaseEvent] = RunChannel("r", "t")
+    subscription = channel.subscribe()
+    writes = encode_coalesced(
+        subscription, ResumableEventEncoder(), FlushPolicy(max_delay=0.05)
+    )
+
+    for text in "abc":
+        await channel.publish(_delta(text))
+    first = asyncio.create_task(anext(writes))
+    await asyncio.sleep(0.01)
+    # Still within the window, so a late delta joins the same write.
+    await channel.publish(_delta("d"))
+    # A heartbeat does not wait for the window to end.
+    await channel.publish(CustomEvent(name="Heartbeat", value={}))
+    write = await asyncio.wait_for(first, 0.04)
+    assert [line for line in write.split("\n") if line.startswith("id:")] == [
+        f"id: {i}" for i in range(5)
+    ]
+    assert '"delta":"d"' in write and '"name":"Heartbeat"' in write
+
+    await channel.publish(_delta("e"))
+    await channel.publish(RunFinishedEvent(thread_id="t", run_id="r"))
+    channel.close()
+    assert [write.count("id:") async for write in writes] == [2]
+
+
+async def test_flushes_at_byte_limit_or_window_end() -> None:
+    channel: RunChannel[BaseEvent] = RunChannel("r", "t")
+    subscription = channel.subscribe()
+    writes = encode_coalesced(
+        subscription, ResumableEventEncoder(), FlushPolicy(max_delay=0.01, max_bytes=1)
+    )
+    await channel.publish(_delta("a"))
+    await channel.publish(_delta("b"))
+    assert (await anext(writes)).count("id:") == 1
+
+    writes = encode_coalesced(
+        subscription, ResumableEventEncoder(), FlushPolicy(max_delay=0.01)
+    )
+    # The window ends with only the buffered delta.
+    assert (await anext(writes)).count("id:") == 1
@@ -0,0 +1,102 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import AsyncGenerator
+
+from ag_ui.core import (
+    BaseEvent,
+    RunAgentInput,
+    TextMessageContentEvent,
+    TextMessageEndEvent,
+    TextMessageStartEvent,
+    ThinkingTextMessageContentEvent,
+    ToolCallStartEvent,
+)
+
+from app.ag_ui.base import AGUIAgent
+from app.ag_ui.merge import AGUIAgentWithDeltaMerging
+
+INPUT = RunAgentInput(
+    thread_id="t",
+    run_id="r",
+    state=None,
+    messages=[],
+    tools=[],
+    context=[],
+    forwarded_props=None,
+)
+
+
+class ScriptedAgent(AGUIAgent):
+    """Yields the events, sleeping wherever the script has a number of seconds."""
+
+    def __init__(self, *script: BaseEvent | float):
+        super().__init__("scripted")
+        self.script = script
+
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        for step in self.script:
+            if isinstance(step, BaseEvent):
+                yield step
+            else:
+                await asyncio.sleep(step)
+
+
+def _delta(text: str, message_id: str = "m") -> TextMessageContentEvent:
+    return TextMessageContentEvent(message_id=message_id, delta=text)
+
+
+async def _run(agent: AGUIAgent) -> list[BaseEvent]:
+    return [event async for event in agent.run(INPUT)]
+
+
+async def test_merges_deltas_in_order_with_other_events() -> None:
+    inner = ScriptedAgent(
+        TextMessageStartEvent(message_id="m"),
+        _delta("Hel"),
+        _delta("lo"),
+        ToolCallStartEvent(tool_call_id="tc", tool_call_name="search"),
+        _delta(" wor"),
+        _delta("ld"),
+        _delta("!", message_id="n"),
+        ThinkingTextMessageContentEvent(delta="hm"),
+        _delta("?", message_id="n"),
+        TextMessageEndEvent(message_id="m"),
+    )
+    agent = AGUIAgentWithDeltaMerging("merge", inner, max_chars=100, max_delay=10)
+
+    assert await _run(agent) == [
+        TextMessageStartEvent(message_id="m"),
+        _delta("Hello"),
+        ToolCallStartEvent(tool_call_id="tc", tool_call_name="search"),
+        _delta(" world"),
+        _delta("!", message_id="n"),
+        ThinkingTextMessageContentEvent(delta="hm"),
+        _delta("?", message_id="n"),
+        TextMessageEndEvent(message_id="m"),
+    ]
+
+
+async def test_flushes_on_size_and_time_budget() -> None:
+    by_size = ScriptedAgent(*(_delta(c) for c in "abcdefg"))
+    agent = AGUIAgentWithDeltaMerging("merge", by_size, max_chars=3, max_delay=10)
+    assert await _run(agent) == [_delta("abc"), _delta("def"), _delta("g")]
+
+    # The merged delta is emitted when due, even while the agent is still silent.
+    by_time = ScriptedAgent(_delta("a"), _delta("b"), 0.2, _delta("c"))
+    agent = AGUIAgentWithDeltaMerging("merge", by_time, max_chars=100, max_delay=0.02)
+    events = agent.run(INPUT)
+    assert await asyncio.wait_for(anext(events), 0.1) == _delta("ab")
+    assert [e async for e in events] == [_delta("c")]
@@ -0,0 +1,114 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from pathlib import Path
+from typing import AsyncGenerator
+
+from ag_ui.core import (
+    BaseEvent,
+    RunAgentInput,
+    RunFinishedEvent,
+    RunStartedEvent,
+    TextMessageContentEvent,
+)
+
+from app.ag_ui.base import AGUIAgent
+from app.ag_ui.run_state import FileRunState
+from app.ag_ui.stream_manager import AGUIStreamManager
+
+INPUT = RunAgentInput(
+    thread_id="t",
+    run_id="r",
+    state=None,
+    messages=[],
+    tools=[],
+    context=[],
+    forwarded_props=None,
+)
+
+
+class GatedAgent(AGUIAgent):
+    def __init__(self) -> None:
+        super().__init__("gated")
+        self.gate = asyncio.Event()
+
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        yield RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
+        yield TextMessageContentEvent(message_id="m", delta="Hi")
+        await self.gate.wait()
+        yield TextMessageContentEvent(message_id="m", delta="!")
+        yield RunFinishedEvent(thread_id=input.thread_id, run_id=input.run_id)
+
+
+async def test_run_is_followed_from_another_replica(tmp_path: Path) -> None:
+    agent = GatedAgent()
+    owner = AGUIStreamManager(
+        lambda: agent,
+        run_state=FileRunState(tmp_path, poll_interval=0.01),
+        replica_id="a",
+    )
+    other = AGUIStreamManager(
+        lambda: agent,
+        run_state=FileRunState(tmp_path, poll_interval=0.01),
+        replica_id="b",
+    )
+    first = await owner.run(INPUT)
+    assert isinstance(await anext(first), RunStartedEvent)
+    assert isinstance(await anext(first), TextMessageContentEvent)
+
+    resumed = await other.subscribe("r", "t", None, after=0)
+    assert resumed is not None
+    agent.gate.set()
+
+    events = [(resumed.last_event_id, e) async for e in resumed]
+    assert [(i, type(e)) for i, e in events] == [
+        (1, TextMessageContentEvent),
+        (2, TextMessageContentEvent),
+        (3, RunFinishedEvent),
+    ]
+    assert events[0][1] == TextMessageContentEvent(message_id="m", delta="Hi")
+    assert len([e async for e in first]) == 2
+
+    # Finished runs can be replayed on any replica, unknown ones are not found.
+    replayed = await AGUIStreamManager(
+        lambda: agent, run_state=FileRunState(tmp_path), replica_id="c"
+    ).subscribe("r", "t", None, after=-1)
+    assert replayed is not None
+    assert len([e async for e in replayed]) == 4
+    assert await other.subscribe("unknown", "t", None) is None
+
+
+async def test_abandoned_run_is_no_longer_followed(tmp_path: Path) -> None:
+    run_state = FileRunState(tmp_path, stale_seconds=0.05, poll_interval=0.01)
+    await run_state.claim("r", "t", "gone")
+    await run_state.append("r", 0, RunStartedEvent(thread_id="t", run_id="r"))
+
+    events = [event async for event in run_state.events("r")]
+
+    assert events == [(0, RunStartedEvent(thread_id="t", run_id="r"))]
+    record = await run_state.lookup("r")
+    assert record is not None and not record.finished
+
+
+async def test_expired_runs_are_swept(tmp_path: Path) -> None:
+    run_state = FileRunState(tmp_path, retention_seconds=0, stale_seconds=0)
+    await run_state.claim("abandoned", "t", "gone")
+    await run_state.claim("done", "t", "a")
+    await run_state.append("done", 0, RunStartedEvent(thread_id="t", run_id="done"))
+    await asyncio.sleep(0.01)
+
+    await run_state.finish("done")
+
+    assert list(tmp_path.iterdir()) == []
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from typing import AsyncGenerator, NamedTuple
 
 import pytest
@@ -44,10 +45,11 @@ from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel
 
 from app.ag_ui.base import AGUIAgent
+from app.ag_ui.error_codes import ErrorCodes
 from app.ag_ui.storage import AGUIAgentWithStorage
 from app.chats import ChatRepository
 from app.db import DBCtx
-from app.messages import MessageRepository, Role
+from app.messages import ALL_MESSAGE_RELATIONSHIPS, MessageRepository, Role
 from app.users.user import User, UserCreate, UserRepository
 
 
@@ -155,7 +157,9 @@ async def test_no_response_chat_message_created(
 
     assert chat is not None
 
-    message = await message_repo.get_message_by_agui_id(chat_id=chat.uuid, agui_id="m1")
+    message = await message_repo.get_message_by_agui_id(
+        chat_id=chat.uuid, agui_id="m1", load=ALL_MESSAGE_RELATIONSHIPS
+    )
 
     assert message is not None
     assert message.content == "Hi"
@@ -194,6 +198,56 @@ async def test_chat_name_from_empty_string_content(
     assert chat.name == "New Chat"
 
 
+class HangingAgent(AGUIAgent):
+    """Starts a text message, then waits until cancelled."""
+
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        yield TextMessageStartEvent(message_id="m2")
+        yield TextMessageContentEvent(message_id="m2", delta="partial")
+        await asyncio.Event().wait()
+        yield TextMessageEndEvent(message_id="m2")
+
+
+async def test_cancelled_run_leaves_no_message_in_progress(
+    user: User, chat_repo: ChatRepository, message_repo: MessageRepository
+) -> None:
+    storage_agent = AGUIAgentWithStorage(
+        name="storage-agent",
+        user_id=user.uuid,
+        chat_repo=chat_repo,
+        message_repo=message_repo,
+        inner=HangingAgent("hanging"),
+    )
+    events = storage_agent.run(
+        RunAgentInput(
+            thread_id="t-cancel",
+            run_id="r",
+            state=None,
+            messages=[UserMessage(id="m1", content="Hi")],
+            tools=[],
+            context=[],
+            forwarded_props=None,
+        )
+    )
+    async for event in events:
+        if isinstance(event, TextMessageContentEvent):
+            break
+    # The agent now waits until the run is cancelled.
+    task = asyncio.create_task(anext(events))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    chat = await chat_repo.get_chat_by_thread_id(user.uuid, "t-cancel")
+    assert chat is not None
+    message = await message_repo.get_message_by_agui_id(chat.uuid, "m2")
+    assert message is not None
+    assert not message.in_progress
+    assert message.content == "partial"
+    assert message.error and ErrorCodes.RUN_CANCELLED.value in message.error
+
+
 class TC(NamedTuple):
     agui_id: str
     name: str
@@ -203,6 +257,45 @@ class TC(NamedTuple):
     error: str | None = None
 
 
+async def test_reasoning_keeps_unpersisted_content(
+    user: User,
+    chat_repo: ChatRepository,
+    message_repo: MessageRepository,
+    stub_agent: StubAgent,
+) -> None:
+    storage_agent = AGUIAgentWithStorage(
+        name="storage-agent",
+        user_id=user.uuid,
+        chat_repo=chat_repo,
+        message_repo=message_repo,
+        inner=stub_agent,
+        minimal_chunk_to_persist=100,
+    )
+    stub_agent.set_events(
+        RunStartedEvent(thread_id="t1", run_id="r1"),
+        TextMessageStartEvent(message_id="m2"),
+        TextMessageContentEvent(message_id="m2", delta="part 1."),
+        ThinkingTextMessageContentEvent(delta="t1"),
+        ThinkingTextMessageEndEvent(),
+        ThinkingTextMessageContentEvent(delta="t2"),
+        ThinkingTextMessageEndEvent(),
+        TextMessageContentEvent(message_id="m2", delta=" part 2."),
+        TextMessageEndEvent(message_id="m2"),
+        RunFinishedEvent(thread_id="t1", run_id="r1"),
+    )
+    await run(storage_agent, "t1", UserMessage(id="m1", content="Hi", name="u1"))
+
+    chat = await chat_repo.get_chat_by_thread_id(user.uuid, "t1")
+    assert chat is not None
+    message = await message_repo.get_message_by_agui_id(
+        chat.uuid, "m2", load=ALL_MESSAGE_RELATIONSHIPS
+    )
+    assert message is not None
+    assert message.content == "part 1. part 2."
+    assert sorted(r.content for r in message.reasonings) == ["t1", "t2"]
+    assert not any(r.in_progress for r in message.reasonings)
+
+
 class R(NamedTuple):
     name: str
     content: str
@@ -549,7 +642,7 @@ async def test_parameterized(
         )
         for expected_message in expected_chat.messages:
             message = await message_repo.get_message_by_agui_id(
-                chat.uuid, expected_message.agui_id
+                chat.uuid, expected_message.agui_id, load=ALL_MESSAGE_RELATIONSHIPS
             )
             assert message is not None, (
                 f"Expected message {expected_message.agui_id} to exist in thread {expected_chat.thread_id}"
@@ -12,13 +12,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from typing import AsyncGenerator
 
 import pytest
-from ag_ui.core import BaseEvent, RunAgentInput, RunFinishedEvent, RunStartedEvent
+from ag_ui.core import (
+    BaseEvent,
+    CustomEvent,
+    EventType,
+    RunAgentInput,
+    RunErrorEvent,
+    RunFinishedEvent,
+    RunStartedEvent,
+)
 
 from app.ag_ui.base import AGUIAgent
-from app.ag_ui.stream_manager import AGUIStreamManager
+from app.ag_ui.error_codes import ErrorCodes
+from app.ag_ui.stream_manager import (
+    QUEUE_POSITION_EVENT,
+    AGUIStreamManager,
+    RunNotAdmitted,
+    RunScheduler,
+)
 
 
 class StubAgent(AGUIAgent):
@@ -68,3 +83,192 @@ async def test_returns_output(
         actual.append(event)
 
     assert actual == events
+
+
+async def test_second_subscriber_follows_run(
+    stub_agent: StubAgent, stream_manager: AGUIStreamManager[[]]
+) -> None:
+    started = RunStartedEvent(thread_id="abc", run_id="123")
+    finished = RunFinishedEvent(thread_id="abc", run_id="123")
+    stub_agent.set_events(started, finished)
+    input = RunAgentInput(
+        thread_id="abc",
+        run_id="123",
+        state=None,
+        messages=[],
+        tools=[],
+        context=[],
+        forwarded_props=None,
+    )
+
+    first = await stream_manager.run(input=input)
+    second = await stream_manager.subscribe("123", "abc", None)
+    assert second is not None
+    assert await stream_manager.subscribe("123", "other-thread", None) is None
+    assert await stream_manager.subscribe("123", "abc", "other-user") is None
+
+    with pytest.raises(ValueError):
+        await stream_manager.run(input=input)
+
+    assert [e async for e in first] == [started, finished]
+    assert [e async for e in second] == [started, finished]
+
+    # Finished runs can still be replayed for a while.
+    replayed = await stream_manager.subscribe("123", "abc", None, after=-1)
+    assert replayed is not None
+    assert [e async for e in replayed] == [started, finished]
+    assert await stream_manager.subscribe("456", "abc", None) is None
+
+
+def _input(run_id: str) -> RunAgentInput:
+    return RunAgentInput(
+        thread_id="abc",
+        run_id=run_id,
+        state=None,
+        messages=[],
+        tools=[],
+        context=[],
+        forwarded_props=None,
+    )
+
+
+class GatedAgent(AGUIAgent):
+    """Emits RUN_STARTED, then waits for `gate` before finishing."""
+
+    def __init__(self) -> None:
+        super().__init__("gated")
+        self.gate = asyncio.Event()
+
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        yield RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
+        await self.gate.wait()
+        yield RunFinishedEvent(thread_id=input.thread_id, run_id=input.run_id)
+
+
+def test_scheduler_limits_and_fair_queue() -> None:
+    scheduler = RunScheduler(max_concurrent=2, max_concurrent_per_owner=1, max_queued=3)
+    a1 = scheduler.submit("a")
+    a2 = scheduler.submit("a")
+    a3 = scheduler.submit("a")
+    b1 = scheduler.submit("b")
+    c1 = scheduler.submit("c")
+
+    assert a1.granted and b1.granted
+    # Owners take turns: a's second run, then c's first, then a's third.
+    assert (a2.position, c1.position, a3.position) == (1, 2, 3)
+    with pytest.raises(RunNotAdmitted):
+        scheduler.submit("d")
+
+    # a is at its own limit, so b's slot goes to c.
+    scheduler.release(b1)
+    assert c1.granted and not a2.granted
+    assert (a2.position, a3.position) == (1, 2)
+
+    scheduler.release(a1)
+    assert a2.granted
+    assert a3.position == 1
+
+    # Withdrawing a waiting run frees its place in the queue.
+    scheduler.release(a3)
+    assert scheduler.queued == 0
+    assert scheduler.running == 2
+
+
+async def test_queued_run_reports_position() -> None:
+    agents = [GatedAgent(), GatedAgent()]
+    stream_manager = AGUIStreamManager(
+        lambda index: agents[index],
+        scheduler=RunScheduler(
+            max_concurrent=1, max_concurrent_per_owner=1, max_queued=1
+        ),
+        run_owner=lambda index: "user",
+    )
+
+    first = await stream_manager.run(_input("1"), 0)
+    second = await stream_manager.run(_input("2"), 1)
+    with pytest.raises(RunNotAdmitted):
+        await stream_manager.run(_input("3"), 1)
+
+    assert isinstance(await anext(first), RunStartedEvent)
+    assert isinstance(await anext(second), RunStartedEvent)
+    position = await anext(second)
+    assert isinstance(position, CustomEvent)
+    assert position.name == QUEUE_POSITION_EVENT
+    assert position.value == {"run_id": "2", "position": 1}
+
+    agents[0].gate.set()
+    agents[1].gate.set()
+    assert [e.type for e in [e async for e in first]] == [EventType.RUN_FINISHED]
+    # The agent's own RUN_STARTED is not repeated once the run is admitted.
+    assert [e.type for e in [e async for e in second]] == [EventType.RUN_FINISHED]
+
+
+async def test_failed_run_start_releases_its_slot() -> None:
+    def broken_factory() -> AGUIAgent:
+        raise RuntimeError("no agent")
+
+    scheduler = RunScheduler(max_concurrent=1, max_concurrent_per_owner=1, max_queued=0)
+    stream_manager = AGUIStreamManager(broken_factory, scheduler=scheduler)
+
+    with pytest.raises(RuntimeError):
+        await stream_manager.run(_input("1"))
+
+    assert (scheduler.running, scheduler.queued) == (0, 0)
+    # The run ID is free again.
+    with pytest.raises(RuntimeError):
+        await stream_manager.run(_input("1"))
+
+
+class FailingAgent(AGUIAgent):
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        yield RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
+        raise RuntimeError("upstream went away")
+
+
+async def test_failed_run_ends_with_error() -> None:
+    stream_manager = AGUIStreamManager(lambda: FailingAgent("failing"))
+
+    events = [e async for e in await stream_manager.run(_input("1"))]
+
+    assert [e.type for e in events] == [EventType.RUN_STARTED, EventType.RUN_ERROR]
+    assert isinstance(events[1], RunErrorEvent)
+    assert events[1].code == ErrorCodes.INTERNAL_ERROR.value
+
+
+async def test_shutdown_cancels_runs_after_timeout() -> None:
+    agent = GatedAgent()
+    stream_manager = AGUIStreamManager(lambda: agent)
+    subscription = await stream_manager.run(_input("1"))
+
+    await stream_manager.shutdown(timeout=0.01)
+
+    assert [e.type for e in [e async for e in subscription]] == [
+        EventType.RUN_STARTED,
+        EventType.RUN_ERROR,
+    ]
+    with pytest.raises(RunNotAdmitted):
+        await stream_manager.run(_input("2"))
+
+
+async def test_cancel_ends_run_with_error() -> None:
+    agents = [GatedAgent(), GatedAgent()]
+    scheduler = RunScheduler(max_concurrent=1, max_concurrent_per_owner=1, max_queued=1)
+    stream_manager = AGUIStreamManager(
+        lambda index: agents[index], scheduler=scheduler, run_owner=lambda index: "u"
+    )
+    running = await stream_manager.run(_input("1"), 0)
+    queued = await stream_manager.run(_input("2"), 1)
+    assert isinstance(await anext(running), RunStartedEvent)
+
+    assert not stream_manager.cancel("1", "other-thread", "u")
+    assert not stream_manager.cancel("1", "abc", "other-user")
+    assert stream_manager.cancel("1", "abc", "u")
+    assert stream_manager.cancel("2", "abc", "u")
+
+    events = [e async for e in running]
+    assert [e.type for e in events] == [EventType.RUN_ERROR]
+    assert isinstance(events[0], RunErrorEvent)
+    assert events[0].code == ErrorCodes.RUN_CANCELLED.value
+    assert [e.type for e in [e async for e in queued]][-1] == EventType.RUN_ERROR
+    assert (scheduler.running, scheduler.queued) == (0, 0)
+    assert not stream_manager.cancel("1", "abc", "u")
@@ -15,7 +15,7 @@
 import os
 from datetime import UTC, datetime, timedelta
 from typing import AsyncGenerator, Awaitable, Callable, Generator, TypeVar
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from datarobot.auth.datarobot.oauth import AsyncOAuth
@@ -25,7 +25,9 @@ from fastapi.testclient import TestClient
 from sqlmodel import SQLModel
 
 from app import create_app
+from app.ag_ui.clients import OpenAIClientPool
 from app.ag_ui.stream_manager import AGUIStreamManager
+from app.analysis_duckdb import DuckDBConnectionManager
 from app.analysis_reports import AnalysisReportRepository
 from app.auth.api_key import APIKeyValidator, DRUser
 from app.chats import ChatRepository
@@ -62,6 +64,8 @@ def deps(config: Config) -> Deps:
     """
     return Deps(
         config=config,
+        agent_clients=MagicMock(spec=OpenAIClientPool),
+        analysis_duckdb=MagicMock(spec=DuckDBConnectionManager),
         analysis_report_repo=AsyncMock(spec=AnalysisReportRepository),
         chat_repo=AsyncMock(spec=ChatRepository),
         message_repo=AsyncMock(spec=MessageRepository),
@@ -0,0 +1,76 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from typing import Any
+
+import duckdb
+
+from app.snowflake import SnowflakeClient
+
+_READINGS = {
+    "TIMESTAMP": "TIMESTAMP",
+    "TEMPERATURE_C": "DOUBLE",
+    "FLUID_TEMPERATURE_C": "DOUBLE",
+    "PUMP_OUTLET_PRESSURE_MPA": "DOUBLE",
+    "POWER_CONSUMPTION_KWH": "DOUBLE",
+    "PUMP_FLOW_L_PER_H": "DOUBLE",
+}
+_PREDICTIONS = {"TIMESTAMP": "TIMESTAMP", "POWER_CONSUMPTION_KWH_PREDICTION": "DOUBLE"}
+
+
+class FakeSnowflakeClient(SnowflakeClient):
+    """
+    A local stand-in for Snowflake: the pump tables live in an in-memory DuckDB,
+    which runs the queries as they are sent to Snowflake (with its `%(name)s`
+    parameters bound as DuckDB's `$name` ones).
+    """
+
+    def __init__(
+        self, readings: list[dict[str, Any]], predictions: list[dict[str, Any]]
+    ) -> None:
+        self._con = duckdb.connect()
+        self.closed = False
+        for table, columns, rows in [
+            ("PUMP_SYSTEM_DATA", _READINGS, readings),
+            ("PUMP_SYSTEM_DATA_PREDICTION", _PREDICTIONS, predictions),
+        ]:
+            self._con.execute(
+                f"CREATE TABLE {table} ("
+                + ", ".join(f"{name} {type_}" for name, type_ in columns.items())
+                + ")"
+            )
+            if rows:
+                self._con.executemany(
+                    f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})",
+                    [[row.get(name) for name in columns] for row in rows],
+                )
+
+    def _execute(
+        self, query: str, params: dict[str, Any] | None
+    ) -> duckdb.DuckDBPyConnection:
+        return self._con.execute(re.sub(r"%\((\w+)\)s", r"$\1", query), params or {})
+
+    def execute_query(
+        self, query: str, params: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        cursor = self._execute(query, params)
+        names = [column[0] for column in cursor.description or []]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def fetch_arrow(self, query: str, params: dict[str, Any] | None = None) -> Any:
+        return self._execute(query, params).fetch_arrow_table()
+
+    def close(self) -> None:
+        self.closed = True
@@ -11,7 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
 import uuid as uuidpkg
+from datetime import datetime, timedelta, timezone
 from typing import Any, AsyncGenerator
 
 import pytest
@@ -32,7 +34,13 @@ from fastapi.testclient import TestClient
 from httpx_sse import connect_sse
 
 from app import Deps, create_app
+from app.ag_ui.base import AGUIAgent
+from app.ag_ui.broker import RunChannel, Subscription
+from app.ag_ui.stream_manager import AGUIStreamManager
 from app.auth.ctx import AUTH_CTX_HEADER, get_auth_ctx
+from app.chats import ChatCreate
+from app.messages import MessageCreate
+from app.pagination import NEXT_CURSOR_HEADER
 from app.users.user import User, UserCreate
 from tests.conftest import dep
 
@@ -88,18 +96,23 @@ def mock_agent_runner(db_deps: Deps) -> dict[str, Any]:
         input: RunAgentInput,
         user_id: uuidpkg.UUID,
         headers: dict[str, str],
-    ) -> AsyncGenerator[BaseEvent, None]:
+    ) -> Subscription[BaseEvent]:
         # Capture the arguments for verification
         call_info["headers"] = headers
         call_info["user_id"] = user_id
 
-        async def inner() -> AsyncGenerator[BaseEvent, None]:
-            yield RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
-            yield RunFinishedEvent(
+        channel: RunChannel[BaseEvent] = RunChannel(input.run_id, input.thread_id)
+        subscription = channel.subscribe()
+        await channel.publish(
+            RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
+        )
+        await channel.publish(
+            RunFinishedEvent(
                 thread_id=input.thread_id, run_id=input.run_id, result="done"
             )
-
-        return inner()
+        )
+        channel.close()
+        return subscription
 
     db_deps.stream_manager.run = agent_run  # type:ignore[method-assign]
     return call_info
@@ -172,3 +185,141 @@ async def test_chat_endpoint_includes_auth_header(
         "JWT metadata should contain DataRobot context"
     )
     assert decoded["metadata"]["dr_ctx"]["email"] == test_chat_user.email
+
+
+async def test_get_chat_paginates_messages(
+    db_deps: Deps,
+    test_chat_user: User,
+    authenticated_chat_webapp: FastAPI,
+) -> None:
+    chat = await db_deps.chat_repo.create_chat(
+        ChatCreate(user_uuid=test_chat_user.uuid, name="paged", thread_id="paged")
+    )
+    base_time = datetime.now(timezone.utc)
+    for i in range(3):
+        await db_deps.message_repo.create_message(
+            MessageCreate(
+                chat_id=chat.uuid,
+                agui_id=f"m{i}",
+                content=str(i),
+                in_progress=False,
+                created_at=base_time + timedelta(seconds=i),
+            )
+        )
+
+    with TestClient(authenticated_chat_webapp) as client:
+        first = client.get("/api/v1/chat/paged", params={"limit": 2})
+        assert first.status_code == 200
+        assert [m["id"] for m in first.json()["messages"]] == ["m1", "m2"]
+        cursor = first.headers[NEXT_CURSOR_HEADER]
+
+        second = client.get("/api/v1/chat/paged", params={"limit": 2, "cursor": cursor})
+        assert second.status_code == 200
+        assert [m["id"] for m in second.json()["messages"]] == ["m0"]
+        assert NEXT_CURSOR_HEADER not in second.headers
+
+        invalid = client.get("/api/v1/chat/paged", params={"cursor": "garbage"})
+        assert invalid.status_code == 400
+
+
+class TwoEventAgent(AGUIAgent):
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        yield RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
+        yield RunFinishedEvent(thread_id=input.thread_id, run_id=input.run_id)
+
+
+async def test_chat_run_resumes_from_last_event_id(
+    db_deps: Deps,
+    test_chat_user: User,
+    authenticated_chat_webapp: FastAPI,
+) -> None:
+    await db_deps.chat_repo.create_chat(
+        ChatCreate(user_uuid=test_chat_user.uuid, name="resumed", thread_id="resumed")
+    )
+    db_deps.stream_manager = AGUIStreamManager(
+        lambda user_id, headers: TwoEventAgent("two-events"),
+        run_owner=lambda user_id, headers: user_id,
+    )
+    run_input = RunAgentInput(
+        thread_id="resumed",
+        run_id="run-1",
+        state="",
+        messages=[],
+        tools=[],
+        context=[],
+        forwarded_props="",
+    ).model_dump()
+
+    with TestClient(authenticated_chat_webapp) as client:
+        with connect_sse(
+            client, "POST", "/api/v1/chat", json=run_input
+        ) as event_source:
+            assert [e.id for e in event_source.iter_sse()] == ["0", "1"]
+
+        with connect_sse(
+            client,
+            "GET",
+            "/api/v1/chat/resumed/runs/run-1/events",
+            headers={"Last-Event-ID": "0"},
+        ) as event_source:
+            replayed = [
+                (e.id, json.loads(e.data)["type"]) for e in event_source.iter_sse()
+            ]
+        assert replayed == [("1", "RUN_FINISHED")]
+
+        unknown = client.get("/api/v1/chat/resumed/runs/run-2/events")
+        assert unknown.status_code == 404
+        other_thread = client.get("/api/v1/chat/other/runs/run-1/events")
+        assert other_thread.status_code == 404
+        # Finished runs can no longer be cancelled.
+        cancelled = client.delete("/api/v1/chat/resumed/runs/run-1")
+        assert cancelled.status_code == 404
+
+
+async def test_chat_run_is_not_followed_by_other_users(
+    db_deps: Deps,
+    test_chat_user: User,
+    authenticated_chat_webapp: FastAPI,
+) -> None:
+    other_user = await db_deps.user_repo.create_user(
+        UserCreate(email="other@example.com", first_name="Other", last_name="User")
+    )
+    # Thread IDs are chosen by clients, so two users can share one.
+    for user in (test_chat_user, other_user):
+        await db_deps.chat_repo.create_chat(
+            ChatCreate(user_uuid=user.uuid, name="shared", thread_id="shared")
+        )
+    db_deps.stream_manager = AGUIStreamManager(
+        lambda user_id, headers: TwoEventAgent("two-events"),
+        run_owner=lambda user_id, headers: user_id,
+    )
+    run_input = RunAgentInput(
+        thread_id="shared",
+        run_id="run-1",
+        state="",
+        messages=[],
+        tools=[],
+        context=[],
+        forwarded_props="",
+    ).model_dump()
+
+    with TestClient(authenticated_chat_webapp) as client:
+        with connect_sse(
+            client, "POST", "/api/v1/chat", json=run_input
+        ) as event_source:
+            assert [e.id for e in event_source.iter_sse()] == ["0", "1"]
+
+        authenticated_chat_webapp.dependency_overrides[get_auth_ctx] = dep(
+            AuthCtx(
+                user=AuthUser(id=str(other_user.id), email=other_user.email),
+                identities=[],
+                metadata={},
+            )
+        )
+        followed = client.get(
+            "/api/v1/chat/shared/runs/run-1/events",
+            headers={"Last-Event-ID": "-1"},
+        )
+        assert followed.status_code == 404
+        cancelled = client.delete("/api/v1/chat/shared/runs/run-1")
+        assert cancelled.status_code == 404
@@ -0,0 +1,241 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import uuid as uuidpkg
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import Deps
+from app.chats import Chat, ChatCreate
+from app.messages import (
+    MessageCreate,
+    MessageRelationship,
+    MessageToolCallCreate,
+    MessageToolCallUpdate,
+    MessageUpdate,
+    Role,
+)
+from app.pagination import Cursor
+from app.users.user import User, UserCreate
+
+BASE_TIME = datetime(2025, 10, 8, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def user(db_deps: Deps) -> User:
+    return await db_deps.user_repo.create_user(
+        UserCreate(email="messages@example.com", first_name="Al", last_name="Bo")
+    )
+
+
+async def _create_chat(db_deps: Deps, user: User, thread_id: str) -> Chat:
+    return await db_deps.chat_repo.create_chat(
+        ChatCreate(user_uuid=user.uuid, name=thread_id, thread_id=thread_id)
+    )
+
+
+async def test_get_last_messages_returns_latest_per_chat(
+    db_deps: Deps, user: User
+) -> None:
+    message_repo = db_deps.message_repo
+    first_chat = await _create_chat(db_deps, user, "first")
+    second_chat = await _create_chat(db_deps, user, "second")
+    empty_chat = await _create_chat(db_deps, user, "empty")
+
+    for i in range(3):
+        await message_repo.create_message(
+            MessageCreate(
+                chat_id=first_chat.uuid,
+                agui_id=f"first-{i}",
+                content=f"first {i}",
+                created_at=BASE_TIME + timedelta(minutes=i),
+            )
+        )
+    latest_second = await message_repo.create_message(
+        MessageCreate(
+            chat_id=second_chat.uuid,
+            agui_id="second-1",
+            role=Role.ASSISTANT.value,
+            content="second 1",
+            created_at=BASE_TIME + timedelta(minutes=10),
+        )
+    )
+    await message_repo.create_message(
+        MessageCreate(
+            chat_id=second_chat.uuid,
+            agui_id="second-0",
+            content="second 0",
+            created_at=BASE_TIME,
+        )
+    )
+    await message_repo.create_message_tool_call(
+        MessageToolCallCreate(message_uuid=latest_second.uuid, agui_id="tc-1")
+    )
+
+    last_messages = await message_repo.get_last_messages(
+        [first_chat.uuid, second_chat.uuid, empty_chat.uuid],
+        load={MessageRelationship.TOOL_CALLS},
+    )
+
+    assert set(last_messages) == {first_chat.uuid, second_chat.uuid}
+    assert last_messages[first_chat.uuid].content == "first 2"
+    assert last_messages[second_chat.uuid].uuid == latest_second.uuid
+    tool_calls = last_messages[second_chat.uuid].tool_calls
+    assert [tc.agui_id for tc in tool_calls] == ["tc-1"]
+
+
+async def test_get_last_messages_without_relationships(
+    db_deps: Deps, user: User
+) -> None:
+    message_repo = db_deps.message_repo
+    chat = await _create_chat(db_deps, user, "light")
+    await message_repo.create_message(
+        MessageCreate(chat_id=chat.uuid, agui_id="a", created_at=BASE_TIME)
+    )
+    await message_repo.create_message(
+        MessageCreate(
+            chat_id=chat.uuid,
+            agui_id="b",
+            created_at=BASE_TIME + timedelta(seconds=1),
+        )
+    )
+
+    last_messages = await message_repo.get_last_messages([chat.uuid])
+
+    assert last_messages[chat.uuid].agui_id == "b"
+    assert last_messages[chat.uuid].created_at.replace(
+        tzinfo=timezone.utc
+    ) == BASE_TIME + timedelta(seconds=1)
+
+
+async def test_update_message_writes_directly(db_deps: Deps, user: User) -> None:
+    message_repo = db_deps.message_repo
+    chat = await _create_chat(db_deps, user, "updates")
+    message = await message_repo.create_message(
+        MessageCreate(chat_id=chat.uuid, agui_id="m", content="draft")
+    )
+    tool_call = await message_repo.create_message_tool_call(
+        MessageToolCallCreate(message_uuid=message.uuid, agui_id="tc")
+    )
+
+    assert await message_repo.update_message(
+        message.uuid, MessageUpdate(content="final", in_progress=False)
+    )
+    assert await message_repo.update_message_tool_call(
+        tool_call.uuid, MessageToolCallUpdate(arguments="{}")
+    )
+    assert not await message_repo.update_message(uuidpkg.uuid4(), MessageUpdate())
+
+    updated = await message_repo.get_message(
+        message.uuid, load={MessageRelationship.TOOL_CALLS}
+    )
+    assert updated is not None
+    assert updated.content == "final"
+    assert not updated.in_progress
+    assert [(tc.agui_id, tc.arguments) for tc in updated.tool_calls] == [("tc", "{}")]
+
+
+async def test_get_last_messages_empty_input(db_deps: Deps) -> None:
+    assert await db_deps.message_repo.get_last_messages([]) == {}
+
+
+async def test_create_message_updates_chat_updated_at(
+    db_deps: Deps, user: User
+) -> None:
+    message_repo = db_deps.message_repo
+    now = datetime.now(timezone.utc)
+    older_chat = await _create_chat(db_deps, user, "older")
+    newer_chat = await _create_chat(db_deps, user, "newer")
+
+    await message_repo.create_message(
+        MessageCreate(
+            chat_id=older_chat.uuid,
+            agui_id="latest",
+            created_at=now + timedelta(days=1),
+        )
+    )
+    # An older message must not move `updated_at` backwards.
+    await message_repo.create_message(
+        MessageCreate(chat_id=older_chat.uuid, agui_id="stale", created_at=now)
+    )
+    await message_repo.create_message(
+        MessageCreate(
+            chat_id=newer_chat.uuid,
+            agui_id="newest",
+            created_at=now + timedelta(days=2),
+        )
+    )
+
+    chats = await db_deps.chat_repo.get_all_chats(user)
+
+    assert [chat.thread_id for chat in chats] == ["newer", "older"]
+    assert chats[1].updated_at
+    assert chats[1].updated_at.replace(tzinfo=timezone.utc) == now + timedelta(days=1)
+
+
+async def test_get_chat_messages_keyset_pagination(db_deps: Deps, user: User) -> None:
+    message_repo = db_deps.message_repo
+    chat = await _create_chat(db_deps, user, "paged")
+    for i in range(5):
+        await message_repo.create_message(
+            MessageCreate(
+                chat_id=chat.uuid,
+                agui_id=str(i),
+                created_at=BASE_TIME + timedelta(minutes=i),
+            )
+        )
+
+    newest = await message_repo.get_chat_messages(chat.uuid, limit=2)
+    assert [m.agui_id for m in newest] == ["3", "4"]
+
+    cursor = Cursor(timestamp=newest[0].created_at, uuid=newest[0].uuid)
+    older = await message_repo.get_chat_messages(chat.uuid, limit=2, cursor=cursor)
+    assert [m.agui_id for m in older] == ["1", "2"]
+
+    cursor = Cursor(timestamp=older[0].created_at, uuid=older[0].uuid)
+    oldest = await message_repo.get_chat_messages(chat.uuid, limit=2, cursor=cursor)
+    assert [m.agui_id for m in oldest] == ["0"]
+
+    everything = await message_repo.get_chat_messages(chat.uuid)
+    assert [m.agui_id for m in everything] == ["0", "1", "2", "3", "4"]
+
+
+async def test_get_all_chats_keyset_pagination(db_deps: Deps, user: User) -> None:
+    for i in range(3):
+        chat = await _create_chat(db_deps, user, str(i))
+        await db_deps.message_repo.create_message(
+            MessageCreate(
+                chat_id=chat.uuid,
+                agui_id="m",
+                created_at=datetime.now(timezone.utc) + timedelta(days=i),
+            )
+        )
+
+    first_page = await db_deps.chat_repo.get_all_chats(user, limit=2)
+    assert [c.thread_id for c in first_page] == ["2", "1"]
+
+    last_chat = first_page[-1]
+    assert last_chat.updated_at
+    cursor = Cursor(timestamp=last_chat.updated_at, uuid=last_chat.uuid)
+    second_page = await db_deps.chat_repo.get_all_chats(user, limit=2, cursor=cursor)
+    assert [c.thread_id for c in second_page] == ["0"]
+
+
+def test_cursor_round_trip() -> None:
+    cursor = Cursor(timestamp=BASE_TIME, uuid=uuidpkg.uuid4())
+    assert Cursor.decode(cursor.encode()) == cursor
+
+    with pytest.raises(ValueError):
+        Cursor.decode("not-a-cursor")
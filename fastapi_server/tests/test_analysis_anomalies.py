@@ -0,0 +1,88 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app.analysis_anomalies import AnomalyThresholds, detect_anomalies
+from app.analysis_duckdb import (
+    DuckDBConnectionManager,
+    load_timeseries,
+    save_timeseries,
+)
+
+START = datetime(2025, 1, 1)
+
+
+def _save(db: DuckDBConnectionManager, power: list[float | None]) -> uuid.UUID:
+    report_uuid = uuid.uuid4()
+    save_timeseries(
+        db,
+        report_uuid,
+        [
+            {
+                "timestamp": START + timedelta(minutes=i),
+                "power": p,
+                "power_prediction": 300.0,
+                # Flags saved with the rows are replaced by the detected ones.
+                "is_anomaly": i == 0,
+            }
+            for i, p in enumerate(power)
+        ],
+    )
+    return report_uuid
+
+
+def test_flags_divergence_beyond_thresholds(tmp_path: Path) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    report_uuid = _save(db, [300.0, 420.0, None, 150.0, 330.0, 0.0])
+
+    anomalies = detect_anomalies(db, report_uuid, AnomalyThresholds())
+    assert [(a["timestamp"], a["diff"], a["diff_pct"]) for a in anomalies] == [
+        (START + timedelta(minutes=1), 120.0, 40.0),
+        (START + timedelta(minutes=3), -150.0, -50.0),
+        (START + timedelta(minutes=5), -300.0, -100.0),
+    ]
+    rows = load_timeseries(db, report_uuid, "2025-01-01")
+    assert [r["is_anomaly"] for r in rows] == [False, True, False, True, False, True]
+
+    relative = AnomalyThresholds(divergence_kwh=None, divergence_pct=60.0)
+    anomalies = detect_anomalies(db, report_uuid, relative)
+    assert [a["timestamp"] for a in anomalies] == [START + timedelta(minutes=5)]
+    rows = load_timeseries(db, report_uuid, "2025-01-01")
+    assert [r["is_anomaly"] for r in rows] == [False] * 5 + [True]
+    db.close()
+
+
+def test_flags_outliers_against_rolling_baseline(tmp_path: Path) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    # A small divergence that drifts up slowly, with a single spike.
+    power = [300.0 + (i % 5) + i / 10 for i in range(100)]
+    power[70] += 40.0
+    report_uuid = _save(db, power)
+
+    thresholds = AnomalyThresholds(divergence_kwh=None, zscore=4.0, window=20)
+    anomalies = detect_anomalies(db, report_uuid, thresholds)
+    assert [a["timestamp"] for a in anomalies] == [START + timedelta(minutes=70)]
+    assert anomalies[0]["zscore"] > 4.0
+    # Without a baseline, the first reading has no z-score.
+    everything = AnomalyThresholds(divergence_kwh=-1.0)
+    assert detect_anomalies(db, report_uuid, everything)[0]["zscore"] is None
+
+    with pytest.raises(ValueError):
+        detect_anomalies(db, report_uuid, AnomalyThresholds(window=1))
+    db.close()
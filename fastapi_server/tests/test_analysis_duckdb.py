@@ -0,0 +1,286 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.analysis_duckdb import (
+    DownsampleMethod,
+    DuckDBConnectionManager,
+    TimeseriesFormat,
+    delete_timeseries,
+    export_timeseries,
+    ingest_snowflake_timeseries,
+    load_timeseries,
+    lttb_indices,
+    minmax_indices,
+    negotiate_timeseries_format,
+    save_timeseries,
+)
+from tests.fake_snowflake import FakeSnowflakeClient
+
+START = "2025-01-01"
+ROW = {
+    "timestamp": datetime(2025, 1, 2, 3, 4),
+    "temperature": 20.0,
+    "fluid_temperature": 18.5,
+    "pressure": 1.2,
+    "power": 350.0,
+    "power_prediction": 300.0,
+    "flow": 4.0,
+    "is_anomaly": False,
+}
+
+
+def test_timeseries_round_trip(tmp_path: Path) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    report_uuid = uuid.uuid4()
+    later = {**ROW, "timestamp": datetime(2025, 1, 2, 3, 5)}
+
+    save_timeseries(db, report_uuid, [later, ROW, {**ROW, "timestamp": None}])
+    save_timeseries(db, uuid.uuid4(), [ROW])
+    assert load_timeseries(db, report_uuid, START) == [ROW, later]
+
+    delete_timeseries(db, report_uuid)
+    assert load_timeseries(db, report_uuid, START) == []
+    db.close()
+
+
+def test_rows_are_filtered_by_time_range(tmp_path: Path) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    report_uuid = uuid.uuid4()
+    times = [
+        datetime(2024, 12, 31, 23, 0) + timedelta(minutes=30 * i) for i in range(4)
+    ]
+    save_timeseries(db, report_uuid, [{**ROW, "timestamp": t} for t in times])
+
+    rows = load_timeseries(db, report_uuid, START, start=times[1], end=times[3])
+    assert [r["timestamp"] for r in rows] == times[1:3]
+    aware = datetime(2025, 1, 1, 9, 0, tzinfo=timezone(timedelta(hours=9)))
+    rows = load_timeseries(db, report_uuid, START, end=aware)
+    assert [r["timestamp"] for r in rows] == times[:2]
+    db.close()
+
+
+def test_timeseries_is_ingested_from_snowflake(tmp_path: Path) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    report_uuid = uuid.uuid4()
+    times = [datetime(2025, 1, 1, 23, 0) + timedelta(hours=i) for i in range(4)]
+    snowflake = FakeSnowflakeClient(
+        readings=[
+            {
+                "TIMESTAMP": t,
+                "TEMPERATURE_C": 20.0,
+                "FLUID_TEMPERATURE_C": 18.5,
+                "PUMP_OUTLET_PRESSURE_MPA": 1.2,
+                "POWER_CONSUMPTION_KWH": 350.0,
+                "PUMP_FLOW_L_PER_H": 4.0,
+            }
+            for t in reversed(times)
+        ],
+        predictions=[
+            {"TIMESTAMP": times[1], "POWER_CONSUMPTION_KWH_PREDICTION": 300.0},
+            {"TIMESTAMP": times[2], "POWER_CONSUMPTION_KWH_PREDICTION": 200.0},
+        ],
+    )
+
+    count = ingest_snowflake_timeseries(
+        db, report_uuid, snowflake, date(2025, 1, 2), date(2025, 1, 2)
+    )
+    assert count == 3
+    assert load_timeseries(db, report_uuid, START) == [
+        {**ROW, "timestamp": times[1]},
+        {**ROW, "timestamp": times[2], "power_prediction": 200.0},
+        {**ROW, "timestamp": times[3], "power_prediction": None},
+    ]
+    db.close()
+
+
+def test_per_report_tables_are_migrated(tmp_path: Path) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    report_uuid = uuid.uuid4()
+    table = f"ts_{report_uuid.hex}"
+    with db.writer() as con:
+        con.execute(
+            f"""CREATE TABLE "{table}" ("timestamp" VARCHAR, temperature DOUBLE,
+            fluid_temperature DOUBLE, pressure DOUBLE, power DOUBLE,
+            power_prediction DOUBLE, flow DOUBLE, is_anomaly BOOLEAN)"""
+        )
+        # The labels had no year, and were sorted as strings.
+        for label in ["01/01 00:30", "12/31 23:30", "", "01/01 00:00"]:
+            con.execute(
+                f'INSERT INTO "{table}" VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [label, *list(ROW.values())[1:]],
+            )
+
+    rows = load_timeseries(db, report_uuid, "2024-12-31")
+    assert [r["timestamp"] for r in rows] == [
+        datetime(2024, 12, 31, 23, 30),
+        datetime(2025, 1, 1, 0, 0),
+        datetime(2025, 1, 1, 0, 30),
+    ]
+    with db.cursor() as con:
+        assert con.execute(
+            "SELECT count(*) FROM duckdb_tables() WHERE table_name = ?", [table]
+        ).fetchone() == (0,)
+    db.close()
+
+
+def test_failed_write_is_rolled_back(tmp_path: Path) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    with pytest.raises(RuntimeError):
+        with db.writer() as con:
+            con.execute("CREATE TABLE t (x INTEGER)")
+            raise RuntimeError
+    with db.cursor() as con:
+        assert con.execute(
+            "SELECT count(*) FROM duckdb_tables() WHERE table_name = 't'"
+        ).fetchone() == (0,)
+    db.close()
+
+
+def test_writes_are_published_together(tmp_path: Path) -> None:
+    fs = MagicMock()
+    fs.exists.return_value = False
+    db = DuckDBConnectionManager(
+        str(tmp_path / "ts.duckdb"), checkpoint_delay=0.05, fs=fs
+    )
+
+    for _ in range(3):
+        save_timeseries(db, uuid.uuid4(), [ROW])
+    fs.put.assert_not_called()
+    time.sleep(0.2)
+    assert fs.put.call_count == 1
+
+    # Closing publishes what the next checkpoint would have, and nothing unchanged.
+    save_timeseries(db, uuid.uuid4(), [ROW])
+    db.close()
+    assert fs.put.call_count == 2
+
+
+def test_failed_checkpoint_is_retried(tmp_path: Path) -> None:
+    fs = MagicMock()
+    fs.exists.return_value = False
+    fs.put.side_effect = [OSError("unavailable"), None]
+    db = DuckDBConnectionManager(
+        str(tmp_path / "ts.duckdb"), checkpoint_delay=0.05, fs=fs
+    )
+
+    save_timeseries(db, uuid.uuid4(), [ROW])
+    time.sleep(0.3)
+    assert fs.put.call_count == 2
+    db.close()
+    assert fs.put.call_count == 2
+
+
+def test_columnar_exports(tmp_path: Path) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    report_uuid = uuid.uuid4()
+    rows = [{**ROW, "timestamp": datetime(2025, 1, 2, 3, 5), "flow": None}, ROW]
+    save_timeseries(db, report_uuid, rows)
+
+    columns = json.loads(
+        export_timeseries(db, report_uuid, START, TimeseriesFormat.COLUMNS)
+    )
+    assert columns["timestamp"] == ["2025-01-02T03:04:00", "2025-01-02T03:05:00"]
+    assert columns["flow"] == [4.0, None]
+
+    parquet = tmp_path / "export.parquet"
+    parquet.write_bytes(
+        export_timeseries(db, report_uuid, START, TimeseriesFormat.PARQUET)
+    )
+    with db.cursor() as con:
+        exported = con.execute(f"SELECT * FROM '{parquet}'").fetchall()
+    assert [dict(zip(ROW, row)) for row in exported] == load_timeseries(
+        db, report_uuid, START
+    )
+
+    empty = export_timeseries(db, uuid.uuid4(), START, TimeseriesFormat.COLUMNS)
+    assert json.loads(empty)["power"] == []
+    db.close()
+
+
+def test_negotiates_the_timeseries_format() -> None:
+    assert negotiate_timeseries_format("") == TimeseriesFormat.ROWS
+    assert (
+        negotiate_timeseries_format("application/json, text/plain, */*")
+        == TimeseriesFormat.ROWS
+    )
+    assert (
+        negotiate_timeseries_format(
+            "application/json;q=0.5, application/vnd.apache.parquet"
+        )
+        == TimeseriesFormat.PARQUET
+    )
+    assert negotiate_timeseries_format("text/csv") is None
+
+
+def test_downsampling_keeps_shape_and_peaks() -> None:
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[500] = 10.0
+
+    picked = lttb_indices(x, y, 20)
+    assert len(picked) == 20 and picked[0] == 0 and picked[-1] == 999
+    assert 500 in picked and (np.diff(picked) > 0).all()
+
+    y[100] = -5.0
+    picked = minmax_indices(y, 20)
+    assert {100, 500} <= set(picked) and len(picked) <= 20
+
+
+@pytest.mark.parametrize("method", list(DownsampleMethod))
+def test_downsampled_timeseries_keep_anomalies(
+    tmp_path: Path, method: DownsampleMethod
+) -> None:
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    report_uuid = uuid.uuid4()
+    start = datetime(2025, 1, 1)
+    rows = [
+        {
+            **ROW,
+            "timestamp": start + timedelta(minutes=i),
+            "power": None if i % 10 == 0 else float(i % 60),
+            "is_anomaly": i == 333,
+        }
+        for i in range(1000)
+    ]
+    save_timeseries(db, report_uuid, rows)
+
+    loaded = load_timeseries(db, report_uuid, START, max_points=50, method=method)
+    assert 40 <= len(loaded) <= 51
+    assert [r["timestamp"] for r in loaded if r["is_anomaly"]] == [
+        datetime(2025, 1, 1, 5, 33)
+    ]
+    assert loaded == sorted(loaded, key=lambda r: r["timestamp"])
+
+    columns = json.loads(
+        export_timeseries(
+            db,
+            report_uuid,
+            START,
+            TimeseriesFormat.COLUMNS,
+            max_points=50,
+            method=method,
+        )
+    )
+    assert columns["timestamp"] == [r["timestamp"].isoformat() for r in loaded]
+    db.close()
@@ -0,0 +1,276 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Mapping
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.analysis_duckdb import DuckDBConnectionManager, load_timeseries
+from app.analysis_pipeline import PipelineExecutor, Stage, StageStatus
+from app.api.v1 import analysis
+from app.deps import Deps
+from tests.fake_snowflake import FakeSnowflakeClient
+
+
+def _sleeper(name: str, seconds: float) -> Any:
+    async def run(results: Mapping[str, Any]) -> str:
+        await asyncio.sleep(seconds)
+        return name
+
+    return run
+
+
+async def test_runs_independent_stages_concurrently() -> None:
+    threads = []
+    b_started = threading.Event()
+
+    def blocking(results: Mapping[str, Any]) -> str:
+        threads.append(threading.current_thread())
+        # Only returns in time if b runs while the write is still going on.
+        assert b_started.wait(timeout=5)
+        return "written"
+
+    async def b(results: Mapping[str, Any]) -> str:
+        b_started.set()
+        await asyncio.sleep(0.05)
+        return "b"
+
+    pipeline = PipelineExecutor(
+        [
+            Stage("write", blocking, blocking=True),
+            Stage("a", _sleeper("a", 0.1)),
+            Stage("b", b, after=("a",)),
+            Stage("done", _sleeper("done", 0), after=("write", "b")),
+        ]
+    )
+    events = [(e.stage, e.status) async for e in pipeline.run()]
+
+    assert events[:2] == [
+        ("write", StageStatus.RUNNING),
+        ("a", StageStatus.RUNNING),
+    ]
+    assert events[-2:] == [
+        ("done", StageStatus.RUNNING),
+        ("done", StageStatus.COMPLETED),
+    ]
+    assert events.index(("b", StageStatus.RUNNING)) > events.index(
+        ("a", StageStatus.COMPLETED)
+    )
+    assert threads and threads[0] is not threading.main_thread()
+    assert pipeline.results == {"write": "written", "a": "a", "b": "b", "done": "done"}
+    assert pipeline.elapsed >= 0.15
+
+
+async def test_stages_after_a_failure_are_skipped() -> None:
+    async def fail(results: Mapping[str, Any]) -> None:
+        raise RuntimeError("boom")
+
+    pipeline = PipelineExecutor(
+        [
+            Stage("fail", fail),
+            Stage("next", _sleeper("next", 0), after=("fail",)),
+            Stage("last", _sleeper("last", 0), after=("next",)),
+            Stage("other", _sleeper("other", 0)),
+        ]
+    )
+    events = {(e.stage, e.status): e async for e in pipeline.run()}
+
+    assert str(events["fail", StageStatus.FAILED].error) == "boom"
+    assert ("next", StageStatus.SKIPPED) in events
+    assert ("last", StageStatus.SKIPPED) in events
+    assert pipeline.results == {"other": "other"}
+
+    with pytest.raises(ValueError, match="cycle"):
+        PipelineExecutor([Stage("a", fail, after=("b",)), Stage("b", fail, ("a",))])
+
+
+async def test_progress_is_yielded_in_order() -> None:
+    async def chatty(results: Mapping[str, Any]) -> str:
+        pipeline.report("chatty", "a")
+        await asyncio.sleep(0.01)
+        pipeline.report("chatty", "b")
+        return "ab"
+
+    pipeline = PipelineExecutor([Stage("chatty", chatty)])
+    events = [(e.status, e.result) async for e in pipeline.run()]
+
+    assert events == [
+        (StageStatus.RUNNING, None),
+        (StageStatus.PROGRESS, "a"),
+        (StageStatus.PROGRESS, "b"),
+        (StageStatus.COMPLETED, "ab"),
+    ]
+
+
+async def test_closing_waits_for_blocking_stages() -> None:
+    started = threading.Event()
+    finished = []
+
+    def blocking(results: Mapping[str, Any]) -> None:
+        started.set()
+        time.sleep(0.1)
+        finished.append(True)
+
+    pipeline = PipelineExecutor([Stage("write", blocking, blocking=True)])
+    events = pipeline.run()
+    assert (await anext(events)).status == StageStatus.RUNNING
+    await asyncio.to_thread(started.wait)
+
+    await events.aclose()
+
+    # The thread cannot be cancelled, but it has returned by now.
+    assert finished == [True]
+
+
+class FakeAgent:
+    """Stands in for `AsyncOpenAI`: every completion streams `chunks`."""
+
+    chunks = ["Hel", "lo"]
+
+    def __init__(self) -> None:
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs: Any) -> AsyncIterator[Any]:
+        assert kwargs["stream"] is True
+
+        async def stream() -> AsyncIterator[Any]:
+            for text in [*self.chunks, None]:
+                delta = SimpleNamespace(content=text)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        return stream()
+
+
+def _sse(frames: list[str]) -> list[tuple[str, dict[str, Any]]]:
+    events = []
+    for frame in frames:
+        event, data = frame.strip().split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data[6:])))
+    return events
+
+
+def _snowflake(power: float) -> FakeSnowflakeClient:
+    """Two days of readings of `power`, all predicted at 310 kWh."""
+    times = [datetime(2025, 1, 1) + timedelta(hours=i) for i in range(48)]
+    return FakeSnowflakeClient(
+        readings=[{"TIMESTAMP": t, "POWER_CONSUMPTION_KWH": power} for t in times],
+        predictions=[
+            {"TIMESTAMP": t, "POWER_CONSUMPTION_KWH_PREDICTION": 310.0} for t in times
+        ],
+    )
+
+
+async def _run_pipeline(
+    deps: Deps, report_uuid: uuid.UUID
+) -> list[tuple[str, dict[str, Any]]]:
+    req = analysis.AnalysisRequest(start_date="2025-01-01", end_date="2025-01-01")
+    return _sse(
+        [
+            frame
+            async for frame in analysis._run_analysis_pipeline(
+                req, "http://agent", "token", deps, report_uuid
+            )
+        ]
+    )
+
+
+async def test_analysis_pipeline_stores_the_series_and_saves_the_report(
+    tmp_path: Path, deps: Deps, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    snowflake = _snowflake(power=300.0)
+    monkeypatch.setattr(analysis, "get_snowflake_client", lambda config: snowflake)
+    db = DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    deps = replace(deps, analysis_duckdb=db)
+    report_uuid = uuid.uuid4()
+    deps.analysis_report_repo.create.return_value = MagicMock(uuid=report_uuid)
+
+    events = await _run_pipeline(deps, report_uuid)
+
+    stages = [
+        (e["stage"], e["status"]) for name, e in events if name == "pipeline_stage"
+    ]
+    assert stages[:2] == [("timeseries", "running"), ("timeseries", "completed")]
+    assert stages[-1] == ("report", "completed")
+    done = events[-1]
+    assert done[0] == "analysis_complete"
+    assert done[1]["report_uuid"] == str(report_uuid) and done[1]["error"] is None
+    created = deps.analysis_report_repo.create.call_args.args[0]
+    assert (created.total_data_points, created.anomaly_count) == (24, 0)
+    assert len(load_timeseries(db, report_uuid, "2025-01-01")) == 24
+    assert snowflake.closed
+
+    # Without a saved report, the stored series is removed.
+    deps.analysis_report_repo.create.side_effect = RuntimeError("database is gone")
+    report_uuid = uuid.uuid4()
+    events = await _run_pipeline(deps, report_uuid)
+    assert events[-1][1]["report_uuid"] is None
+    assert events[-1][1]["error"] == "report: database is gone"
+    assert load_timeseries(db, report_uuid, "2025-01-01") == []
+    db.close()
+
+
+async def test_agents_stream_their_text(
+    tmp_path: Path, deps: Deps, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    snowflake = _snowflake(power=500.0)
+    monkeypatch.setattr(analysis, "get_snowflake_client", lambda config: snowflake)
+    deps.agent_clients.get.return_value = FakeAgent()
+    deps = replace(
+        deps, analysis_duckdb=DuckDBConnectionManager(str(tmp_path / "ts.duckdb"))
+    )
+    report_uuid = uuid.uuid4()
+    deps.analysis_report_repo.create.return_value = MagicMock(uuid=report_uuid)
+
+    events = await _run_pipeline(deps, report_uuid)
+
+    steps = [
+        (e["agent_id"], e["status"], e.get("delta", e.get("content")))
+        for name, e in events
+        if name == "agent_step" and e["status"] != "pending"
+    ]
+    for agent_id in (1, 2, 3):
+        assert [step for step in steps if step[0] == agent_id] == [
+            (agent_id, "running", ""),
+            (agent_id, "running", "Hel"),
+            (agent_id, "running", "lo"),
+            (agent_id, "completed", "Hello"),
+        ]
+    deps.agent_clients.get.assert_called_with("http://agent", "token")
+    created = deps.analysis_report_repo.create.call_args.args[0]
+    assert created.anomaly_count == 24
+    assert created.divergence_report == created.maintenance_actions_report == "Hello"
+    deps.analysis_duckdb.close()
+
+
+def test_analysis_needs_snowflake_without_chart_data(
+    authenticated_client: TestClient,
+) -> None:
+    response = authenticated_client.post(
+        "/api/v1/analysis/power-consumption",
+        json={"start_date": "2025-01-01", "end_date": "2025-01-01"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Snowflake credentials not configured"
@@ -22,7 +22,7 @@ handle authentication setup with a default test user.
 
 import datetime
 import uuid as uuidpkg
-from typing import Any, AsyncGenerator, Dict, Generator
+from typing import Any, Dict, Generator
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import litellm.exceptions
@@ -43,6 +43,7 @@ from fastapi import Request
 from fastapi.testclient import TestClient
 from httpx_sse import connect_sse
 
+from app.ag_ui.broker import RunChannel, Subscription
 from app.auth.ctx import (
     AUTH_CTX_HEADER,
     VISITOR_SCOPED_API_KEY_HEADER,
@@ -107,6 +108,9 @@ def sample_chat() -> Chat:
         created_at=datetime.datetime(
             2025, 10, 8, 0, 0, 0, 0, tzinfo=datetime.timezone.utc
         ),
+        updated_at=datetime.datetime(
+            2025, 10, 8, 0, 0, 0, 0, tzinfo=datetime.timezone.utc
+        ),
     )
 
 
@@ -185,14 +189,17 @@ async def test_new_chat(
         input: RunAgentInput,
         user_id: uuidpkg.UUID,
         headers: Dict[str, str],
-    ) -> AsyncGenerator[BaseEvent, None]:
-        async def inner() -> AsyncGenerator[BaseEvent, None]:
-            yield RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
-            yield RunFinishedEvent(
-                thread_id=input.thread_id, run_id=input.run_id, result=5
-            )
-
-        return inner()
+    ) -> Subscription[BaseEvent]:
+        channel: RunChannel[BaseEvent] = RunChannel(input.run_id, input.thread_id)
+        subscription = channel.subscribe()
+        await channel.publish(
+            RunStartedEvent(thread_id=input.thread_id, run_id=input.run_id)
+        )
+        await channel.publish(
+            RunFinishedEvent(thread_id=input.thread_id, run_id=input.run_id, result=5)
+        )
+        channel.close()
+        return subscription
 
     deps.stream_manager.run = agent_run  # type:ignore[method-assign]
 
@@ -226,16 +233,10 @@ def test_get_chats_with_authentication(
     deps: Deps, authenticated_client: TestClient, sample_chat: Chat
 ) -> None:
     """Example test showing how easy it is to test authenticated endpoints."""
-    with (
-        patch.object(
-            deps.chat_repo, "get_all_chats", new_callable=AsyncMock
-        ) as mock_get_chats,
-        patch.object(
-            deps.message_repo, "get_last_messages", new_callable=AsyncMock
-        ) as mock_get_messages,
-    ):
+    with patch.object(
+        deps.chat_repo, "get_all_chats", new_callable=AsyncMock
+    ) as mock_get_chats:
         mock_get_chats.return_value = [sample_chat]
-        mock_get_messages.return_value = {}
 
         response = authenticated_client.get("/api/v1/chat")
 
@@ -0,0 +1,77 @@
+# Copyright 2025 DataRobot, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import make_url, text
+
+from app.db import ENGINE_PROFILES, EngineProfile, EngineProfileName, create_db_ctx
+
+TUNED = ENGINE_PROFILES[EngineProfileName.TUNED]
+
+
+def test_engine_kwargs_in_memory_sqlite_skips_pool_sizing() -> None:
+    kwargs = TUNED.engine_kwargs(make_url("sqlite+aiosqlite:///:memory:"))
+
+    assert "pool_size" not in kwargs
+    assert kwargs["query_cache_size"] == 1000
+    assert kwargs["connect_args"] == {"cached_statements": 256}
+
+
+def test_engine_kwargs_file_sqlite() -> None:
+    kwargs = TUNED.engine_kwargs(make_url("sqlite+aiosqlite:///.data/db.sqlite"))
+
+    assert kwargs["pool_size"] == 10
+    assert kwargs["max_overflow"] == 20
+    assert kwargs["connect_args"] == {"cached_statements": 256}
+
+
+def test_engine_kwargs_asyncpg() -> None:
+    kwargs = TUNED.engine_kwargs(make_url("postgresql+asyncpg://u:p@localhost/db"))
+
+    assert kwargs["pool_size"] == 10
+    assert kwargs["pool_recycle"] == 1800
+    assert kwargs["connect_args"] == {
+        "prepared_statement_cache_size": 256,
+        "server_settings": {"jit": "off"},
+    }
+
+
+def test_default_profile_keeps_driver_defaults() -> None:
+    kwargs = EngineProfile().engine_kwargs(make_url("sqlite+aiosqlite:///db.sqlite"))
+
+    assert kwargs == {"pool_pre_ping": False}
+
+
+def test_sqlite_pragmas_for_persisted_database_skip_wal_and_mmap() -> None:
+    url = make_url("sqlite+aiosqlite:///db.sqlite")
+
+    assert TUNED.sqlite_pragmas_for(url)["journal_mode"] == "WAL"
+    with patch("app.db.all_env_variables_present", return_value=True):
+        pragmas = TUNED.sqlite_pragmas_for(url)
+    assert "journal_mode" not in pragmas
+    assert "mmap_size" not in pragmas
+    assert pragmas["synchronous"] == "NORMAL"
+
+
+async def test_create_db_ctx_applies_sqlite_pragmas(tmp_path: Path) -> None:
+    db = await create_db_ctx(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+
+    async with db.engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        # NORMAL
+        assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+        assert (await conn.execute(text("PRAGMA cache_size"))).scalar() == -65536
+    await db.shutdown()
@@ -11,14 +11,18 @@ import apiClient from '@/api/apiClient';
 const API_BASE_URL = '/v1/analysis';
 
 export interface AnomalyItem {
+  /** ISO 8601 */
   timestamp: string;
   power: number;
   power_prediction: number;
   diff: number;
   diff_pct: number;
+  /** Against the preceding readings (null without enough of them) */
+  zscore?: number | null;
 }
 
 export interface ChartDataRow {
+  /** ISO 8601 */
   timestamp: string;
   temperature?: number | null;
   fluidTemperature?: number | null;
@@ -28,12 +32,17 @@ export interface ChartDataRow {
   flow?: number | null;
 }
 
+/**
+ * Without `chart_data`, the server pulls the period's series from Snowflake.
+ * Either way, the server detects its anomalies itself: `anomaly_points` and
+ * `total_data_points` are ignored.
+ */
 export interface AnalysisRequest {
   start_date: string;
   end_date: string;
-  anomaly_points: AnomalyItem[];
-  total_data_points: number;
-  chart_data: ChartDataRow[];
+  anomaly_points?: AnomalyItem[];
+  total_data_points?: number;
+  chart_data?: ChartDataRow[];
 }
 
 export type AgentStepStatus = 'pending' | 'running' | 'completed';
@@ -43,16 +52,32 @@ export interface AgentStepEvent {
   title: string;
   description?: string;
   status: AgentStepStatus;
-  content: string;
+  /** The agent's text (absent on `delta` events) */
+  content?: string;
+  /** A piece of text streamed by the running agent, to append to `content` */
+  delta?: string;
+}
+
+export type PipelineStageStatus = 'running' | 'completed' | 'failed' | 'skipped';
+
+export interface PipelineStageEvent {
+  /** e.g. `timeseries`, `anomalies`, `agent_1`, `report` */
+  stage: string;
+  status: PipelineStageStatus;
+  elapsed_ms: number;
 }
 
 export interface AnalysisCompleteEvent {
   status: 'done';
   report_uuid?: string | null;
+  /** The first stage that failed, if any */
+  error?: string | null;
+  elapsed_ms?: number;
 }
 
 export type AnalysisSSEEvent =
   | { event: 'agent_step'; data: AgentStepEvent }
+  | { event: 'pipeline_stage'; data: PipelineStageEvent }
   | { event: 'analysis_complete'; data: AnalysisCompleteEvent };
 
 /**
@@ -153,6 +178,7 @@ export interface AnalysisReportDetail extends AnalysisReportSummary {
 }
 
 export interface TimeseriesRow {
+  /** ISO 8601 */
   timestamp: string;
   temperature: number | null;
   fluid_temperature: number | null;
@@ -175,10 +201,15 @@ export async function fetchAnalysisReport(
   return res.data;
 }
 
+// The chart is at most a couple thousand pixels wide; anomalies are always kept.
+const TIMESERIES_MAX_POINTS = 2000;
+
 export async function fetchAnalysisTimeseries(
   uuid: string,
 ): Promise<TimeseriesRow[]> {
-  const res = await apiClient.get(`${API_BASE_URL}/reports/${uuid}/timeseries`);
+  const res = await apiClient.get(`${API_BASE_URL}/reports/${uuid}/timeseries`, {
+    params: { max_points: TIMESERIES_MAX_POINTS },
+  });
   return res.data;
 }
 
@@ -8,6 +8,7 @@ import {
 } from 'lucide-react';
 import { useCallback, useState } from 'react';
 import ReactMarkdown from 'react-markdown';
+import { format } from 'date-fns';
 import { downloadAnalysisReport } from '@/api/analysis';
 import {
   useAnalysisReport,
@@ -48,7 +49,7 @@ export function AnalysisDetailPage() {
 
   // Convert timeseries data for the chart
   const chartData: ChartDataPoint[] = (timeseries ?? []).map((r) => ({
-    timestamp: r.timestamp,
+    timestamp: format(new Date(r.timestamp), 'MM/dd HH:mm'),
     temperature: r.temperature,
     fluidTemperature: r.fluid_temperature,
     pressure: r.pressure,
@@ -17,6 +17,7 @@ import {
 } from 'recharts';
 import {
   type AgentStepEvent,
+  type AnalysisCompleteEvent,
   type AnalysisSSEEvent,
   startPowerAnalysis,
 } from '@/api/analysis';
@@ -199,7 +200,8 @@ export function SensorsPage() {
     };
   });
 
-  // 予測値に対する実績の絶対誤差が閾値を超えるデータポイント
+  // 予測値に対する実績の絶対誤差が閾値を超えるデータポイント（チャート表示用。
+  // AI 分析の異常検知はサーバー側で保存済みの時系列に対して行う）
   const anomalyPoints = chartData?.filter(
     (d) =>
       d.power != null &&
@@ -211,44 +213,29 @@ export function SensorsPage() {
   const handleStartAnalysis = useCallback(() => {
     if (isAnalyzing) return;
 
-    // anomaly summary を構築
-    const anomalySummary = (anomalyPoints ?? []).map((d) => ({
-      timestamp: d.timestamp,
-      power: d.power!,
-      power_prediction: d.powerPrediction!,
-      diff: d.power! - d.powerPrediction!,
-      diff_pct:
-        d.powerPrediction !== 0
-          ? ((d.power! - d.powerPrediction!) / Math.abs(d.powerPrediction!)) * 100
-          : 0,
-    }));
-
     setIsAnalyzing(true);
     setAnalysisError(null);
     setAnalysisSteps([]);
     setSavedReportUuid(null);
 
     const controller = startPowerAnalysis(
-      {
-        start_date: startDate,
-        end_date: endDate,
-        anomaly_points: anomalySummary,
-        total_data_points: chartData?.length ?? 0,
-        chart_data: (chartData ?? []).map((d) => ({
-          timestamp: d.timestamp,
-          temperature: d.temperature ?? null,
-          fluidTemperature: d.fluidTemperature ?? null,
-          pressure: d.pressure ?? null,
-          power: d.power ?? null,
-          powerPrediction: d.powerPrediction ?? null,
-          flow: d.flow ?? null,
-        })),
-      },
+      // 時系列はサーバーが Snowflake から直接取得する
+      { start_date: startDate, end_date: endDate },
       (event: AnalysisSSEEvent) => {
         if (event.event === 'agent_step') {
           const step = event.data as AgentStepEvent;
           setAnalysisSteps((prev) => {
             const idx = prev.findIndex((s) => s.agent_id === step.agent_id);
+            if (step.delta != null) {
+              // ストリーミング中のテキスト片は本文に追記する
+              const current = idx >= 0 ? prev[idx] : { ...step, content: '' };
+              const merged = {
+                ...current,
+                status: step.status,
+                content: (current.content ?? '') + step.delta,
+              };
+              return idx >= 0 ? prev.map((s, i) => (i === idx ? merged : s)) : [...prev, merged];
+            }
             if (idx >= 0) {
               const next = [...prev];
               next[idx] = step;
@@ -258,10 +245,13 @@ export function SensorsPage() {
           });
         } else if (event.event === 'analysis_complete') {
           setIsAnalyzing(false);
-          const completeData = event.data as { status: string; report_uuid?: string | null };
+          const completeData = event.data as AnalysisCompleteEvent;
           if (completeData.report_uuid) {
             setSavedReportUuid(completeData.report_uuid);
           }
+          if (completeData.error) {
+            setAnalysisError(completeData.error);
+          }
         }
       },
       (err) => {
@@ -275,7 +265,7 @@ export function SensorsPage() {
     setTimeout(() => {
       analysisPanelRef.current?.scrollIntoView({ behavior: 'smooth', block: 'start' });
     }, 100);
-  }, [isAnalyzing, startDate, endDate, chartData, anomalyPoints]);
+  }, [isAnalyzing, startDate, endDate]);
 
   return (
     <div className="space-y-6">
@@ -582,7 +572,7 @@ export function SensorsPage() {
                         )}
                       </div>
                     </div>
-                    {step.status === 'completed' && step.content && (
+                    {step.status !== 'pending' && step.content && (
                       <div className="mt-3 border-t border-gray-100 pt-3 prose prose-sm max-w-none text-gray-700">
                         <ReactMarkdown>{step.content}</ReactMarkdown>
                       </div>